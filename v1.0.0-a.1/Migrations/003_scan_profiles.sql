@@ -0,0 +1,28 @@
+-- ============================================================================
+-- YourStockNews - Scan Profiling Artifacts
+-- Version: 003
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- 1. Profiling artifacts of sampled scan jobs (gzip-compressed)
+-- ----------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS scan_profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_job_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    content BLOB NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (scan_job_id) REFERENCES scan_jobs(id) ON DELETE CASCADE
+);
+
+-- ----------------------------------------------------------------------------
+-- 2. Indexes
+-- ----------------------------------------------------------------------------
+
+CREATE INDEX IF NOT EXISTS idx_scan_profiles_scan_job ON scan_profiles(scan_job_id);
+
+-- ----------------------------------------------------------------------------
+-- END OF MIGRATION
+-- ============================================================================
@@ -0,0 +1,16 @@
+-- ============================================================================
+-- YourStockNews - Article Listing Index
+-- Version: 004
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- 1. Keyset pagination of a user's articles, newest first
+-- ----------------------------------------------------------------------------
+
+-- Serves ORDER BY detected_at DESC, id DESC and the (detected_at, id) cursor
+-- comparison of GET /api/articles without sorting or skipping rows
+CREATE INDEX IF NOT EXISTS idx_articles_user_detected ON articles(user_id, detected_at DESC, id DESC);
+
+-- ----------------------------------------------------------------------------
+-- END OF MIGRATION
+-- ============================================================================
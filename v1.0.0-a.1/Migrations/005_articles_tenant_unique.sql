@@ -0,0 +1,73 @@
+-- ============================================================================
+-- YourStockNews - Per-Tenant Article Rows
+-- Version: 005
+-- ============================================================================
+
+-- The bot schema declares articles.hash UNIQUE, so INSERT OR IGNORE kept only
+-- the first watchlist's copy of an article and every other tenant's copy was
+-- dropped. Rows are now unique per (hash, user_id, watchlist_id); rows
+-- without a tenant (written by the Discord bot) stay unique by hash alone.
+--
+-- SQLite cannot drop a column constraint, so the table is rebuilt. Run with
+-- foreign keys off, or dropping articles cascades into article_tickers.
+
+PRAGMA foreign_keys = OFF;
+
+BEGIN TRANSACTION;
+
+-- ----------------------------------------------------------------------------
+-- 1. Rebuild articles without the hash-only UNIQUE constraint
+-- ----------------------------------------------------------------------------
+
+CREATE TABLE articles_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    description TEXT,
+    url TEXT,
+    severity TEXT,
+    score REAL,
+    hash TEXT,
+    published_at TEXT,
+    detected_at TEXT DEFAULT (datetime('now')),
+    posted INTEGER DEFAULT 0,
+    user_id INTEGER,
+    watchlist_id INTEGER
+);
+
+INSERT INTO articles_new
+    (id, title, description, url, severity, score, hash, published_at, detected_at, posted, user_id, watchlist_id)
+SELECT id, title, description, url, severity, score, hash, published_at, detected_at, posted, user_id, watchlist_id
+FROM articles;
+
+DROP TABLE articles;
+ALTER TABLE articles_new RENAME TO articles;
+
+-- ----------------------------------------------------------------------------
+-- 2. Uniqueness
+-- ----------------------------------------------------------------------------
+
+-- One row per article and watchlist (replaces idx_articles_hash_user)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_hash_tenant ON articles(hash, user_id, watchlist_id);
+
+-- NULLs never collide in a UNIQUE index: keep bot rows unique by hash
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_hash_bot ON articles(hash) WHERE user_id IS NULL;
+
+-- ----------------------------------------------------------------------------
+-- 3. Indexes dropped with the old table (002, 004)
+-- ----------------------------------------------------------------------------
+
+CREATE INDEX IF NOT EXISTS idx_articles_user ON articles(user_id);
+CREATE INDEX IF NOT EXISTS idx_articles_watchlist ON articles(watchlist_id);
+CREATE INDEX IF NOT EXISTS idx_articles_user_watchlist ON articles(user_id, watchlist_id);
+CREATE INDEX IF NOT EXISTS idx_articles_severity ON articles(severity);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_posted ON articles(posted);
+CREATE INDEX IF NOT EXISTS idx_articles_user_detected ON articles(user_id, detected_at DESC, id DESC);
+
+COMMIT;
+
+PRAGMA foreign_keys = ON;
+
+-- ----------------------------------------------------------------------------
+-- END OF MIGRATION
+-- ============================================================================
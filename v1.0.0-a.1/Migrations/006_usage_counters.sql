@@ -0,0 +1,71 @@
+-- ============================================================================
+-- YourStockNews - Usage Counters for Quota Checks
+-- Version: 006
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- 1. Counter columns
+-- ----------------------------------------------------------------------------
+
+-- Watchlists owned by each user, and tickers in each watchlist. Quota checks
+-- read them by primary key instead of counting rows.
+ALTER TABLE users ADD COLUMN watchlist_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE watchlists ADD COLUMN ticker_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE users SET watchlist_count = (
+    SELECT COUNT(*) FROM watchlists WHERE watchlists.user_id = users.id
+);
+UPDATE watchlists SET ticker_count = (
+    SELECT COUNT(*) FROM watchlist_tickers WHERE watchlist_tickers.watchlist_id = watchlists.id
+);
+
+-- ----------------------------------------------------------------------------
+-- 2. Keep the counters current
+-- ----------------------------------------------------------------------------
+
+-- Triggers run inside the statement's own transaction, so a counter changes
+-- exactly when its row does: rolled-back inserts and every writer (API
+-- workers, scripts, ON DELETE CASCADE) are covered alike.
+CREATE TRIGGER IF NOT EXISTS trg_watchlists_count_insert
+AFTER INSERT ON watchlists
+BEGIN
+    UPDATE users SET watchlist_count = watchlist_count + 1 WHERE id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_watchlists_count_delete
+AFTER DELETE ON watchlists
+BEGIN
+    UPDATE users SET watchlist_count = watchlist_count - 1 WHERE id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_watchlists_count_move
+AFTER UPDATE OF user_id ON watchlists
+WHEN OLD.user_id IS NOT NEW.user_id
+BEGIN
+    UPDATE users SET watchlist_count = watchlist_count - 1 WHERE id = OLD.user_id;
+    UPDATE users SET watchlist_count = watchlist_count + 1 WHERE id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_watchlist_tickers_count_insert
+AFTER INSERT ON watchlist_tickers
+BEGIN
+    UPDATE watchlists SET ticker_count = ticker_count + 1 WHERE id = NEW.watchlist_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_watchlist_tickers_count_delete
+AFTER DELETE ON watchlist_tickers
+BEGIN
+    UPDATE watchlists SET ticker_count = ticker_count - 1 WHERE id = OLD.watchlist_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_watchlist_tickers_count_move
+AFTER UPDATE OF watchlist_id ON watchlist_tickers
+WHEN OLD.watchlist_id IS NOT NEW.watchlist_id
+BEGIN
+    UPDATE watchlists SET ticker_count = ticker_count - 1 WHERE id = OLD.watchlist_id;
+    UPDATE watchlists SET ticker_count = ticker_count + 1 WHERE id = NEW.watchlist_id;
+END;
+
+-- ----------------------------------------------------------------------------
+-- END OF MIGRATION
+-- ============================================================================
@@ -20,6 +20,7 @@ import sys
 import time
 import json
 import math
+import atexit
 import logging
 import traceback
 import requests
@@ -28,32 +29,63 @@ import sqlite3
 import hashlib
 import platform
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Mapping
 from dateutil import parser as dateutil_parser
 from pathlib import Path
 from dotenv import load_dotenv
+from keyword_matcher import Scorer, KeywordAutomaton
+from seen_cache import SeenArticleCache
+from company_universe import CompanyUniverse
+from discord_outbox import DiscordOutbox, DiscordOutboxSender
+from sqlite_storage import get_storage
+from poll_scheduler import AdaptivePollScheduler
+from rate_limiter import ApiGate, CircuitOpenError
+from structured_logging import JsonFormatter, EventSampler, EventCounter, start_queue_logging
+from scanner_metrics import (
+    REGISTRY as METRICS, STAGE_SECONDS, TIER_MATCHES, CACHE_LOOKUPS, ARTICLES, record_api_response, serve_metrics
+)
 load_dotenv()
 
 # ---------------------------
 # Configuration
 # ---------------------------
 MARKETAUX_API_KEY = os.getenv("MARKETAUX_API_KEY", "9Ydp4VNIm9zZ6WHmVcys40L9gUlUWOKW6ZYFxX2T")
+MARKETAUX_BASE_URL = os.getenv("MARKETAUX_BASE_URL", "https://api.marketaux.com").rstrip("/")  # local stand-in for load tests
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/1435654882710519888/ZDx_dGG22dknR4hGrENapdaG1Cm-VyUCUvrXmI6kGxcw0KLILP5AJKmNB14L9TzD65J-")
 WATCHLIST_PATH = "watchlist.txt"
 COMPANY_MAP_PATH = "company_map.json"
+COMPANY_UNIVERSE_PATH = os.getenv("COMPANY_UNIVERSE_PATH", "company_universe.bin")  # built by company_universe.py; preferred when present
 LAST_TS_PATH = "last_timestamp.txt"
 LOG_FILE = "bot.log"
 DB_PATH = "med_alerts.db"
+MIGRATION_CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", "5000"))  # legacy med_articles rows per transaction
+SEEN_CACHE_PATH = os.getenv("SEEN_CACHE_PATH", "seen_cache.json.gz")  # shared by bot instances on a host
+SEEN_CACHE_SIZE = int(os.getenv("SEEN_CACHE_SIZE", "50000"))
+SEEN_CACHE_SAVE_SECONDS = int(os.getenv("SEEN_CACHE_SAVE_SECONDS", "300"))  # min gap between saves; always saved at exit
 
 # User-tunable
 BATCH_SIZE = 10
 CYCLE_SECONDS = int(os.getenv("CYCLE_SECONDS", "3600"))
 COLD_START_HOURS = 12
-SMART_COOLDOWN_MINUTES = 30
+DISCORD_OUTBOX_BATCH = int(os.getenv("DISCORD_OUTBOX_BATCH", "25"))  # alerts claimed per sender pass
 MAX_RETRIES = 3
+MAX_PAGES = int(os.getenv("MARKETAUX_MAX_PAGES", "10"))  # pages streamed per batch
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "0") == "1"  # per-ticker schedule instead of whole-watchlist cycles
+POLL_BUDGET_PER_HOUR = float(os.getenv("POLL_BUDGET_PER_HOUR", "0"))  # MarketAux calls/hour; 0 = what fixed cycles spend
+POLL_MIN_INTERVAL_MINUTES = float(os.getenv("POLL_MIN_INTERVAL_MINUTES", "5"))
+POLL_MAX_INTERVAL_MINUTES = float(os.getenv("POLL_MAX_INTERVAL_MINUTES", "240"))
+POLL_OVERLAP_MINUTES = 5  # re-read this much before a ticker's last poll for late-indexed articles
 RETRY_BACKOFF_BASE = 1.5
+MARKETAUX_RATE_PER_SECOND = float(os.getenv("MARKETAUX_RATE_PER_SECOND", "0"))  # shared by every bot on DB_PATH; 0 = no cap
+MARKETAUX_BURST = float(os.getenv("MARKETAUX_BURST", "5"))
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive 5xx / network errors before MarketAux calls pause
+CIRCUIT_COOL_OFF_SECONDS = 120
 FILTER_MODE = int(os.getenv("FILTER_MODE", "2"))
 LOG_LEVEL = logging.INFO
+LOG_MODE = os.getenv("LOG_MODE", "classic")  # "structured": JSON lines written by a background thread, sampled/aggregated hot-path logs
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))  # structured mode: log 1 in N per-article lines (MED saved, ...)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # serve Prometheus metrics on http://0.0.0.0:PORT/metrics; 0 = off
+METRICS_SNAPSHOT_PATH = os.getenv("METRICS_SNAPSHOT_PATH", "")  # also dump metrics as JSON here after every cycle
 
 # Severity thresholds
 HIGH_THRESHOLD = 2.75
@@ -91,6 +123,7 @@ keyword_weights: Dict[str, float] = {
     "announce": 0.5, "launch": 0.6, "contract": 1.0, "agreement": 0.8, "partnership": 0.9,
 }
 keyword_weights = {k.lower(): v for k, v in keyword_weights.items()}
+scorer = Scorer(keyword_weights)  # compiled once, single pass per article
 
 # ---------------------------
 # Logging: rotating + stream handler
@@ -117,6 +150,17 @@ if logger.handlers:
 logger.addHandler(file_handler)
 logger.addHandler(stream_handler)
 
+if LOG_MODE == "structured":
+    # Scan thread only enqueues records; formatting and I/O happen on the listener thread
+    json_formatter = JsonFormatter()
+    file_handler.setFormatter(json_formatter)
+    stream_handler.setFormatter(json_formatter)
+    log_listener = start_queue_logging(logger, [file_handler, stream_handler])
+
+# Per-article lines are sampled and detection tiers counted per batch in structured mode
+article_log_sampler = EventSampler(LOG_SAMPLE_EVERY if LOG_MODE == "structured" else 1)
+tier_counter = EventCounter()
+
 # ---------------------------
 # Utilities
 # ---------------------------
@@ -155,48 +199,46 @@ def write_last_timestamp(ts: str, path: str = LAST_TS_PATH):
     except Exception as e:
         logger.warning(f"Failed to write last timestamp: {e}")
 
+_marketaux_gate: Optional[ApiGate] = None
+
+def get_marketaux_gate() -> ApiGate:
+    # Token bucket + circuit breaker in DB_PATH, shared with other bot instances
+    global _marketaux_gate
+    if _marketaux_gate is None:
+        _marketaux_gate = ApiGate(DB_PATH, "marketaux", MARKETAUX_RATE_PER_SECOND, MARKETAUX_BURST,
+                                  failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                                  cool_off_seconds=CIRCUIT_COOL_OFF_SECONDS,
+                                  max_retries=MAX_RETRIES - 1, backoff_base=RETRY_BACKOFF_BASE)
+    return _marketaux_gate
+
+def _timed_get(url: str, params: dict, headers: dict) -> requests.Response:
+    with STAGE_SECONDS.time("fetch"):
+        resp = requests.get(url, params=params, headers=headers, timeout=20)
+    record_api_response(resp.status_code)
+    return resp
+
 def safe_request_get(url: str, params: dict, headers: dict = None, max_retries: int = MAX_RETRIES) -> Tuple[Optional[requests.Response], Optional[dict]]:
-    attempt = 0
-    backoff = 1.0
     headers = headers or {}
-    while attempt < max_retries:
-        attempt += 1
-        try:
-            resp = requests.get(url, params=params, headers=headers, timeout=20)
-            if resp.status_code == 200:
-                try:
-                    return resp, resp.json()
-                except Exception:
-                    return resp, None
-            if resp.status_code in (429, 500, 502, 503, 504):
-                logger.warning(f"MarketAux HTTP {resp.status_code}: {resp.text}")
-                sleep_for = backoff * (RETRY_BACKOFF_BASE ** (attempt - 1))
-                logger.info(f"Retrying after {sleep_for:.1f}s (attempt {attempt}/{max_retries})")
-                time.sleep(sleep_for)
-                continue
-            return resp, None
-        except requests.RequestException as e:
-            logger.warning(f"Request error: {e}. attempt {attempt}/{max_retries}")
-            time.sleep(backoff * (RETRY_BACKOFF_BASE ** (attempt - 1)))
-            continue
-    logger.error("Exceeded max retries on request.")
-    return None, None
-
-def post_to_discord(content: str) -> bool:
-    if not DISCORD_WEBHOOK_URL:
-        logger.warning("DISCORD_WEBHOOK_URL not set; skipping Discord post.")
-        return False
     try:
-        resp = requests.post(DISCORD_WEBHOOK_URL, json={"content": content}, timeout=10)
-        if resp.status_code in (200, 204):
-            logger.info("Discord posted.")
-            return True
-        else:
-            logger.warning(f"Discord post failed: {resp.status_code} {resp.text}")
-            return False
+        # Retries, Retry-After and backoff are handled by the shared gate
+        resp = get_marketaux_gate().call(lambda: _timed_get(url, params, headers), max_retries=max_retries - 1)
+    except CircuitOpenError as e:
+        logger.warning(f"MarketAux calls paused: {e}")
+        return None, None
     except requests.RequestException as e:
-        logger.warning(f"Discord post exception: {e}")
-        return False
+        logger.warning(f"Request error: {e}.")
+        logger.error("Exceeded max retries on request.")
+        return None, None
+    if resp.status_code == 200:
+        try:
+            return resp, resp.json()
+        except Exception:
+            return resp, None
+    if resp.status_code in (429, 500, 502, 503, 504):
+        logger.warning(f"MarketAux HTTP {resp.status_code}: {resp.text}")
+        logger.error("Exceeded max retries on request.")
+        return None, None
+    return resp, None
 
 def load_watchlist(path: str = WATCHLIST_PATH) -> List[str]:
     if not os.path.exists(path):
@@ -207,7 +249,15 @@ def load_watchlist(path: str = WATCHLIST_PATH) -> List[str]:
     logger.info(f"Loaded {len(lines)} personal tickers from {path}.")
     return lines
 
-def load_company_map(path: str = COMPANY_MAP_PATH) -> Dict[str, str]:
+def load_company_map(path: str = COMPANY_MAP_PATH, universe_path: str = COMPANY_UNIVERSE_PATH) -> Mapping[str, str]:
+    # Memory-mapped full-market universe: opened lazily, pages shared between processes
+    if universe_path and os.path.exists(universe_path):
+        try:
+            universe = CompanyUniverse(universe_path)
+            logger.info(f"Using company universe {universe_path} ({len(universe)} tickers).")
+            return universe
+        except Exception as e:
+            logger.warning(f"Failed to open company universe {universe_path}: {e}; falling back to {path}.")
     if not os.path.exists(path):
         logger.info("No company_map.json found; continuing with ticker-only names.")
         return {}
@@ -233,10 +283,13 @@ def canonical_article_hash(title: str, url: str, published_at: str) -> str:
 # DB: new schema + migration
 # ---------------------------
 
+def db_storage():
+    # Pooled per-thread WAL connections; see sqlite_storage.py
+    return get_storage(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+
 def connect_db():
-    conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # This thread's shared connection: commit/rollback as before, but never close it
+    return db_storage().connection()
 
 def init_and_migrate_db():
     """
@@ -279,72 +332,128 @@ def init_and_migrate_db():
     # Old table name guessed to be 'med_articles' (from v2.3)
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='med_articles'")
     if cur.fetchone():
-        logger.info("Legacy med_articles table detected — starting migration into new schema.")
         try:
-            cur.execute("SELECT id, ticker, title, description, url, severity, published_at, detected_at FROM med_articles")
-            rows = cur.fetchall()
-            migrated = 0
-            for r in rows:
-                ticker = r["ticker"] or ""
-                title = r["title"] or ""
-                desc = r["description"] or ""
-                url = r["url"] or ""
-                severity_val = r["severity"] if r["severity"] is not None else ""
-                published_at = r["published_at"] or ""
-                # old severity may be numeric; store as MED/LOW/HIGH by thresholds
-                if isinstance(severity_val, (int, float)):
-                    score_val = float(severity_val)
-                    if score_val >= HIGH_THRESHOLD:
-                        sev_text = "HIGH"
-                    elif score_val >= MED_THRESHOLD:
-                        sev_text = "MED"
-                    else:
-                        sev_text = "LOW"
-                else:
-                    # if it's textual or empty, attempt to keep as-is; default MED for safety
-                    sev_text = str(severity_val) if severity_val else "MED"
-
-                art_hash = canonical_article_hash(title, url, published_at)
-                # Insert article if not present
-                try:
-                    cur.execute("""
-                        INSERT OR IGNORE INTO articles (title, description, url, severity, score, hash, published_at, detected_at, posted)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
-                    """, (title, desc, url, sev_text, None, art_hash, published_at or None, r["detected_at"] or None))
-                    conn.commit()
-                except Exception:
-                    # ignore duplicate or insertion issues
-                    pass
-
-                # Get article_id
-                cur.execute("SELECT id FROM articles WHERE hash=?", (art_hash,))
-                art_row = cur.fetchone()
-                if art_row:
-                    art_id = art_row["id"]
-                    try:
-                        cur.execute("INSERT OR IGNORE INTO article_tickers (article_id, ticker) VALUES (?, ?)", (art_id, ticker.upper()))
-                        conn.commit()
-                    except Exception:
-                        pass
-                migrated += 1
-
-            logger.info(f"Migration complete — migrated {migrated} legacy rows.")
-            # Optional: keep legacy table, or comment out the next line to drop it.
-            # cur.execute("DROP TABLE IF EXISTS med_articles")
-            # conn.commit()
+            migrate_legacy_med_articles(conn)
         except Exception:
+            # Progress up to the last committed chunk is kept; the next start resumes from there
+            conn.rollback()
             logger.exception("Failed while migrating legacy med_articles table.")
-    conn.close()
+
+def _legacy_severity_text(severity_val: Any) -> str:
+    # old severity may be numeric; store as MED/LOW/HIGH by thresholds
+    if isinstance(severity_val, (int, float)):
+        score_val = float(severity_val)
+        if score_val >= HIGH_THRESHOLD:
+            return "HIGH"
+        elif score_val >= MED_THRESHOLD:
+            return "MED"
+        return "LOW"
+    # if it's textual or empty, attempt to keep as-is; default MED for safety
+    return str(severity_val) if severity_val else "MED"
+
+def _insert_rows(cur: sqlite3.Cursor, head: str, rows: List[tuple], width: int):
+    """Multi-row INSERT, split so each statement stays under SQLite's bound-variable limit"""
+    per_stmt = max(1, 900 // width)
+    group = "(" + ",".join("?" * width) + ")"
+    for i in range(0, len(rows), per_stmt):
+        part = rows[i:i + per_stmt]
+        cur.execute(f"{head} VALUES {','.join([group] * len(part))}", [v for row in part for v in row])
+
+def migrate_legacy_med_articles(conn: sqlite3.Connection, chunk_size: int = MIGRATION_CHUNK_SIZE) -> int:
+    """
+    Stream legacy med_articles rows into articles/article_tickers.
+
+    Reads chunk_size rows at a time in id order and writes each chunk with
+    multi-row inserts in a single transaction, together with a checkpoint
+    (last migrated id) in migration_state. An interrupted run resumes after
+    the last committed chunk; once everything is copied, startup only
+    compares the checkpoint with MAX(id). Returns the rows migrated now.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS migration_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            completed_at TEXT
+        )
+    """)
+    conn.commit()
+    state = cur.execute("SELECT last_id, rows_done, completed_at FROM migration_state WHERE name='med_articles'").fetchone()
+    last_id = state["last_id"] if state else 0
+    rows_done = state["rows_done"] if state else 0
+    max_id = cur.execute("SELECT MAX(id) FROM med_articles").fetchone()[0] or 0
+    if max_id <= last_id:
+        if state is None or state["completed_at"] is None:
+            cur.execute("""
+                INSERT INTO migration_state (name, last_id, rows_done, completed_at) VALUES ('med_articles', ?, ?, datetime('now'))
+                ON CONFLICT(name) DO UPDATE SET completed_at = excluded.completed_at
+            """, (last_id, rows_done))
+            conn.commit()
+        logger.info(f"Legacy med_articles already migrated ({rows_done} rows); skipping.")
+        return 0
+
+    remaining = cur.execute("SELECT COUNT(*) FROM med_articles WHERE id > ?", (last_id,)).fetchone()[0]
+    if last_id:
+        logger.info(f"Resuming med_articles migration after id {last_id}: {remaining} rows left ({rows_done} done).")
+    else:
+        logger.info(f"Legacy med_articles table detected — migrating {remaining} rows into new schema.")
+
+    started = time.perf_counter()
+    migrated = 0
+    while True:
+        rows = cur.execute("""
+            SELECT id, ticker, title, description, url, severity, published_at, detected_at
+            FROM med_articles WHERE id > ? ORDER BY id LIMIT ?
+        """, (last_id, chunk_size)).fetchall()
+        if not rows:
+            break
+
+        articles_rows = []
+        links = []
+        for r in rows:
+            title = r["title"] or ""
+            url = r["url"] or ""
+            published_at = r["published_at"] or ""
+            art_hash = canonical_article_hash(title, url, published_at)
+            articles_rows.append((title, r["description"] or "", url, _legacy_severity_text(r["severity"]), None, art_hash,
+                                  published_at or None, r["detected_at"] or None, 0))
+            links.append((art_hash, (r["ticker"] or "").upper()))
+
+        # One transaction per chunk: articles, ticker links and the checkpoint commit together
+        _insert_rows(cur, "INSERT OR IGNORE INTO articles (title, description, url, severity, score, hash, published_at, detected_at, posted)",
+                     articles_rows, 9)
+        hashes = list({h for h, _ in links})
+        ids: Dict[str, int] = {}
+        for i in range(0, len(hashes), 900):
+            part = hashes[i:i + 900]
+            for a in cur.execute(f"SELECT id, hash FROM articles WHERE hash IN ({','.join('?' * len(part))})", part):
+                ids[a["hash"]] = a["id"]
+        _insert_rows(cur, "INSERT OR IGNORE INTO article_tickers (article_id, ticker)",
+                     [(ids[h], t) for h, t in links if h in ids], 2)
+        last_id = rows[-1]["id"]
+        rows_done += len(rows)
+        cur.execute("""
+            INSERT INTO migration_state (name, last_id, rows_done) VALUES ('med_articles', ?, ?)
+            ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id, rows_done = excluded.rows_done
+        """, (last_id, rows_done))
+        conn.commit()
+
+        migrated += len(rows)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Migrated {migrated}/{remaining} legacy rows ({migrated / elapsed:.0f} rows/s).")
+
+    cur.execute("UPDATE migration_state SET completed_at = datetime('now') WHERE name='med_articles'")
+    conn.commit()
+    elapsed = time.perf_counter() - started
+    logger.info(f"Migration complete — migrated {migrated} legacy rows in {elapsed:.1f}s ({migrated / elapsed if elapsed else 0:.0f} rows/s).")
+    # Legacy table is kept; the checkpoint makes later startups skip it.
+    return migrated
 
 # DB helper functions for new schema
 
 def find_article_by_hash(art_hash: str) -> Optional[sqlite3.Row]:
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM articles WHERE hash=?", (art_hash,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    return connect_db().execute("SELECT * FROM articles WHERE hash=?", (art_hash,)).fetchone()
 
 def save_article_and_link(title: str, description: str, url: str, severity: str, score: float, published_at: str, tickers: List[str], mark_posted: bool=False) -> Tuple[int, bool]:
     """
@@ -353,90 +462,59 @@ def save_article_and_link(title: str, description: str, url: str, severity: str,
     Returns (article_id, inserted_flag)
     """
     art_hash = canonical_article_hash(title, url, published_at or "")
-    conn = connect_db()
-    cur = conn.cursor()
-    inserted = False
-    try:
+
+    def write(conn) -> Tuple[int, bool]:
+        cur = conn.cursor()
         cur.execute("""
             INSERT OR IGNORE INTO articles (title, description, url, severity, score, hash, published_at, detected_at, posted)
             VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), ?)
         """, (title, description, url, severity, score, art_hash, published_at or None, 1 if mark_posted else 0))
-        conn.commit()
         # fetch article id
         cur.execute("SELECT id, posted FROM articles WHERE hash=?", (art_hash,))
         art_row = cur.fetchone()
         if art_row is None:
             raise RuntimeError("Failed to fetch inserted article.")
         art_id = art_row["id"]
-        # if inserted (we inserted new row), SQLite's INSERT OR IGNORE doesn't tell us. Check if posted flag set:
-        # If this is a new insert, some fields will match values we passed; we treat inserted=True when first time linking tickers.
-        # For robust detection, check if there was any ticker existing.
+        # INSERT OR IGNORE doesn't tell us whether the row is new; we treat inserted=True
+        # when this call linked the article's first tickers.
         cur.execute("SELECT COUNT(1) as cnt FROM article_tickers WHERE article_id=?", (art_id,))
         cnt_before = cur.fetchone()["cnt"]
-        for t in tickers:
-            try:
-                cur.execute("INSERT OR IGNORE INTO article_tickers (article_id, ticker) VALUES (?, ?)", (art_id, t.upper()))
-            except Exception:
-                pass
-        conn.commit()
+        cur.executemany("INSERT OR IGNORE INTO article_tickers (article_id, ticker) VALUES (?, ?)",
+                        [(art_id, t.upper()) for t in tickers])
         cur.execute("SELECT COUNT(1) as cnt_after FROM article_tickers WHERE article_id=?", (art_id,))
         cnt_after = cur.fetchone()["cnt_after"]
-        inserted = (cnt_before == 0 and cnt_after > 0)
         # if mark_posted True and posted flag not yet set, update
-        if mark_posted:
+        if mark_posted and not art_row["posted"]:
             cur.execute("UPDATE articles SET posted=1 WHERE id=?", (art_id,))
-            conn.commit()
+        return art_id, (cnt_before == 0 and cnt_after > 0)
+
+    try:
+        # One IMMEDIATE transaction (was three commits), retried if the DB stays locked
+        with STAGE_SECONDS.time("db_write"):
+            return db_storage().write(write)
     except Exception:
         logger.exception("save_article_and_link failed.")
-        conn.rollback()
-        art_id = -1
-    finally:
-        conn.close()
-    return art_id, inserted
+        return -1, False
 
 def mark_article_posted_by_hash(art_hash: str):
-    conn = connect_db()
-    cur = conn.cursor()
     try:
-        cur.execute("UPDATE articles SET posted=1 WHERE hash=?", (art_hash,))
-        conn.commit()
+        db_storage().execute("UPDATE articles SET posted=1 WHERE hash=?", (art_hash,))
     except Exception:
         logger.exception("mark_article_posted_by_hash failed.")
-    finally:
-        conn.close()
 
 def get_tickers_for_article_by_hash(art_hash: str) -> List[str]:
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute("""
+    rows = connect_db().execute("""
         SELECT at.ticker FROM article_tickers at
         JOIN articles a ON a.id = at.article_id
         WHERE a.hash = ?
-    """, (art_hash,))
-    rows = cur.fetchall()
-    conn.close()
+    """, (art_hash,)).fetchall()
     return [r["ticker"] for r in rows] if rows else []
 
 # ---------------------------
 # Scoring
 # ---------------------------
 def score_text(text: str) -> float:
-    if not text:
-        return 0.0
-    s = 0.0
-    text_l = text.lower()
-    for kw, w in keyword_weights.items():
-        start = 0
-        count = 0
-        while True:
-            idx = text_l.find(kw, start)
-            if idx == -1:
-                break
-            count += 1
-            start = idx + len(kw)
-        if count:
-            s += count * w
-    return s
+    return scorer.score(text)
 
 def weighted_severity(article: Dict[str, Any]) -> Tuple[str, float]:
     title = article.get("title", "") or ""
@@ -454,8 +532,12 @@ def weighted_severity(article: Dict[str, Any]) -> Tuple[str, float]:
 # ---------------------------
 # MarketAux fetch
 # ---------------------------
+marketaux_calls = 0  # requests made so far (the adaptive scheduler charges them to its budget)
+
 def marketaux_fetch_batch(symbols: List[str], published_after: str, page: int = 1) -> Tuple[List[dict], Optional[dict]]:
-    base_url = "https://api.marketaux.com/v1/news/all"
+    global marketaux_calls
+    marketaux_calls += 1
+    base_url = f"{MARKETAUX_BASE_URL}/v1/news/all"
     params = {
         "symbols": ",".join(symbols),
         "published_after": published_after,
@@ -491,24 +573,55 @@ def marketaux_fetch_batch(symbols: List[str], published_after: str, page: int =
         logger.exception("Failed to parse MarketAux JSON response.")
         return [], j
 
-# ---------------------------
-# Cooldown manager
-# ---------------------------
-class CooldownManager:
-    def __init__(self, cooldown_minutes: int = SMART_COOLDOWN_MINUTES):
-        self.cooldown = timedelta(minutes=cooldown_minutes)
-        self.last_posted: Dict[str, datetime] = {}
-
-    def can_post(self, ticker: str) -> bool:
-        t = self.last_posted.get(ticker)
-        if t is None:
-            return True
-        if now_utc() - t >= self.cooldown:
-            return True
+def _parse_published_at(art: Dict[str, Any]) -> Optional[datetime]:
+    ts = art.get("published_at") or art.get("published_at_local")
+    if not ts:
+        return None
+    try:
+        dt = dateutil_parser.parse(ts)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+def _has_more_pages(raw: Optional[dict], page: int, returned: int) -> bool:
+    if not returned or not isinstance(raw, dict):
         return False
+    meta = raw.get("meta") or {}
+    limit = meta.get("limit") or returned
+    found = meta.get("found")
+    if returned < limit:
+        return False
+    if found is not None and page * limit >= found:
+        return False
+    return True
 
-    def mark_posted(self, ticker: str):
-        self.last_posted[ticker] = now_utc()
+def iter_marketaux_articles(symbols: List[str], published_after: str, since: Optional[datetime] = None,
+                            first_page: Optional[Tuple[List[dict], Optional[dict]]] = None,
+                            max_pages: int = MAX_PAGES):
+    """
+    Stream a batch's articles page by page (newest first).
+    Stops at the last page, after max_pages, or at the first article older than `since`.
+    `first_page` lets the caller hand over a page 1 it already fetched.
+    """
+    page = 1
+    articles, raw = first_page if first_page is not None else marketaux_fetch_batch(symbols, published_after, page=1)
+    while True:
+        for art in articles or []:
+            if since is not None:
+                published = _parse_published_at(art)
+                if published is not None and published < since:
+                    return
+            yield art
+        if page >= max_pages or not _has_more_pages(raw, page, len(articles or [])):
+            return
+        page += 1
+        logger.debug("Outbound URL: %s/v1/news/all?symbols=%s&published_after=%s&page=%d",
+                      MARKETAUX_BASE_URL, ",".join(symbols), published_after, page)
+        articles, raw = marketaux_fetch_batch(symbols, published_after, page=page)
+        if isinstance(raw, dict) and raw.get("error"):
+            return
 
 # ---------------------------
 # Extended Matching v2 (unchanged but included)
@@ -530,6 +643,82 @@ def levenshtein(a: str, b: str) -> int:
         prev = cur
     return prev[lb]
 
+def levenshtein_within(a: str, b: str, max_dist: int) -> int:
+    """Edit distance if it is <= max_dist, else max_dist + 1 (banded DP with early exit)."""
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    over = max_dist + 1
+    if abs(la - lb) > max_dist:
+        return over
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    if la == 0:
+        return lb
+    prev = [j if j <= max_dist else over for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        cur = [over] * (lb + 1)
+        if i <= max_dist:
+            cur[0] = i
+        row_min = cur[0]
+        ca = a[i - 1]
+        for j in range(max(1, i - max_dist), min(lb, i + max_dist) + 1):
+            v = prev[j - 1] + (0 if ca == b[j - 1] else 1)
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if cur[j - 1] + 1 < v:
+                v = cur[j - 1] + 1
+            if v > over:
+                v = over
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > max_dist:
+            return over
+        prev = cur
+    return prev[lb]
+
+def _deletion_variants(word: str, depth: int) -> set:
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+class FuzzyTokenIndex:
+    """
+    Deletion-neighbourhood index for "which tokens are within max_dist edits of this word".
+
+    Two strings within k edits share a string reachable from both by at most
+    k deletions, so candidates come from a few dict lookups instead of a scan
+    of every token; each candidate is then confirmed with levenshtein_within.
+    Results are memoized per word.
+    """
+
+    CACHE_LIMIT = 50_000
+
+    def __init__(self, tokens, max_dist: int):
+        self.max_dist = max_dist
+        self._variants: Dict[str, List[str]] = {}
+        for tok in set(tokens):
+            for v in _deletion_variants(tok, max_dist):
+                self._variants.setdefault(v, []).append(tok)
+        self._cache: Dict[str, frozenset] = {}
+
+    def lookup(self, word: str) -> frozenset:
+        hit = self._cache.get(word)
+        if hit is not None:
+            return hit
+        candidates = set()
+        for v in _deletion_variants(word, self.max_dist):
+            candidates.update(self._variants.get(v, ()))
+        result = frozenset(tok for tok in candidates if levenshtein_within(tok, word, self.max_dist) <= self.max_dist)
+        if len(self._cache) >= self.CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[word] = result
+        return result
+
 def _normalize_text(s: str) -> str:
     return re.sub(r"[^a-z0-9 ]+", " ", (s or "").lower()).strip()
 
@@ -537,7 +726,180 @@ def _url_tokens(url: str) -> List[str]:
     tokens = re.split(r"[\-_/\.\?=&]+", url or "")
     return [t.lower() for t in tokens if t]
 
-def detect_tickers_extended(article: Dict[str, Any], batch: List[str], company_map: Dict[str, str]) -> List[str]:
+_WORD_TICKER_RE = re.compile(r"\w+")
+
+class TickerDetectionIndex:
+    """
+    Everything detect_tickers_extended needs about a ticker universe, built once.
+
+    Holds normalized / compacted company names and name tokens as Aho-Corasick
+    automata, plus a single word-boundary pattern for all tickers, so each tier
+    costs one pass over the article text regardless of how many tickers are
+    watched. Matches are filtered to the batch afterwards.
+    """
+
+    def __init__(self, company_map: Dict[str, str], tickers: Optional[List[str]] = None):
+        self.company_map = company_map
+        universe = [t.upper() for t in (tickers if tickers is not None else company_map.keys())]
+        self.tickers = set(universe)
+
+        self.names: Dict[str, str] = {}
+        self.name_tokens: Dict[str, List[str]] = {}
+        for t in self.tickers:
+            name = (company_map.get(t) or "").strip()
+            if name:
+                self.names[t] = name
+                self.name_tokens[t] = [tok for tok in re.split(r"\s+", name.lower()) if tok]
+
+        # Tier 2: normalized names; tier 3: whitespace-free names
+        normalized: Dict[str, List[str]] = {}
+        compact: Dict[str, List[str]] = {}
+        for t, name in self.names.items():
+            name_n = _normalize_text(name)
+            if name_n:
+                normalized.setdefault(name_n, []).append(t)
+            name_compact = re.sub(r"\s+", "", name.lower())
+            if name_compact:
+                compact.setdefault(name_compact, []).append(t)
+        self._normalized = KeywordAutomaton(normalized)
+        self._normalized_owners = [normalized[p] for p in self._normalized.patterns]
+        self._compact = KeywordAutomaton(compact)
+        self._compact_owners = [compact[p] for p in self._compact.patterns]
+
+        # Tier 4: every name token; a ticker is checked only when its rarest
+        # token is present, since all of its tokens have to be
+        token_freq: Dict[str, int] = {}
+        for tokens in self.name_tokens.values():
+            for tok in set(tokens):
+                token_freq[tok] = token_freq.get(tok, 0) + 1
+        self._tokens = KeywordAutomaton(token_freq)
+        self._token_sets: Dict[str, frozenset] = {}
+        self._anchored: Dict[str, List[str]] = {}
+        for t, tokens in self.name_tokens.items():
+            if not tokens:
+                continue
+            self._token_sets[t] = frozenset(tokens)
+            anchor = min(tokens, key=lambda tok: (token_freq[tok], tok))
+            self._anchored.setdefault(anchor, []).append(t)
+
+        # Tier 5: name tokens long enough for fuzzy matching
+        self._fuzzy_owners: Dict[str, set] = {}
+        for t, tokens in self.name_tokens.items():
+            for tok in tokens:
+                if len(tok) >= FUZZY_MIN_TOKEN_LEN:
+                    self._fuzzy_owners.setdefault(tok, set()).add(t)
+        self._fuzzy = FuzzyTokenIndex(self._fuzzy_owners, FUZZY_MAX_DISTANCE)
+
+        # Tier 6: plain tickers are whole \w+ words; tickers with other
+        # characters (BRK.B) share one alternation. An alternation reports
+        # one ticker per position, so tickers that are a prefix of another
+        # are searched on their own.
+        self._word_tickers = {t for t in self.tickers if _WORD_TICKER_RE.fullmatch(t)}
+        special = sorted((t for t in self.tickers if t not in self._word_tickers), key=lambda t: (-len(t), t))
+        shadowed = {t for t in special if any(o != t and o.startswith(t) for o in special)}
+        combined = [t for t in special if t not in shadowed]
+        self._special_re = (
+            re.compile(r"(?=\b(" + "|".join(re.escape(t) for t in combined) + r")\b)") if combined else None
+        )
+        self._shadowed_res = [(t, re.compile(r"\b" + re.escape(t) + r"\b")) for t in sorted(shadowed)]
+
+        # Tier 7: URL tokens equal to a ticker or to a company-name token
+        self._url_lookup: Dict[str, set] = {}
+        for t in self.tickers:
+            self._url_lookup.setdefault(t.lower(), set()).add(t)
+        for t, tokens in self.name_tokens.items():
+            for tok in tokens:
+                self._url_lookup.setdefault(tok, set()).add(t)
+
+    def covers(self, company_map: Dict[str, str], batch: List[str]) -> bool:
+        return company_map is self.company_map and all(t.upper() in self.tickers for t in batch)
+
+    def exact_names(self, title_n: str, desc_n: str) -> set:
+        """Tier 2: tickers whose normalized name occurs in title or description"""
+        found = self._normalized.find_all(title_n) | self._normalized.find_all(desc_n)
+        return {t for pid in found for t in self._normalized_owners[pid]}
+
+    def compact_names(self, title_c: str, desc_c: str) -> set:
+        """Tier 3: tickers whose whitespace-free name occurs in the space-free text"""
+        found = self._compact.find_all(title_c) | self._compact.find_all(desc_c)
+        return {t for pid in found for t in self._compact_owners[pid]}
+
+    def all_tokens_present(self, text_n: str, url_joined: str) -> set:
+        """Tier 4: tickers whose every name token is a substring of text or URL"""
+        patterns = self._tokens.patterns
+        present = {patterns[pid] for pid in self._tokens.find_all(text_n) | self._tokens.find_all(url_joined)}
+        return {
+            t
+            for tok in present
+            for t in self._anchored.get(tok, ())
+            if self._token_sets[t] <= present
+        }
+
+    def fuzzy_matches(self, words: List[str]) -> set:
+        """Tier 5: tickers with a name token within FUZZY_MAX_DISTANCE edits of any word"""
+        found = set()
+        for word in set(words):
+            for tok in self._fuzzy.lookup(word):
+                found.update(self._fuzzy_owners[tok])
+        return found
+
+    def word_boundary(self, texts: List[str]) -> set:
+        """Tier 6: tickers appearing as whole words in any of the (uppercased) texts"""
+        found = set()
+        for text in texts:
+            if not text:
+                continue
+            words = set(_WORD_TICKER_RE.findall(text))
+            found.update(words & self._word_tickers)
+            if self._special_re is not None:
+                found.update(m.group(1) for m in self._special_re.finditer(text))
+            for t, pat in self._shadowed_res:
+                if pat.search(text):
+                    found.add(t)
+        return found
+
+    def url_matches(self, url_tokens: List[str]) -> set:
+        """Tier 7: tickers whose symbol or a name token is a URL token"""
+        found = set()
+        for tok in set(url_tokens):
+            found.update(self._url_lookup.get(tok, ()))
+        return found
+
+_detection_index: Optional[TickerDetectionIndex] = None
+
+def get_detection_index(company_map: Dict[str, str], batch: List[str]) -> TickerDetectionIndex:
+    """Return the shared detection index, rebuilding it when the batch is not covered"""
+    global _detection_index
+    index = _detection_index
+    if index is None or not index.covers(company_map, batch):
+        tickers = {t.upper() for t in batch}
+        if index is not None and index.company_map is company_map:
+            tickers |= index.tickers
+        index = TickerDetectionIndex(company_map, sorted(tickers))
+        _detection_index = index
+    return index
+
+class _SortedOnFormat:
+    # Defers sorted() of a tier's ticker set until the record is actually formatted
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self) -> str:
+        return str(sorted(self.value)) if isinstance(self.value, set) else str(self.value)
+
+def _log_tier(tier: int, message: str, tickers: Any):
+    TIER_MATCHES.inc(tier=tier)  # counted even when tier logging is off
+    if not EXT_MATCH_LOG_TIER:
+        return
+    if LOG_MODE == "structured":
+        tier_counter.add(f"tier{tier}")  # reported once per batch by main_loop
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(message + " (tier %d)", _SortedOnFormat(tickers), tier)
+
+def detect_tickers_extended(article: Dict[str, Any], batch: List[str], company_map: Dict[str, str],
+                            index: Optional[TickerDetectionIndex] = None) -> List[str]:
     title = (article.get("title") or "")
     desc = (article.get("description") or "")
     content = (article.get("content") or "")
@@ -552,134 +914,61 @@ def detect_tickers_extended(article: Dict[str, Any], batch: List[str], company_m
             if ut in batch:
                 tks.append(ut)
         if tks:
-            if EXT_MATCH_LOG_TIER:
-                logger.info(f"Detected tickers via MarketAux field: {tks} (tier 1)")
+            _log_tier(1, "Detected tickers via MarketAux field: %s", tks)
             return list(dict.fromkeys(tks))
 
+    if index is None or not index.covers(company_map, batch):
+        index = get_detection_index(company_map, batch)
+    in_batch = {t.upper() for t in batch}
+
     title_n = _normalize_text(title)
     desc_n = _normalize_text(desc)
     text_n = _normalize_text(text_full)
     url_n = (url or "").lower()
     url_tokens = _url_tokens(url_n)
 
-    matched = set()
-
-    def company_name_for(ticker: str) -> str:
-        return (company_map.get(ticker.upper()) or "").strip()
-
     # TIER 2: exact company name in title or description
-    for t in batch:
-        name = company_name_for(t)
-        if not name:
-            continue
-        name_n = _normalize_text(name)
-        if name_n and (name_n in title_n or name_n in desc_n):
-            matched.add(t.upper())
+    matched = index.exact_names(title_n, desc_n) & in_batch
     if matched:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"Matched by exact company name in title/desc: {sorted(matched)} (tier 2)")
+        _log_tier(2, "Matched by exact company name in title/desc: %s", matched)
         return sorted(matched)
 
     # TIER 3: run-together / partial name match (remove spaces)
-    for t in batch:
-        name = company_name_for(t)
-        if not name:
-            continue
-        name_compact = re.sub(r"\s+", "", name.lower())
-        if name_compact and (name_compact in title.lower().replace(" ", "") or name_compact in desc.lower().replace(" ", "")):
-            matched.add(t.upper())
+    matched = index.compact_names(title.lower().replace(" ", ""), desc.lower().replace(" ", "")) & in_batch
     if matched:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"Matched by run-together company name: {sorted(matched)} (tier 3)")
+        _log_tier(3, "Matched by run-together company name: %s", matched)
         return sorted(matched)
 
     # TIER 4: token presence — all significant tokens from company name must appear somewhere
-    for t in batch:
-        name = company_name_for(t)
-        if not name:
-            continue
-        tokens = [tok for tok in re.split(r"\s+", name.lower()) if tok]
-        if not tokens:
-            continue
-        found_all = True
-        for tok in tokens:
-            if tok in title_n or tok in desc_n or tok in text_n or tok in " ".join(url_tokens):
-                continue
-            else:
-                found_all = False
-                break
-        if found_all:
-            matched.add(t.upper())
+    # (title_n and desc_n are substrings of text_n, so text_n covers all three)
+    matched = index.all_tokens_present(text_n, " ".join(url_tokens)) & in_batch
     if matched:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"Matched by token presence of full company name: {sorted(matched)} (tier 4)")
+        _log_tier(4, "Matched by token presence of full company name: %s", matched)
         return sorted(matched)
 
     # TIER 5: fuzzy token matching (Levenshtein) on tokens >= FUZZY_MIN_TOKEN_LEN
-    for t in batch:
-        name = company_name_for(t)
-        if not name:
-            continue
-        tokens = [tok for tok in re.split(r"\s+", name.lower()) if tok]
-        good = False
-        for tok in tokens:
-            if len(tok) < FUZZY_MIN_TOKEN_LEN:
-                continue
-            title_tokens = [w for w in re.split(r"[^a-z0-9]+", title.lower()) if w]
-            for wt in title_tokens:
-                dist = levenshtein(tok, wt)
-                if dist <= FUZZY_MAX_DISTANCE:
-                    good = True
-                    break
-            if good:
-                break
-            for ut in url_tokens:
-                dist = levenshtein(tok, ut)
-                if dist <= FUZZY_MAX_DISTANCE:
-                    good = True
-                    break
-            if good:
-                break
-        if good:
-            matched.add(t.upper())
+    title_tokens = [w for w in re.split(r"[^a-z0-9]+", title.lower()) if w]
+    matched = index.fuzzy_matches(title_tokens + url_tokens) & in_batch
     if matched:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"Matched by fuzzy token similarity: {sorted(matched)} (tier 5)")
+        _log_tier(5, "Matched by fuzzy token similarity: %s", matched)
         return sorted(matched)
 
     # TIER 6: ticker word-boundary match in text
-    for t in batch:
-        pat = r"\b" + re.escape(t.upper()) + r"\b"
-        if re.search(pat, title.upper()) or re.search(pat, desc.upper()) or re.search(pat, content.upper()):
-            matched.add(t.upper())
+    matched = index.word_boundary([title.upper(), desc.upper(), content.upper()]) & in_batch
     if matched:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"Matched by ticker word-boundary in text: {sorted(matched)} (tier 6)")
+        _log_tier(6, "Matched by ticker word-boundary in text: %s", matched)
         return sorted(matched)
 
     # TIER 7: URL token direct match
-    for t in batch:
-        if t.lower() in url_tokens:
-            matched.add(t.upper())
-            continue
-        name = company_name_for(t)
-        if not name:
-            continue
-        name_tokens = [tok for tok in re.split(r"\s+", name.lower()) if tok]
-        for nt in name_tokens:
-            if nt in url_tokens or nt.replace(" ", "") in url_tokens:
-                matched.add(t.upper())
-                break
+    matched = index.url_matches(url_tokens) & in_batch
     if matched:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"Matched by URL token matching: {sorted(matched)} (tier 7)")
+        _log_tier(7, "Matched by URL token matching: %s", matched)
         return sorted(matched)
 
     # FINAL fallback (tier 8)
     fallback = batch[0].upper() if batch else ""
     if fallback:
-        if EXT_MATCH_LOG_TIER:
-            logger.info(f"No tickers detected — assigning fallback {fallback} (tier 8)")
+        _log_tier(8, "No tickers detected — assigning fallback %s", fallback)
         return [fallback]
     return []
 
@@ -720,7 +1009,6 @@ def system_diagnostics(watchlist: List[str], company_map: Dict[str, str]):
             cnt = cur.fetchone()["cnt"]
             cur.execute("SELECT COUNT(1) as cnt2 FROM article_tickers")
             cnt2 = cur.fetchone()["cnt2"]
-            conn.close()
             logger.info(f"DB articles: {cnt}, article_tickers: {cnt2}")
         except Exception as e:
             logger.warning(f"DB diagnostic failed: {e}")
@@ -735,7 +1023,8 @@ def system_diagnostics(watchlist: List[str], company_map: Dict[str, str]):
 def chunk_list(lst: List[str], n: int) -> List[List[str]]:
     return [lst[i:i + n] for i in range(0, len(lst), n)]
 
-def main_loop():
+def main_loop(max_cycles: Optional[int] = None):
+    """Run scan cycles forever, or stop after `max_cycles` (benchmarks / one-shot runs)."""
     if not MARKETAUX_API_KEY:
         logger.error("MARKETAUX_API_KEY not set. Export it to the environment and restart.")
         return
@@ -744,11 +1033,35 @@ def main_loop():
         logger.error("Watchlist empty. Add tickers to watchlist.txt and restart.")
         return
     company_map = load_company_map()
-    cooldown_mgr = CooldownManager()
+    seen_cache = SeenArticleCache(max_entries=SEEN_CACHE_SIZE, path=SEEN_CACHE_PATH).load()
+    atexit.register(seen_cache.save)  # entries added since the last timed save
+    logger.info(f"Seen-article cache loaded: {len(seen_cache)} entries from {SEEN_CACHE_PATH}")
 
     # Initialize / migrate DB
     init_and_migrate_db()
 
+    if METRICS_PORT:
+        serve_metrics(METRICS_PORT)
+        logger.info(f"Serving Prometheus metrics on :{METRICS_PORT}/metrics")
+
+    # HIGH alerts are queued here and posted by a background sender
+    outbox = DiscordOutbox(DB_PATH)
+    sender = None
+    if DISCORD_WEBHOOK_URL:
+        sender = DiscordOutboxSender(outbox, DISCORD_WEBHOOK_URL, batch_size=DISCORD_OUTBOX_BATCH).start()
+    else:
+        logger.warning("DISCORD_WEBHOOK_URL not set; HIGH alerts stay queued in the outbox.")
+    logger.info(f"Discord outbox: {outbox.counts()}")
+
+    scheduler = None
+    if ADAPTIVE_POLLING:
+        # Default budget: what polling the whole watchlist every CYCLE_SECONDS costs (page 1 only)
+        budget = POLL_BUDGET_PER_HOUR or math.ceil(len(watchlist) / BATCH_SIZE) * 3600 / max(CYCLE_SECONDS, 60)
+        scheduler = AdaptivePollScheduler(DB_PATH, budget, BATCH_SIZE,
+                                          POLL_MIN_INTERVAL_MINUTES * 60, POLL_MAX_INTERVAL_MINUTES * 60)
+        logger.info(f"Adaptive polling on: budget {budget:.1f} calls/hour, "
+                    f"intervals {POLL_MIN_INTERVAL_MINUTES:g}-{POLL_MAX_INTERVAL_MINUTES:g} min.")
+
     # Diagnostics
     system_diagnostics(watchlist, company_map)
 
@@ -770,22 +1083,39 @@ def main_loop():
         logger.info(f"========== Bot 2.4 Startup ==========" if cycle_count == 1 else f"=== Cycle #{cycle_count} startup ===")
         logger.info("SQLite MED DB ready.")
         watchlist = load_watchlist()
+        detection_index = get_detection_index(company_map, watchlist)  # rebuilt only if the watchlist grew
         total_tickers = len(watchlist)
         logger.info(f"Cycle composition: {total_tickers} personal + 0 random = {total_tickers} total.")
         published_after_candidates = try_multiple_ts_formats(last_dt)
-        batches = chunk_list(watchlist, BATCH_SIZE)
+        if scheduler is not None:
+            scheduler.sync(watchlist)
+            batches = scheduler.due_batches()
+            logger.info(f"Adaptive polling: {sum(len(b) for b in batches)} tickers due in {len(batches)} batches "
+                        f"({scheduler.calls_last_hour()} calls in the last hour).")
+        else:
+            batches = chunk_list(watchlist, BATCH_SIZE)
         fetched_total = 0
         kept_total = 0
-        posted_total = 0
+        queued_total = 0
         cycle_end_ts = format_timestamp_z(now_utc())
         logger.info(f"Starting news scan cycle. published_after candidates: {published_after_candidates[0]}")
 
         for batch_idx, batch in enumerate(batches, start=1):
             batch_articles: List[Dict[str, Any]] = []
+            batch_since = last_dt
+            batch_candidates = published_after_candidates
+            if scheduler is not None:
+                # Read back only to this batch's last poll (its tickers may have been polled at different times)
+                last_polled = scheduler.since(batch)
+                if last_polled is not None:
+                    batch_since = datetime.fromtimestamp(last_polled, timezone.utc) - timedelta(minutes=POLL_OVERLAP_MINUTES)
+                    batch_candidates = try_multiple_ts_formats(batch_since)
+            calls_before = marketaux_calls
+            batch_pa = batch_candidates[0]
             raw_response = None
             success = False
-            for pa in published_after_candidates:
-                logger.info(f"Outbound URL: https://api.marketaux.com/v1/news/all?symbols={','.join(batch)}&published_after={pa}&page=1")
+            for pa in batch_candidates:
+                logger.info("Outbound URL: %s/v1/news/all?symbols=%s&published_after=%s&page=1", MARKETAUX_BASE_URL, ",".join(batch), pa)
                 articles, raw_response = marketaux_fetch_batch(batch, pa, page=1)
                 if raw_response and isinstance(raw_response, dict) and raw_response.get("error"):
                     code = raw_response["error"].get("code")
@@ -795,35 +1125,55 @@ def main_loop():
                         continue
                 if articles is not None:
                     batch_articles = articles
+                    batch_pa = pa
                     success = True
                     break
             if not success:
                 logger.warning("Batch fetch failed or returned no data; continuing to next batch.")
+                if scheduler is not None:
+                    scheduler.record_calls(marketaux_calls - calls_before)
                 continue
 
-            fetched = len(batch_articles)
-            fetched_total += fetched
-            logger.info(f"Fetched {fetched} articles for batch ({','.join(batch)})")
-
+            fetched = 0
             kept_in_batch = 0
-            posted_in_batch = 0
+            queued_in_batch = 0
+            new_counts: Dict[str, int] = {}
+            high_counts: Dict[str, int] = {}
 
-            for art in batch_articles:
+            # Stream remaining pages straight into scoring; stop at articles older than the cursor
+            for art in iter_marketaux_articles(batch, batch_pa, since=batch_since, first_page=(batch_articles, raw_response)):
+                fetched += 1
                 title = art.get("title", "") or ""
                 desc = art.get("description", "") or ""
                 url = art.get("url", "") or art.get("link", "") or ""
                 published_at = art.get("published_at") or art.get("published_at_local") or ""
                 content = art.get("content", "") or ""
 
-                article_tickers = detect_tickers_extended(art, batch, company_map)
+                # Canonical hash
+                art_hash = canonical_article_hash(title, url, published_at or "")
+
+                # Already fully processed (this cycle or an earlier one): skip
+                # detection, scoring and DB. Keyed on the article alone, since batch
+                # composition changes from cycle to cycle under adaptive polling.
+                seen_key = f"bot:{art_hash}"
+                seen = seen_cache.get(seen_key) is not None
+                CACHE_LOOKUPS.inc(cache="seen", result="hit" if seen else "miss")
+                if seen:
+                    continue
+
+                with STAGE_SECONDS.time("detect"):
+                    article_tickers = detect_tickers_extended(art, batch, company_map, detection_index)
                 if not article_tickers:
                     article_tickers = [batch[0].upper()] if batch else []
 
                 # Compute severity & score
-                severity, score = weighted_severity(art)
-
-                # Canonical hash
-                art_hash = canonical_article_hash(title, url, published_at or "")
+                with STAGE_SECONDS.time("score"):
+                    severity, score = weighted_severity(art)
+                ARTICLES.inc(severity=severity)
+                for t in article_tickers:
+                    new_counts[t] = new_counts.get(t, 0) + 1
+                    if severity == "HIGH":
+                        high_counts[t] = high_counts.get(t, 0) + 1
 
                 # Check if article already exists
                 existing = find_article_by_hash(art_hash)
@@ -833,9 +1183,10 @@ def main_loop():
                 if severity == "HIGH":
                     # For HIGH: if article already posted, skip posting; else we post once including all tickers
                     if existing and existing_posted:
-                        logger.info(f"HIGH article already posted (hash): skipping post. {title[:80]}")
+                        logger.info("HIGH article already posted (hash): skipping post. %s", title[:80])
                         # Ensure tickers are linked
-                        _, _ = save_article_and_link(title, desc, url, severity, score, published_at or "", article_tickers, mark_posted=False)
+                        art_id, _ = save_article_and_link(title, desc, url, severity, score, published_at or "", article_tickers, mark_posted=False)
+                        seen_cache.add(seen_key, art_id, severity, score)
                         kept_in_batch += 1
                     else:
                         # Save, link, post
@@ -843,41 +1194,83 @@ def main_loop():
                         linked_tickers = get_tickers_for_article_by_hash(art_hash) if existing else []
                         combined_tickers = sorted(set([t.upper() for t in (linked_tickers + article_tickers)]))
                         summary = build_article_summary(combined_tickers, company_map, "HIGH", score, art)
-                        success_post = post_to_discord(summary)
-                        if success_post:
-                            # Save and mark posted
-                            art_id, _ = save_article_and_link(title, desc, url, "HIGH", score, published_at or "", combined_tickers, mark_posted=True)
-                            posted_in_batch += 1
-                            logger.info(f"Posted HIGH: tickers={combined_tickers} title={title[:80]}")
+                        # Save now; the outbox sender marks it posted once Discord accepts it.
+                        # The outbox holds each hash once, so of several bot instances only one queues it.
+                        art_id, _ = save_article_and_link(title, desc, url, "HIGH", score, published_at or "", combined_tickers, mark_posted=False)
+                        if outbox.enqueue(art_hash, summary):
+                            queued_in_batch += 1
+                            logger.info("Queued HIGH: tickers=%s title=%s", combined_tickers, title[:80],
+                                        extra={"fields": {"event": "high_queued", "tickers": combined_tickers, "score": score, "hash": art_hash}})
                         else:
-                            # Save but don't mark posted
-                            art_id, _ = save_article_and_link(title, desc, url, "HIGH", score, published_at or "", combined_tickers, mark_posted=False)
-                            logger.info(f"Saved HIGH (not posted): tickers={combined_tickers} title={title[:80]}")
+                            logger.info("HIGH already in Discord outbox: skipping. %s", title[:80])
+                        seen_cache.add(seen_key, art_id, "HIGH", score)
                         kept_in_batch += 1
 
                 elif severity == "MED":
                     # Save MED once (if duplicate, it will link tickers)
                     art_id, inserted_flag = save_article_and_link(title, desc, url, "MED", score, published_at or "", article_tickers, mark_posted=False)
-                    logger.info(f"MED saved to DB: {','.join(article_tickers)} | {score:.2f} — {title[:120]}")
+                    if art_id != -1:
+                        seen_cache.add(seen_key, art_id, "MED", score)
+                    if article_log_sampler.should_log("med_saved"):
+                        logger.info("MED saved to DB: %s | %.2f — %s", ",".join(article_tickers), score, title[:120],
+                                    extra={"fields": {"event": "med_saved", "tickers": article_tickers, "score": score,
+                                                      "sample_every": article_log_sampler.every}})
                     kept_in_batch += 1
 
                 else:  # LOW
                     # For LOW we don't save unless you want to; keep previous behavior (skip)
-                    logger.debug(f"LOW: {','.join(article_tickers)} - {title[:120]}")
+                    logger.debug("LOW: %s - %s", ",".join(article_tickers), title[:120])
+                    seen_cache.add(seen_key, None, "LOW", score)
                     # Optionally link low articles? Currently skip saving.
                     # If you want to persist LOW, call save_article_and_link similarly.
                     # kept_in_batch unchanged
 
+            if scheduler is not None:
+                scheduler.record_calls(marketaux_calls - calls_before)
+                scheduler.record(batch, new_counts, high_counts)
+            fetched_total += fetched
+            logger.info(f"Fetched {fetched} articles for batch ({','.join(batch)})")
             kept_total += kept_in_batch
-            posted_total += posted_in_batch
-            logger.info(f"Batch {batch_idx}/{len(batches)} result: fetched={fetched} kept={kept_in_batch} posted={posted_in_batch}")
+            queued_total += queued_in_batch
+            logger.info(f"Batch {batch_idx}/{len(batches)} result: fetched={fetched} kept={kept_in_batch} queued={queued_in_batch}",
+                        extra={"fields": {"event": "batch", "batch": batch_idx, "fetched": fetched,
+                                          "kept": kept_in_batch, "queued": queued_in_batch}})
+            tier_counter.flush(logger, f"Detection tiers for batch {batch_idx}/{len(batches)}:",
+                               fields={"event": "detection_tiers", "batch": batch_idx})
             time.sleep(0.2)
 
-        logger.info(f"Cycle summary: fetched={fetched_total} kept={kept_total} posted={posted_total}")
+        logger.info(f"Cycle summary: fetched={fetched_total} kept={kept_total} queued={queued_total}")
+        logger.info(f"Discord outbox: {outbox.counts()}")
+        logger.info(f"Seen-article cache: {seen_cache.stats()}")
+        if METRICS_SNAPSHOT_PATH:
+            try:
+                METRICS.write_snapshot(METRICS_SNAPSHOT_PATH)
+            except OSError as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+        try:
+            seen_cache.maybe_save(SEEN_CACHE_SAVE_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to save seen-article cache: {e}")
+        if scheduler is not None:
+            try:
+                scheduler.save()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to save poll schedule: {e}")
         write_last_timestamp(cycle_end_ts)
         logger.info(f"Cycle {cycle_count} completed ... (stored last_timestamp={cycle_end_ts})")
-        logger.info(f"Sleeping {CYCLE_SECONDS}s until next cycle.")
-        time.sleep(CYCLE_SECONDS)
+        if max_cycles is not None and cycle_count >= max_cycles:
+            # One-shot run: give the sender a chance to post what this run queued
+            if sender is not None:
+                if not sender.flush():
+                    logger.warning(f"Discord outbox not drained on exit: {outbox.counts()}")
+                sender.stop()
+            break
+        sleep_s = CYCLE_SECONDS
+        if scheduler is not None:
+            # Wake when the next ticker is due; re-check the watchlist at least every minimum interval
+            sleep_s = min(max(scheduler.seconds_until_due(), 1.0), POLL_MIN_INTERVAL_MINUTES * 60)
+        logger.info(f"Sleeping {sleep_s:.0f}s until next cycle.")
+        time.sleep(sleep_s)
 
 if __name__ == "__main__":
     try:
@@ -6,22 +6,67 @@ v1.0.0 - SaaS-compatible single-run scanner
 Stateless, multi-user, web-app safe.
 """
 
+import os
 import re
 import hashlib
+import logging
+import socket
 import sqlite3
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any, Tuple, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from keyword_matcher import Scorer
+from seen_cache import SeenArticleCache
+from response_cache import ResponseCache, make_key as response_cache_key
+from sqlite_storage import get_storage
+from rate_limiter import ApiGate
+from scan_profiler import ScanProfiler, PROFILE_THREADS
+from scanner_metrics import (
+    REGISTRY as METRICS, STAGE_SECONDS, CACHE_LOOKUPS, ARTICLES, record_api_response, merge_snapshot_dir
+)
+
+logger = logging.getLogger(__name__)
 
 # ============================================================================
 # Configuration
 # ============================================================================
 
+# MarketAux endpoint (override to point scans at a local stand-in)
+MARKETAUX_BASE_URL = os.getenv("MARKETAUX_BASE_URL", "https://api.marketaux.com").rstrip("/")
+
 # Severity thresholds (can later be per-user / per-plan)
 HIGH_THRESHOLD = 2.75
 MED_THRESHOLD = 1.25
 BATCH_SIZE = 10
 
+# Concurrent fetching: batches in flight at once, and keep-alive pool size
+FETCH_CONCURRENCY = 8
+HTTP_POOL_SIZE = 16
+
+# Pagination: upper bound on pages read per batch and scan
+MAX_PAGES = 10
+
+# Per-ticker scan cursors: re-read this window before each cursor for late arrivals
+CURSOR_OVERLAP_MINUTES = 10
+FLEET_CURSOR_SCOPE = 0  # cursor scope used by run_fleet_scan (watchlist ids start at 1)
+FLEET_SEEN_SCOPE = "fleet:"  # seen-cache key prefix used by run_fleet_scan
+
+# Shared MarketAux response cache (off until configure_response_cache() is called)
+RESPONSE_CACHE_TTL_SECONDS = 300
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Host-wide MarketAux rate limit and circuit breaker (off until configure_rate_limiter() is called)
+MARKETAUX_MAX_RETRIES = 3
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOL_OFF_SECONDS = 60
+
+# Opt-in per-scan profiling (run_single_scan(profile=True)): rows per report
+PROFILE_TOP_N = 30
+
 # ============================================================================
 # Keyword scoring (UNCHANGED)
 # ============================================================================
@@ -36,6 +81,9 @@ keyword_weights = {
 }
 keyword_weights = {k.lower(): v for k, v in keyword_weights.items()}
 
+# Compiled once; scores an article in a single pass over its text
+scorer = Scorer(keyword_weights)
+
 # ============================================================================
 # Utility helpers
 # ============================================================================
@@ -57,15 +105,20 @@ def canonical_article_hash(title: str, url: str, published_at: str) -> str:
     ])
     return hashlib.sha256(base.encode("utf-8")).hexdigest()
 
+def article_symbols(article: Dict[str, Any], batch: List[str]) -> List[str]:
+    """Batch tickers the article is tagged with (MarketAux entities, else its tickers field)"""
+    in_batch = {t.upper() for t in batch}
+    symbols = [ent.get("symbol") for ent in article.get("entities") or [] if isinstance(ent, dict)]
+    symbols += article.get("tickers") or []
+    return list(dict.fromkeys(s.upper() for s in symbols if s and s.upper() in in_batch))
+
 # ============================================================================
 # Database operations
 # ============================================================================
 
 def connect_db(db_path: str):
-    """Connect to SQLite database"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """This thread's pooled connection to the database (WAL; do not close it)"""
+    return get_storage(db_path).connection()
 
 def save_article(
     *,
@@ -82,55 +135,328 @@ def save_article(
     db_path: str
 ) -> int:
     """Save article to database with transaction safety"""
-    art_hash = canonical_article_hash(title, url, published_at)
-    
-    conn = connect_db(db_path)
-    conn.execute("BEGIN TRANSACTION")
-    
-    try:
-        cur = conn.cursor()
-        
-        # Insert article
-        cur.execute("""
-            INSERT OR IGNORE INTO articles
-            (user_id, watchlist_id, title, description, url,
-             severity, score, hash, published_at, detected_at, posted)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?)
-        """, (
-            user_id, watchlist_id, title, description, url,
-            severity, score, art_hash, published_at, 1 if mark_posted else 0
+    art_id = save_articles_bulk([{
+        "user_id": user_id,
+        "watchlist_id": watchlist_id,
+        "title": title,
+        "description": description,
+        "url": url,
+        "severity": severity,
+        "score": score,
+        "published_at": published_at,
+        "tickers": tickers,
+        "mark_posted": mark_posted
+    }], db_path=db_path)[0]
+
+    if art_id is None:
+        raise ValueError("Failed to retrieve article ID after insert")
+    return art_id
+
+# Rows per multi-row INSERT; keeps bound parameters under SQLite's 999 limit
+ARTICLE_INSERT_CHUNK = 80
+TICKER_INSERT_CHUNK = 200
+
+def save_articles_bulk(
+    records: List[Dict[str, Any]],
+    db_path: str,
+    cursor_scope: Optional[int] = None,
+    cursors: Optional[Dict[str, Tuple[str, Optional[str], Optional[str]]]] = None
+) -> List[Optional[int]]:
+    """
+    Save many articles in one connection and one transaction.
+
+    Each record holds user_id, watchlist_id, title, description, url,
+    severity, score, published_at, tickers and mark_posted (hash is
+    computed when missing). Articles and article_tickers are written with
+    multi-row INSERT OR IGNORE statements, and ids are resolved with one
+    SELECT per chunk instead of one per article.
+
+    If cursors (ticker -> (published_at, backfill_before, backfill_head),
+    see advance_ticker_cursors) are given, they are stored for cursor_scope
+    in the same transaction, so a cursor never moves past articles that
+    were not stored.
+
+    Returns:
+        Article ids aligned with records; None where no row could be
+        resolved for the record's (hash, user_id, watchlist_id).
+    """
+    if not records and not cursors:
+        return []
+
+    rows = []
+    for rec in records:
+        art_hash = rec.get("hash") or canonical_article_hash(
+            rec["title"], rec["url"], rec["published_at"]
+        )
+        rows.append((
+            rec["user_id"], rec["watchlist_id"], rec["title"], rec["description"],
+            rec["url"], rec["severity"], rec["score"], art_hash,
+            rec["published_at"], 1 if rec.get("mark_posted") else 0
         ))
-        
-        # Get article ID
-        cur.execute("""
-            SELECT id FROM articles 
-            WHERE hash=? AND user_id=? AND watchlist_id=?
-        """, (art_hash, user_id, watchlist_id))
-        
-        row = cur.fetchone()
-        if not row:
-            conn.rollback()
-            conn.close()
-            raise ValueError("Failed to retrieve article ID after insert")
-        
-        art_id = row["id"]
-        
+
+    def write(conn) -> List[Optional[int]]:
+        cur = conn.cursor()
+        ids_by_key: Dict[Tuple[str, int, int], int] = {}
+
+        for i in range(0, len(rows), ARTICLE_INSERT_CHUNK):
+            chunk = rows[i:i + ARTICLE_INSERT_CHUNK]
+
+            # Insert articles
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO articles
+                (user_id, watchlist_id, title, description, url,
+                 severity, score, hash, published_at, detected_at, posted)
+                VALUES """ + ", ".join(
+                    ["(?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?)"] * len(chunk)
+                ),
+                [v for row in chunk for v in row]
+            )
+
+            # Resolve article IDs for the whole chunk at once
+            hashes = list({row[7] for row in chunk})
+            cur.execute(
+                "SELECT id, hash, user_id, watchlist_id FROM articles WHERE hash IN ("
+                + ", ".join(["?"] * len(hashes)) + ")",
+                hashes
+            )
+            for r in cur.fetchall():
+                ids_by_key[(r["hash"], r["user_id"], r["watchlist_id"])] = r["id"]
+
+        art_ids = [ids_by_key.get((row[7], row[0], row[1])) for row in rows]
+
         # Insert tickers
-        for t in tickers:
-            cur.execute("""
+        ticker_rows = []
+        for rec, art_id in zip(records, art_ids):
+            if art_id is None:
+                continue
+            for t in rec.get("tickers") or []:
+                ticker_rows.append((art_id, t.upper(), rec["user_id"], rec["watchlist_id"]))
+
+        for i in range(0, len(ticker_rows), TICKER_INSERT_CHUNK):
+            chunk = ticker_rows[i:i + TICKER_INSERT_CHUNK]
+            cur.execute(
+                """
                 INSERT OR IGNORE INTO article_tickers
                 (article_id, ticker, user_id, watchlist_id)
-                VALUES (?, ?, ?, ?)
-            """, (art_id, t.upper(), user_id, watchlist_id))
-        
-        conn.commit()
-        return art_id
-        
+                VALUES """ + ", ".join(["(?, ?, ?, ?)"] * len(chunk)),
+                [v for row in chunk for v in row]
+            )
+
+        if cursors:
+            advance_ticker_cursors(conn, cursor_scope, cursors)
+
+        return art_ids
+
+    # One IMMEDIATE transaction, retried as a whole if the database stays locked
+    with STAGE_SECONDS.time("db_write"):
+        return get_storage(db_path).write(write)
+
+def save_articles_isolated(
+    records: List[Dict[str, Any]],
+    db_path: str,
+    cursor_scope: Optional[int] = None,
+    cursors: Optional[Dict[str, Tuple[str, Optional[str], Optional[str]]]] = None
+) -> List[Optional[int]]:
+    """
+    save_articles_bulk(), falling back to one transaction per article.
+
+    If the bulk transaction fails, each record is saved on its own so one
+    bad article cannot fail the whole scan; records that still fail are
+    logged and get None. The cursors are then advanced separately, held
+    (published_at, and backfill_head where a backfill is pending) at the
+    published_at of every failed article for the tickers it belongs to, so
+    a later scan fetches it again.
+    """
+    try:
+        return save_articles_bulk(records, db_path, cursor_scope, cursors)
     except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+        logger.warning(f"Bulk save of {len(records)} articles failed ({e}); saving one by one.")
+
+    art_ids: List[Optional[int]] = []
+    held = dict(cursors or {})
+    for rec in records:
+        try:
+            art_ids.append(save_articles_bulk([rec], db_path)[0])
+            continue
+        except Exception as e:
+            logger.warning(f"Failed to save article {rec.get('url')}: {e}")
+        art_ids.append(None)
+
+        published = parse_timestamp(rec["published_at"])
+        if published is None:
+            continue
+        for t in rec.get("tickers") or []:
+            t = t.upper()
+            if t not in held:
+                continue
+            cursor, before, head = held[t]
+            if published < parse_timestamp(cursor):
+                cursor = format_cursor(published)
+            if head is not None and published < parse_timestamp(head):
+                head = format_cursor(published)
+            held[t] = (cursor, before, head)
+
+    if held:
+        save_articles_bulk([], db_path, cursor_scope, held)
+    return art_ids
+
+# ============================================================================
+# Per-ticker scan cursors
+# ============================================================================
+
+def format_cursor(dt: datetime) -> str:
+    """Format a cursor timestamp at full precision (sortable as text)"""
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def ensure_cursor_table(conn):
+    """Create the ticker_cursors table if it does not exist yet (or add its backfill columns)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticker_cursors (
+            scope INTEGER NOT NULL,
+            ticker TEXT NOT NULL,
+            published_at TEXT NOT NULL,
+            backfill_before TEXT,
+            backfill_head TEXT,
+            updated_at TEXT DEFAULT (datetime('now')),
+            PRIMARY KEY (scope, ticker)
+        )
+    """)
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(ticker_cursors)").fetchall()}
+    for column in ("backfill_before", "backfill_head"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE ticker_cursors ADD COLUMN {column} TEXT")
+
+def load_cursor_rows(scope: int, tickers: List[str], db_path: str) -> Dict[str, sqlite3.Row]:
+    """Return ticker -> ticker_cursors row for the given scope"""
+    conn = connect_db(db_path)
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(ticker_cursors)").fetchall()}
+    if "backfill_head" not in columns:
+        get_storage(db_path).write(ensure_cursor_table)
+    rows = conn.execute(
+        "SELECT ticker, published_at, backfill_before, backfill_head FROM ticker_cursors WHERE scope=?",
+        (scope,)
+    ).fetchall()
+
+    wanted = {t.upper() for t in tickers}
+    return {r["ticker"]: r for r in rows if r["ticker"] in wanted}
+
+def load_ticker_cursors(scope: int, tickers: List[str], db_path: str) -> Dict[str, str]:
+    """Return ticker -> high-watermark published_at for the given scope"""
+    return {t: r["published_at"] for t, r in load_cursor_rows(scope, tickers, db_path).items()}
+
+def load_ticker_backfills(scope: int, tickers: List[str], db_path: str) -> Dict[str, Tuple[str, str]]:
+    """Return ticker -> (backfill_before, backfill_head) for tickers with an unread tail"""
+    return {
+        t: (r["backfill_before"], r["backfill_head"])
+        for t, r in load_cursor_rows(scope, tickers, db_path).items()
+        if r["backfill_before"] and r["backfill_head"]
+    }
+
+def advance_ticker_cursors(conn, scope: int, cursors: Dict[str, Tuple[str, Optional[str], Optional[str]]]):
+    """
+    Store (published_at, backfill_before, backfill_head) per ticker inside
+    the caller's transaction. published_at only moves forward (never
+    backward); the backfill columns are replaced.
+    """
+    ensure_cursor_table(conn)
+    conn.executemany("""
+        INSERT INTO ticker_cursors (scope, ticker, published_at, backfill_before, backfill_head, updated_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(scope, ticker) DO UPDATE SET
+            published_at = MAX(published_at, excluded.published_at),
+            backfill_before = excluded.backfill_before,
+            backfill_head = excluded.backfill_head,
+            updated_at = excluded.updated_at
+    """, [(scope, t.upper(), *state) for t, state in cursors.items()])
+
+def plan_cursor_batches(
+    tickers: List[str],
+    cursors: Dict[str, str],
+    fallback: Optional[str],
+    backfills: Optional[Dict[str, Tuple[str, str]]] = None
+) -> List[Tuple[List[str], Optional[str], Optional[str]]]:
+    """
+    Group tickers into batches with similar cursors.
+
+    Each batch fetches from its oldest cursor minus CURSOR_OVERLAP_MINUTES;
+    tickers without a cursor use the fallback timestamp (None = no filter).
+    Tickers with a backfill (see batch_cursor_updates) are batched apart and
+    page backwards through their unread tail: published_before is the
+    newest backfill_before of the batch (None for regular batches).
+
+    Returns:
+        [(batch, published_after, published_before)]
+    """
+    backfills = backfills or {}
+    overlap = timedelta(minutes=CURSOR_OVERLAP_MINUTES)
+    fallback_dt = parse_timestamp(fallback)
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+
+    def since(ticker: str) -> Optional[datetime]:
+        dt = parse_timestamp(cursors.get(ticker.upper()))
+        return dt - overlap if dt is not None else fallback_dt
+
+    def before(ticker: str) -> datetime:
+        return parse_timestamp(backfills[ticker.upper()][0])
+
+    plan = []
+    head = sorted((t for t in tickers if t.upper() not in backfills), key=lambda t: since(t) or oldest)
+    for i in range(0, len(head), BATCH_SIZE):
+        batch = head[i:i + BATCH_SIZE]
+        starts = [since(t) for t in batch]
+        start = None if any(dt is None for dt in starts) else min(starts)
+        plan.append((batch, format_cursor(start) if start is not None else None, None))
+
+    tail = sorted((t for t in tickers if t.upper() in backfills), key=before)
+    for i in range(0, len(tail), BATCH_SIZE):
+        batch = tail[i:i + BATCH_SIZE]
+        start = min(since(t) for t in batch)
+        plan.append((batch, format_cursor(start), format_cursor(max(before(t) for t in batch))))
+    return plan
+
+def batch_cursor_updates(
+    batch: List[str],
+    published_after: Optional[str],
+    published_before: Optional[str],
+    backfills: Dict[str, Tuple[str, str]],
+    newest: Optional[str],
+    oldest: Optional[str],
+    complete: bool
+) -> Dict[str, Tuple[str, Optional[str], Optional[str]]]:
+    """
+    New cursor rows for a batch once its window has been streamed.
+
+    MarketAux returns newest first, so when MAX_PAGES cuts a window short
+    the unread part is its tail, between published_after and the oldest
+    article read. A regular window read to the end moves the cursor to the
+    newest article. One that was cut keeps the cursor and records a
+    backfill: backfill_before (oldest article read) and backfill_head
+    (newest article read). Later scans page backwards through the tail with
+    published_before, lowering backfill_before as they go; once the tail
+    is read to the end, the cursor jumps to backfill_head. A window with no
+    published_after has no tail worth reading and counts as complete.
+
+    Returns:
+        ticker -> (published_at, backfill_before, backfill_head); tickers
+        that need no update are left out
+    """
+    updates = {}
+    for t in batch:
+        t = t.upper()
+        if t in backfills:
+            before, head = backfills[t]
+            if complete:
+                updates[t] = (head, None, None)
+            elif oldest is not None:
+                updates[t] = (published_after, min(before, oldest), head)
+        elif newest is None:
+            continue
+        elif complete or published_after is None:
+            updates[t] = (newest, None, None)
+        else:
+            updates[t] = (published_after, oldest, newest)
+    return updates
 
 # ============================================================================
 # Scoring logic (UNCHANGED)
@@ -138,13 +464,7 @@ def save_article(
 
 def score_text(text: str) -> float:
     """Calculate keyword score for text"""
-    if not text:
-        return 0.0
-    s = 0.0
-    text_l = text.lower()
-    for kw, w in keyword_weights.items():
-        s += text_l.count(kw) * w
-    return s
+    return scorer.score(text)
 
 def weighted_severity(article: Dict[str, Any]) -> Tuple[str, float]:
     """Calculate severity and score for article"""
@@ -165,32 +485,388 @@ def weighted_severity(article: Dict[str, Any]) -> Tuple[str, float]:
 # MarketAux API client
 # ============================================================================
 
-def marketaux_fetch(
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Return the shared keep-alive session used for MarketAux calls"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+_response_cache: Optional[ResponseCache] = None
+
+def configure_response_cache(
+    path: Optional[str],
+    ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+    max_bytes: int = RESPONSE_CACHE_MAX_BYTES
+) -> Optional[ResponseCache]:
+    """Enable (or with path=None disable) the on-disk MarketAux response cache"""
+    global _response_cache
+    _response_cache = ResponseCache(path, ttl_seconds, max_bytes) if path else None
+    return _response_cache
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the configured response cache, if any"""
+    return _response_cache
+
+_api_gate: Optional[ApiGate] = None
+
+def configure_rate_limiter(
+    path: Optional[str],
+    rate_per_second: float = 0.0,
+    burst: float = 1.0,
+    failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+    cool_off_seconds: float = CIRCUIT_COOL_OFF_SECONDS
+) -> Optional[ApiGate]:
+    """
+    Route MarketAux calls through a token bucket and circuit breaker shared
+    by every process using path (path=None turns it off).
+
+    rate_per_second should match the MarketAux plan; 0 keeps only the shared
+    Retry-After pause, retries and the breaker.
+    """
+    global _api_gate
+    _api_gate = ApiGate(
+        path, "marketaux", rate_per_second, burst,
+        failure_threshold=failure_threshold,
+        cool_off_seconds=cool_off_seconds,
+        max_retries=MARKETAUX_MAX_RETRIES
+    ) if path else None
+    return _api_gate
+
+def get_rate_limiter() -> Optional[ApiGate]:
+    """Return the configured MarketAux gate, if any"""
+    return _api_gate
+
+_snapshot_name: Tuple[int, str] = (0, "")
+
+def metrics_snapshot_name() -> str:
+    """
+    This process's snapshot file name: scanner-<host>-<pid>-<start ms>.json.
+
+    The start time keeps a worker that reuses an exited worker's pid from
+    overwriting (and so shrinking) that worker's totals. Worked out again
+    after a fork, so prefork Celery children each get their own file.
+    """
+    global _snapshot_name
+    pid = os.getpid()
+    if _snapshot_name[0] != pid:
+        _snapshot_name = (pid, f"scanner-{socket.gethostname()}-{pid}-{int(time.time() * 1000)}.json")
+    return _snapshot_name[1]
+
+def metrics_snapshot_stale(name: str) -> bool:
+    """True if name was written by a process of this host that has exited"""
+    if not name.startswith("scanner-") or not name.endswith(".json"):
+        return False
+    parts = name[len("scanner-"):-len(".json")].rsplit("-", 2)
+    if len(parts) != 3 or parts[0] != socket.gethostname() or not parts[1].isdigit():
+        return False  # another host's worker (or a legacy name): cannot tell from here
+    try:
+        os.kill(int(parts[1]), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+def write_metrics_snapshot(snapshot_dir: str) -> str:
+    """Dump this process's scanner metrics to snapshot_dir/<metrics_snapshot_name()>"""
+    path = os.path.join(snapshot_dir, metrics_snapshot_name())
+    METRICS.write_snapshot(path)
+    return path
+
+def render_metrics(snapshot_dir: Optional[str] = None) -> str:
+    """
+    Prometheus text for scanner metrics.
+
+    With snapshot_dir, the snapshots written there by every worker are
+    summed and this process's own snapshot file is replaced by its live
+    values. Files of exited workers on this host are folded into one
+    retired snapshot that keeps counting, so totals stay monotonic and
+    the directory does not grow with every worker restart.
+    """
+    if not snapshot_dir or not os.path.isdir(snapshot_dir):
+        return METRICS.render()
+    merged = merge_snapshot_dir(snapshot_dir, exclude=[metrics_snapshot_name()], is_stale=metrics_snapshot_stale)
+    merged.merge(METRICS.snapshot())
+    return merged.render()
+
+def parse_timestamp(ts: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 / MarketAux timestamp into an aware UTC datetime"""
+    if not ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(ts.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def marketaux_fetch_page(
     symbols: List[str],
     api_key: str,
-    published_after: Optional[str]
-) -> List[dict]:
-    """Fetch news from MarketAux API"""
-    url = "https://api.marketaux.com/v1/news/all"
+    published_after: Optional[str],
+    page: int = 1,
+    published_before: Optional[str] = None
+) -> Tuple[List[dict], Dict[str, Any]]:
+    """Fetch one page of news from MarketAux API; returns (articles, meta)"""
+    url = f"{MARKETAUX_BASE_URL}/v1/news/all"
     params = {
         "symbols": ",".join(symbols),
         "language": "en",
         "api_token": api_key,
-        "filter_entities": "true"  # Recommended by docs
+        "filter_entities": "true",  # Recommended by docs
+        "page": page
     }
     
-    # Convert ISO timestamp to YYYY-MM-DD format if provided
+    # Send the cursor at full precision (MarketAux accepts Y-m-d\TH:i:s)
     if published_after:
-        # Extract date part only (MarketAux expects YYYY-MM-DD, not full ISO)
-        if "T" in published_after:
-            params["published_after"] = published_after.split("T")[0]
+        published_dt = parse_timestamp(published_after)
+        if published_dt is not None:
+            params["published_after"] = published_dt.strftime("%Y-%m-%dT%H:%M:%S")
         else:
             params["published_after"] = published_after
     
-    r = requests.get(url, params=params, timeout=20)
+    # Rounded up to the next second so the article at the bound is read again
+    if published_before:
+        before_dt = parse_timestamp(published_before)
+        if before_dt is not None:
+            params["published_before"] = (before_dt + timedelta(seconds=1)).strftime("%Y-%m-%dT%H:%M:%S")
+        else:
+            params["published_before"] = published_before
+    
+    # Identical requests from other workers within the TTL are served from disk
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        extra = {"published_before": params["published_before"]} if published_before else {}
+        cache_key = response_cache_key(symbols, params.get("published_after"), page, **extra)
+        try:
+            data = cache.get(cache_key)
+        except sqlite3.Error:
+            data = None
+        CACHE_LOOKUPS.inc(cache="response", result="hit" if data is not None else "miss")
+        if data is not None:
+            return data.get("data") or [], data.get("meta") or {}
+    
+    def send() -> requests.Response:
+        with STAGE_SECONDS.time("fetch"):
+            resp = get_http_session().get(url, params=params, timeout=20)
+        record_api_response(resp.status_code)
+        return resp
+
+    # Through the gate: waits for a shared token, retries 429/5xx (sleeping only this batch's thread)
+    r = _api_gate.call(send) if _api_gate is not None else send()
     r.raise_for_status()
     data = r.json()
-    return data.get("data") or []
+    
+    if cache is not None:
+        try:
+            cache.put(cache_key, {"data": data.get("data") or [], "meta": data.get("meta") or {}})
+        except sqlite3.Error:
+            pass
+    return data.get("data") or [], data.get("meta") or {}
+
+def marketaux_fetch(
+    symbols: List[str],
+    api_key: str,
+    published_after: Optional[str]
+) -> List[dict]:
+    """Fetch news from MarketAux API (first page only)"""
+    return marketaux_fetch_page(symbols, api_key, published_after)[0]
+
+def iter_marketaux_articles(
+    symbols: List[str],
+    api_key: str,
+    published_after: Optional[str],
+    max_pages: int = MAX_PAGES,
+    published_before: Optional[str] = None
+):
+    """
+    Stream articles page by page, newest first.
+
+    Stops at the last page, after max_pages, or as soon as an article older
+    than published_after shows up (MarketAux returns newest first, so every
+    later article would be older as well). Only one page is held in memory.
+    published_before (optional) bounds the window from above.
+    
+    The generator's return value (StopIteration.value) is True when the
+    stream reached published_after or the last page, and False when it was
+    cut off by max_pages with older matching articles left unread.
+    """
+    cutoff = parse_timestamp(published_after)
+    
+    for page in range(1, max_pages + 1):
+        articles, meta = marketaux_fetch_page(symbols, api_key, published_after, page, published_before)
+        
+        for art in articles:
+            if cutoff is not None:
+                published = parse_timestamp(art.get("published_at"))
+                if published is not None and published < cutoff:
+                    return True
+            yield art
+        
+        # Last page reached?
+        limit = meta.get("limit") or len(articles)
+        found = meta.get("found")
+        if not articles or len(articles) < limit:
+            return True
+        if found is not None and page * limit >= found:
+            return True
+    
+    return False
+
+def map_batches(fn, batches: List[List[str]], max_concurrency: int = FETCH_CONCURRENCY) -> List[Any]:
+    """
+    Run fn(batch) for every ticker batch with bounded concurrency.
+
+    Results come back in the original batch order, so callers can still fall
+    back to the batch tickers per article. The first failing batch raises its
+    exception once all in-flight requests have finished.
+    """
+    if max_concurrency <= 1 or len(batches) <= 1:
+        return [fn(batch) for batch in batches]
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as pool:
+        return list(pool.map(fn, batches))
+
+# ============================================================================
+# Streaming scan pipeline
+# ============================================================================
+
+def scan_batch(
+    batch: List[str],
+    api_key: str,
+    published_after: Optional[str],
+    score_cache: Optional[Dict[str, Tuple[str, float]]] = None,
+    seen_cache: Optional[SeenArticleCache] = None,
+    seen_scope: str = "",
+    published_before: Optional[str] = None,
+    backfills: Optional[Dict[str, Tuple[str, str]]] = None
+) -> Tuple[int, List[Dict[str, Any]], Dict[str, Tuple[str, Optional[str], Optional[str]]]]:
+    """
+    Stream one batch's articles straight into scoring.
+
+    Only MED/HIGH articles are kept, reduced to the fields the scan stores,
+    so full article bodies never pile up in memory. score_cache (hash ->
+    (severity, score)) lets callers share scores across batches.
+
+    Articles found in seen_cache under seen_scope + hash were fully processed
+    by an earlier scan and are skipped before scoring. LOW articles are
+    recorded there right away; callers record kept ones once they are saved.
+    A kept article's tickers are the batch tickers MarketAux tagged it with
+    (empty when it carries no usable tags).
+
+    The window is published_after .. published_before (a backfill window,
+    see batch_cursor_updates, which also turns the stream's outcome into
+    the batch's new cursor rows; backfills are the batch tickers' loaded
+    backfill_before / backfill_head).
+    
+    Returns:
+        (fetched_count, kept_articles, cursor_updates)
+    """
+    fetched = 0
+    kept = []
+    newest: Optional[datetime] = None
+    oldest: Optional[datetime] = None
+    complete = False
+    
+    stream = iter_marketaux_articles(batch, api_key, published_after, published_before=published_before)
+    while True:
+        try:
+            art = next(stream)
+        except StopIteration as stop:
+            complete = bool(stop.value)
+            break
+        
+        fetched += 1
+        title = art.get("title", "")
+        url = art.get("url") or art.get("link") or ""
+        published_at = art.get("published_at") or ""
+        art_hash = canonical_article_hash(title, url, published_at)
+        
+        published_dt = parse_timestamp(published_at)
+        if published_dt is not None:
+            if newest is None or published_dt > newest:
+                newest = published_dt
+            if oldest is None or published_dt < oldest:
+                oldest = published_dt
+        
+        # Already processed for this scope: skip scoring and storage
+        if seen_cache is not None:
+            seen = seen_cache.get(seen_scope + art_hash) is not None
+            CACHE_LOOKUPS.inc(cache="seen", result="hit" if seen else "miss")
+            if seen:
+                continue
+        
+        if score_cache is None:
+            with STAGE_SECONDS.time("score"):
+                severity, score = weighted_severity(art)
+        else:
+            cached = score_cache.get(art_hash)
+            if cached is None:
+                with STAGE_SECONDS.time("score"):
+                    cached = score_cache[art_hash] = weighted_severity(art)
+            severity, score = cached
+        ARTICLES.inc(severity=severity)
+        
+        # Skip LOW severity articles
+        if severity == "LOW":
+            if seen_cache is not None:
+                seen_cache.add(seen_scope + art_hash, None, severity, score)
+            continue
+        
+        kept.append({
+            "title": title,
+            "description": art.get("description", ""),
+            "url": url,
+            "published_at": published_at,
+            "tickers": article_symbols(art, batch),
+            "severity": severity,
+            "score": score,
+            "hash": art_hash
+        })
+    
+    updates = batch_cursor_updates(
+        batch, published_after, published_before, backfills or {},
+        format_cursor(newest) if newest is not None else None,
+        format_cursor(oldest) if oldest is not None else None,
+        complete
+    )
+    return fetched, kept, updates
+
+def scan_batches(
+    plan: List[Tuple[List[str], Optional[str], Optional[str]]],
+    api_key: str,
+    max_concurrency: int = FETCH_CONCURRENCY,
+    score_cache: Optional[Dict[str, Tuple[str, float]]] = None,
+    seen_cache: Optional[SeenArticleCache] = None,
+    seen_scope: str = "",
+    backfills: Optional[Dict[str, Tuple[str, str]]] = None
+) -> List[Tuple[List[str], int, List[Dict[str, Any]], Dict[str, Tuple[str, Optional[str], Optional[str]]]]]:
+    """
+    Stream and score every (batch, published_after, published_before) window
+    of a cursor plan.
+
+    Returns:
+        [(batch, fetched, kept, cursor_updates)] in plan order
+    """
+    results = map_batches(
+        lambda item: scan_batch(item[0], api_key, item[1], score_cache, seen_cache, seen_scope,
+                                item[2], backfills),
+        plan,
+        max_concurrency
+    )
+    return [(item[0], *result) for item, result in zip(plan, results)]
 
 # ============================================================================
 # MAIN ENTRY POINT - SaaS-safe single scan
@@ -202,7 +878,11 @@ def run_single_scan(
     tickers: List[str],
     api_key: str,
     last_timestamp: str = None,
-    db_path: str = 'med_alerts.db'
+    db_path: str = 'med_alerts.db',
+    max_concurrency: int = FETCH_CONCURRENCY,
+    use_cursors: bool = True,
+    seen_cache: Optional[SeenArticleCache] = None,
+    profile: bool = False
 ) -> Dict[str, Any]:
     """
     Run a single news scan for given tickers.
@@ -212,8 +892,16 @@ def run_single_scan(
         watchlist_id: Database watchlist ID
         tickers: List of ticker symbols (e.g., ['AAPL', 'GOOGL'])
         api_key: MarketAux API key (provided by backend)
-        last_timestamp: ISO timestamp of last scan (e.g., '2024-01-15T10:30:00Z')
+        last_timestamp: ISO timestamp of last scan (e.g., '2024-01-15T10:30:00Z');
+            only used for tickers without a cursor when use_cursors is set
         db_path: Path to SQLite database file
+        max_concurrency: Ticker batches fetched in parallel (1 = sequential)
+        use_cursors: Fetch from per-ticker cursors stored for this watchlist
+            and advance them after the scan
+        seen_cache: Optional shared cache of articles already processed for
+            this watchlist; hits skip scoring and DB work
+        profile: Capture a CPU profile and allocation top-N of this scan
+            (slow; meant for sampled scans)
     
     Returns:
         {
@@ -233,9 +921,20 @@ def run_single_scan(
             ],
             "last_timestamp": str,
             "severity_counts": {"HIGH": int, "MED": int, "LOW": int},
+            "response_cache": dict,  # Only if the response cache is configured
+            "profile": {filename: bytes},  # Only if profile; gzip files, see scan_profiler
             "error": str  # Only if status == "error"
         }
     """
+    if profile:
+        # Worker threads cannot be profiled on every Python version: fetch on this thread then
+        if not PROFILE_THREADS:
+            max_concurrency = 1
+        with ScanProfiler(top_n=PROFILE_TOP_N) as profiler:
+            result = run_single_scan(user_id, watchlist_id, tickers, api_key, last_timestamp, db_path,
+                                     max_concurrency, use_cursors, seen_cache)
+        result["profile"] = profiler.artifacts()
+        return result
     
     try:
         # Validate inputs
@@ -262,74 +961,95 @@ def run_single_scan(
         # Initialize counters
         fetched_total = 0
         articles_out = []
+        records = []
         severity_counts = {"HIGH": 0, "MED": 0, "LOW": 0}
         max_published_at = last_timestamp or "1970-01-01T00:00:00Z"
         
-        # Process in batches
-        for i in range(0, len(tickers), BATCH_SIZE):
-            batch = tickers[i:i + BATCH_SIZE]
-            articles = marketaux_fetch(batch, api_key, last_timestamp)
-            fetched_total += len(articles)
+        # Plan batches from per-ticker cursors (or the single last_timestamp)
+        if use_cursors:
+            cursors = load_ticker_cursors(watchlist_id, tickers, db_path)
+            backfills = load_ticker_backfills(watchlist_id, tickers, db_path)
+            plan = plan_cursor_batches(tickers, cursors, last_timestamp, backfills)
+        else:
+            backfills = {}
+            plan = [(tickers[i:i + BATCH_SIZE], last_timestamp, None) for i in range(0, len(tickers), BATCH_SIZE)]
+        new_cursors: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+        
+        seen_scope = f"{watchlist_id}:"
+        by_hash: Dict[str, Dict[str, Any]] = {}
+        
+        # Stream and score all batches concurrently, then process in batch order
+        for batch, fetched, kept, cursor_updates in scan_batches(
+            plan, api_key, max_concurrency, {}, seen_cache, seen_scope, backfills
+        ):
+            fetched_total += fetched
+            new_cursors.update(cursor_updates)
             
-            for art in articles:
-                severity, score = weighted_severity(art)
+            for art in kept:
+                # Every batch ticker belongs to this watchlist: untagged articles go to the whole batch
+                art_tickers = art["tickers"] or [t.upper() for t in batch]
                 
-                # Skip LOW severity articles
-                if severity == "LOW":
+                # Same article from several batches: store once, merge tickers
+                existing = by_hash.get(art["hash"])
+                if existing is not None:
+                    existing["tickers"] = list(dict.fromkeys(existing["tickers"] + art_tickers))
                     continue
                 
-                # Extract article data
-                title = art.get("title", "")
-                desc = art.get("description", "")
-                url = art.get("url") or art.get("link") or ""
-                published_at = art.get("published_at") or ""
-                matched = art.get("tickers") or batch
-                
                 # Track newest timestamp
-                if published_at > max_published_at:
-                    max_published_at = published_at
+                if art["published_at"] > max_published_at:
+                    max_published_at = art["published_at"]
                 
-                # Save to database
-                try:
-                    save_article(
-                        user_id=user_id,
-                        watchlist_id=watchlist_id,
-                        title=title,
-                        description=desc,
-                        url=url,
-                        severity=severity,
-                        score=score,
-                        published_at=published_at,
-                        tickers=matched,
-                        mark_posted=(severity == "HIGH"),
-                        db_path=db_path
-                    )
-                    
-                    # Add to output
-                    severity_counts[severity] += 1
-                    articles_out.append({
-                        "title": title,
-                        "description": desc,
-                        "url": url,
-                        "severity": severity,
-                        "score": round(score, 2),
-                        "tickers": matched,
-                        "published_at": published_at,
-                        "hash": canonical_article_hash(title, url, published_at)
-                    })
-                    
-                except Exception as save_error:
-                    # Log but continue processing other articles
-                    continue
+                record = {
+                    **art,
+                    "tickers": art_tickers,
+                    "user_id": user_id,
+                    "watchlist_id": watchlist_id,
+                    "mark_posted": (art["severity"] == "HIGH")
+                }
+                by_hash[art["hash"]] = record
+                records.append(record)
+        
+        # Save to database in a single transaction, together with the cursors
+        # (article by article if that fails, so one bad article is skipped)
+        art_ids = save_articles_isolated(
+            records,
+            db_path=db_path,
+            cursor_scope=watchlist_id,
+            cursors=new_cursors if use_cursors else None
+        )
+        
+        for rec, art_id in zip(records, art_ids):
+            # Skip articles whose row could not be resolved
+            if art_id is None:
+                continue
+            
+            if seen_cache is not None:
+                seen_cache.add(seen_scope + rec["hash"], art_id, rec["severity"], rec["score"])
+            
+            # Add to output
+            severity_counts[rec["severity"]] += 1
+            articles_out.append({
+                "title": rec["title"],
+                "description": rec["description"],
+                "url": rec["url"],
+                "severity": rec["severity"],
+                "score": round(rec["score"], 2),
+                "tickers": rec["tickers"],
+                "published_at": rec["published_at"],
+                "hash": rec["hash"]
+            })
         
         # Return success response
-        return {
+        result = {
             "status": "success",
             "articles_found": len(articles_out),
             "articles": articles_out,
             "last_timestamp": max_published_at,
             "severity_counts": severity_counts
         }
+        if _response_cache is not None:
+            result["response_cache"] = _response_cache.stats()
+        return result
     
     except requests.exceptions.RequestException as e:
         return {
@@ -362,6 +1082,211 @@ def run_single_scan(
         }
 
 
+# ============================================================================
+# FLEET SCAN - one fetch per distinct ticker, fanned out to every watchlist
+# ============================================================================
+
+def load_ticker_subscriptions(db_path: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Map every watched ticker to the (user_id, watchlist_id) pairs holding it"""
+    rows = connect_db(db_path).execute("""
+        SELECT w.user_id, wt.watchlist_id, wt.ticker
+        FROM watchlist_tickers wt
+        JOIN watchlists w ON w.id = wt.watchlist_id
+    """).fetchall()
+
+    subscriptions: Dict[str, List[Tuple[int, int]]] = {}
+    for r in rows:
+        subscriptions.setdefault(r["ticker"].upper(), []).append((r["user_id"], r["watchlist_id"]))
+    return subscriptions
+
+def run_fleet_scan(
+    api_key: str,
+    last_timestamp: str = None,
+    db_path: str = 'med_alerts.db',
+    subscriptions: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+    max_concurrency: int = FETCH_CONCURRENCY,
+    use_cursors: bool = True,
+    seen_cache: Optional[SeenArticleCache] = None
+) -> Dict[str, Any]:
+    """
+    Scan the union of all watched tickers once and fan results out to tenants.
+
+    Each distinct ticker is fetched once per cycle and each article is scored
+    once, then saved for every (user_id, watchlist_id) that holds one of the
+    tickers MarketAux tagged the article with (untagged articles are not
+    routed). API calls grow with the number of distinct tickers instead of
+    the number of watchlists. Needs the per-tenant article key of
+    Migrations/005_articles_tenant_unique.sql.
+
+    Args:
+        api_key: MarketAux API key (provided by backend)
+        last_timestamp: ISO timestamp of last scan (e.g., '2024-01-15T10:30:00Z');
+            only used for tickers without a cursor when use_cursors is set
+        db_path: Path to SQLite database file
+        subscriptions: Optional ticker -> [(user_id, watchlist_id)] map;
+            loaded from watchlist_tickers when omitted
+        max_concurrency: Ticker batches fetched in parallel (1 = sequential)
+        use_cursors: Fetch from the fleet's per-ticker cursors and advance them
+        seen_cache: Optional shared cache of articles the fleet already fanned
+            out; hits skip scoring and DB work
+
+    Returns:
+        Same shape as run_single_scan, plus:
+        {
+            "tickers_scanned": int,
+            "watchlists": {
+                watchlist_id: {
+                    "user_id": int,
+                    "articles_found": int,
+                    "severity_counts": {"HIGH": int, "MED": int, "LOW": int}
+                }
+            }
+        }
+    """
+
+    try:
+        if not api_key:
+            return {
+                "status": "error",
+                "error": "No API key provided",
+                "articles_found": 0,
+                "articles": [],
+                "severity_counts": {"HIGH": 0, "MED": 0, "LOW": 0},
+                "last_timestamp": last_timestamp or "1970-01-01T00:00:00Z",
+                "tickers_scanned": 0,
+                "watchlists": {}
+            }
+
+        if subscriptions is None:
+            subscriptions = load_ticker_subscriptions(db_path)
+        tickers = sorted(subscriptions)
+
+        articles_out = []
+        records = []
+        severity_counts = {"HIGH": 0, "MED": 0, "LOW": 0}
+        watchlist_results: Dict[int, Dict[str, Any]] = {}
+        scored: Dict[str, Tuple[str, float]] = {}
+        routed: Dict[str, Dict[str, Any]] = {}
+        max_published_at = last_timestamp or "1970-01-01T00:00:00Z"
+
+        if use_cursors:
+            cursors = load_ticker_cursors(FLEET_CURSOR_SCOPE, tickers, db_path)
+            backfills = load_ticker_backfills(FLEET_CURSOR_SCOPE, tickers, db_path)
+            plan = plan_cursor_batches(tickers, cursors, last_timestamp, backfills)
+        else:
+            backfills = {}
+            plan = [(tickers[i:i + BATCH_SIZE], last_timestamp, None) for i in range(0, len(tickers), BATCH_SIZE)]
+        new_cursors: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+
+        # Stream and score every batch; the shared cache scores each article once
+        for batch, fetched, kept, cursor_updates in scan_batches(
+            plan, api_key, max_concurrency, scored, seen_cache, FLEET_SEEN_SCOPE, backfills
+        ):
+            new_cursors.update(cursor_updates)
+            for art in kept:
+                art_hash = art["hash"]
+                severity = art["severity"]
+
+                # Route on the tickers MarketAux tagged, never on the whole batch:
+                # a batch mixes several tenants' symbols
+                matched = art["tickers"]
+                if not matched or art_hash in routed:
+                    continue
+                routed[art_hash] = art
+
+                if art["published_at"] > max_published_at:
+                    max_published_at = art["published_at"]
+
+                # Group matched tickers by the watchlists that hold them
+                targets: Dict[Tuple[int, int], List[str]] = {}
+                for t in matched:
+                    for owner in subscriptions.get(t, []):
+                        targets.setdefault(owner, []).append(t)
+
+                for (user_id, watchlist_id), wl_tickers in targets.items():
+                    records.append({
+                        **art,
+                        "user_id": user_id,
+                        "watchlist_id": watchlist_id,
+                        "tickers": wl_tickers,
+                        "mark_posted": (severity == "HIGH")
+                    })
+
+        # Save every tenant's copy in a single transaction, with the cursors
+        # (article by article if that fails)
+        art_ids = save_articles_isolated(
+            records,
+            db_path=db_path,
+            cursor_scope=FLEET_CURSOR_SCOPE,
+            cursors=new_cursors if use_cursors else None
+        )
+
+        # An article counts as saved once every tenant's copy is stored
+        saved: Dict[str, bool] = {}
+        for rec, art_id in zip(records, art_ids):
+            saved[rec["hash"]] = saved.get(rec["hash"], True) and art_id is not None
+
+        for art_hash, art in routed.items():
+            if not saved.get(art_hash):
+                continue
+            if seen_cache is not None:
+                seen_cache.add(FLEET_SEEN_SCOPE + art_hash, None, art["severity"], art["score"])
+            severity_counts[art["severity"]] += 1
+            articles_out.append({
+                "title": art["title"],
+                "description": art["description"],
+                "url": art["url"],
+                "severity": art["severity"],
+                "score": round(art["score"], 2),
+                "tickers": art["tickers"],
+                "published_at": art["published_at"],
+                "hash": art_hash
+            })
+
+        for rec, art_id in zip(records, art_ids):
+            if art_id is None:
+                continue
+            watchlist_id = rec["watchlist_id"]
+            wl_result = watchlist_results.setdefault(watchlist_id, {
+                "user_id": rec["user_id"],
+                "articles_found": 0,
+                "severity_counts": {"HIGH": 0, "MED": 0, "LOW": 0}
+            })
+            wl_result["articles_found"] += 1
+            wl_result["severity_counts"][rec["severity"]] += 1
+
+        result = {
+            "status": "success",
+            "articles_found": len(articles_out),
+            "articles": articles_out,
+            "last_timestamp": max_published_at,
+            "severity_counts": severity_counts,
+            "tickers_scanned": len(tickers),
+            "watchlists": watchlist_results
+        }
+        if _response_cache is not None:
+            result["response_cache"] = _response_cache.stats()
+        return result
+
+    except requests.exceptions.RequestException as e:
+        error = f"MarketAux API error: {str(e)}"
+    except sqlite3.Error as e:
+        error = f"Database error: {str(e)}"
+    except Exception as e:
+        error = f"Unexpected error: {str(e)}"
+
+    return {
+        "status": "error",
+        "error": error,
+        "articles_found": 0,
+        "articles": [],
+        "severity_counts": {"HIGH": 0, "MED": 0, "LOW": 0},
+        "last_timestamp": last_timestamp or "1970-01-01T00:00:00Z",
+        "tickers_scanned": 0,
+        "watchlists": {}
+    }
+
+
 # ============================================================================
 # Test runner (optional, for local testing)
 # ============================================================================
@@ -0,0 +1,46 @@
+# ============================================================================
+# backend/app/api/admin.py
+# ============================================================================
+"""Admin API routes"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.models.user import User
+from app.models.scan_profile import ScanProfile
+from app.schemas.scan import ScanProfileResponse
+from app.dependencies import get_admin_user
+
+router = APIRouter()
+
+@router.get("/scans/{scan_job_id}/profiles", response_model=List[ScanProfileResponse])
+async def list_scan_profiles(
+    scan_job_id: int,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """List profiling artifacts stored for a scan job"""
+    return db.query(
+        ScanProfile.id, ScanProfile.scan_job_id, ScanProfile.name, ScanProfile.size_bytes, ScanProfile.created_at
+    ).filter(ScanProfile.scan_job_id == scan_job_id).order_by(ScanProfile.id).all()
+
+@router.get("/profiles/{profile_id}")
+async def download_scan_profile(
+    profile_id: int,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Download one profiling artifact as a .gz file"""
+    artifact = db.query(ScanProfile).filter(ScanProfile.id == profile_id).first()
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    return Response(
+        content=artifact.content,
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="scan-{artifact.scan_job_id}-{artifact.name}"'}
+    )
@@ -2,10 +2,13 @@
 # backend/app/api/articles.py
 # ============================================================================
 """Articles API routes"""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
+import json
+import base64
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import desc, or_, func
 from typing import Optional, List
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.article import Article, ArticleTicker
@@ -14,10 +17,27 @@ from app.dependencies import get_current_user
 
 router = APIRouter()
 
+def encode_cursor(article_id: int) -> str:
+    """Opaque page cursor pointing after the given article"""
+    return base64.urlsafe_b64encode(json.dumps({"after": article_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Article id from a cursor (400 if malformed)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(data["after"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("", response_model=ArticleList)
 async def list_articles(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    exact_total: bool = False,
     severity: Optional[List[str]] = Query(None),
     tickers: Optional[List[str]] = Query(None),
     search: Optional[str] = None,
@@ -25,7 +45,14 @@ async def list_articles(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List articles with filters"""
+    """
+    List articles with filters, newest first
+    
+    Pages are read by keyset on (detected_at, id): follow next_cursor for
+    constant-time paging however deep (page is kept for offset paging).
+    The total is capped at ARTICLE_COUNT_CAP unless exact_total is set,
+    and skipped entirely with include_total=false.
+    """
     query = db.query(Article).filter(Article.user_id == current_user.id)
     
     if severity:
@@ -49,8 +76,42 @@ async def list_articles(
     if posted is not None:
         query = query.filter(Article.posted == posted)
     
-    total = query.count()
-    articles = query.order_by(desc(Article.detected_at)).offset((page - 1) * page_size).limit(page_size).all()
+    total = None
+    total_exact = True
+    if include_total or exact_total:
+        if exact_total:
+            total = query.count()
+        else:
+            # Count at most ARTICLE_COUNT_CAP + 1 rows
+            capped = query.with_entities(Article.id).limit(settings.ARTICLE_COUNT_CAP + 1).subquery()
+            total = db.query(func.count()).select_from(capped).scalar()
+            if total > settings.ARTICLE_COUNT_CAP:
+                total, total_exact = settings.ARTICLE_COUNT_CAP, False
+    
+    if cursor:
+        # Rows after the cursor article in (detected_at DESC, id DESC) order; the anchor's
+        # detected_at is compared inside the database, so stored timestamp formats don't matter.
+        # The plain <= bound lets the index seek straight to the anchor instead of scanning to it.
+        after_id = decode_cursor(cursor)
+        anchor_query = db.query(Article.detected_at).filter(
+            Article.id == after_id,
+            Article.user_id == current_user.id
+        )
+        if anchor_query.first() is None:
+            # Another user's article, or one deleted since the cursor was issued
+            raise HTTPException(status_code=400, detail="Cursor no longer valid, restart from the first page")
+        anchor = anchor_query.scalar_subquery()
+        query = query.filter(
+            Article.detected_at <= anchor,
+            or_(Article.detected_at < anchor, Article.id < after_id)
+        )
+    
+    query = query.options(selectinload(Article.tickers)).order_by(desc(Article.detected_at), desc(Article.id))
+    if not cursor and page > 1:
+        query = query.offset((page - 1) * page_size)
+    articles = query.limit(page_size + 1).all()
+    next_cursor = encode_cursor(articles[page_size - 1].id) if len(articles) > page_size else None
+    articles = articles[:page_size]
     
     result = []
     for art in articles:
@@ -70,9 +131,11 @@ async def list_articles(
     return ArticleList(
         articles=result,
         total=total,
+        total_exact=total_exact,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=(total + page_size - 1) // page_size if total is not None else None,
+        next_cursor=next_cursor
     )
 
 @router.get("/stats", response_model=ArticleStats)
@@ -102,7 +165,6 @@ async def mark_article_read(
     ).first()
     
     if not article:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Article not found")
     
     article.posted = 1
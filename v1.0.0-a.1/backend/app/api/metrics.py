@@ -0,0 +1,19 @@
+# ============================================================================
+# backend/app/api/metrics.py
+# ============================================================================
+"""Prometheus metrics API routes"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+from app.scanner.yourstocknews import render_metrics
+from app.dependencies import require_metrics_token
+
+router = APIRouter()
+
+@router.get("", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+async def scanner_metrics():
+    """Scanner stage latencies and counters, summed over all scan workers (needs METRICS_SCRAPE_TOKEN)"""
+    return PlainTextResponse(
+        render_metrics(settings.SCANNER_METRICS_DIR),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -8,6 +8,7 @@ from app.database import get_db
 from app.models.user import User
 from app.models.subscription import Subscription
 from app.dependencies import get_current_user
+from app.utils.auth_cache import load_subscription
 
 router = APIRouter()
 
@@ -17,9 +18,7 @@ async def get_subscription(
     db: Session = Depends(get_db)
 ):
     """Get current user's subscription"""
-    subscription = db.query(Subscription).filter(
-        Subscription.user_id == current_user.id
-    ).first()
+    subscription = load_subscription(db, current_user.id)
     
     if not subscription:
         # Create default free subscription
@@ -7,12 +7,14 @@ from typing import List
 from app.database import get_db
 from app.models.user import User
 from app.models.watchlist import Watchlist, WatchlistTicker
-from app.models.subscription import Subscription, UsageLimit
+from app.models.subscription import Subscription
 from app.schemas.watchlist import (
     WatchlistCreate, WatchlistUpdate, WatchlistResponse,
     WatchlistList, TickerAdd, TickerRemove
 )
 from app.dependencies import get_current_user, get_user_subscription
+from app.services.subscription_service import get_plan_limits
+from app.services.watchlist_service import count_watchlists, count_tickers
 
 router = APIRouter()
 
@@ -26,8 +28,8 @@ async def create_watchlist(
 ):
     """Create a new watchlist"""
     # Check usage limits
-    usage_limit = db.query(UsageLimit).filter(UsageLimit.plan == subscription.plan).first()
-    current_count = db.query(Watchlist).filter(Watchlist.user_id == current_user.id).count()
+    usage_limit = get_plan_limits(db, subscription.plan)
+    current_count = count_watchlists(db, current_user.id)
     
     if current_count >= usage_limit.max_watchlists:
         raise HTTPException(
@@ -132,8 +134,8 @@ async def add_ticker(
         raise HTTPException(status_code=404, detail="Watchlist not found")
     
     # Check ticker limit
-    usage_limit = db.query(UsageLimit).filter(UsageLimit.plan == subscription.plan).first()
-    current_ticker_count = len(watchlist.tickers)
+    usage_limit = get_plan_limits(db, subscription.plan)
+    current_ticker_count = count_tickers(db, watchlist.id)
     
     if current_ticker_count >= usage_limit.max_tickers_per_watchlist:
         raise HTTPException(
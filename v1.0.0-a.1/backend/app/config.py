@@ -26,6 +26,8 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_CACHE_TTL_SECONDS: int = 60  # verified tokens / user + subscription snapshots; 0 disables
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
     
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:5173"]
@@ -55,10 +57,33 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Quota checks (in-process caches)
+    PLAN_LIMITS_TTL_SECONDS: int = 300  # usage_limits rows; reloaded at once after ORM writes in this process
+    
+    # Article listing
+    ARTICLE_COUNT_CAP: int = 10000  # list_articles counts at most this many unless exact_total is requested
+    
     # Scanner Settings
     SCANNER_BATCH_SIZE: int = 10
     SCANNER_HIGH_THRESHOLD: float = 2.75
     SCANNER_MED_THRESHOLD: float = 1.25
+    SCANNER_SEEN_CACHE_PATH: Optional[str] = "scanner_seen_cache.json.gz"  # shared by workers on a host
+    SCANNER_SEEN_CACHE_SIZE: int = 50000
+    SCANNER_SEEN_CACHE_SAVE_SECONDS: int = 300  # min gap between saves of a worker's new entries; always saved on shutdown
+    SCANNER_RESPONSE_CACHE_PATH: Optional[str] = "scanner_response_cache.db"  # MarketAux responses, shared by workers
+    SCANNER_RESPONSE_CACHE_TTL_SECONDS: int = 300
+    SCANNER_RESPONSE_CACHE_MAX_MB: int = 64
+    SCANNER_RATE_LIMIT_PATH: Optional[str] = "scanner_rate_limit.db"  # MarketAux token bucket + circuit breaker, shared by workers
+    SCANNER_MARKETAUX_RATE_PER_SECOND: float = 0.0  # set to the MarketAux plan's limit; 0 = only honour Retry-After
+    SCANNER_MARKETAUX_BURST: int = 5
+    SCANNER_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    SCANNER_CIRCUIT_COOL_OFF_SECONDS: int = 60
+    SCANNER_METRICS_DIR: Optional[str] = "scanner_metrics"  # per-worker metric snapshots, merged by /api/metrics
+    METRICS_SCRAPE_TOKEN: Optional[str] = None  # bearer token Prometheus sends to /api/metrics; unset = endpoint disabled
+    SCANNER_PROFILE_SAMPLE_RATE: float = 0.0  # fraction of scan jobs profiled (CPU + allocations); slows those scans down
+    
+    # Admin (may download scan profiles)
+    ADMIN_EMAILS: list[str] = []
     
     class Config:
         env_file = ".env"
@@ -1,16 +1,20 @@
 """
 Shared dependencies for API routes
 """
+import secrets
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.subscription import Subscription
-from app.utils.security import decode_token
+from app.utils.auth_cache import decode_token, load_user, load_subscription
+from app.config import settings
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
@@ -44,7 +48,7 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_user(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -66,14 +70,43 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_admin_user(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """Ensure user is listed in ADMIN_EMAILS"""
+    admins = {email.lower() for email in settings.ADMIN_EMAILS}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+async def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> None:
+    """Ensure the request carries METRICS_SCRAPE_TOKEN (scrapers have no user login)"""
+    if not settings.METRICS_SCRAPE_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode("utf-8"), settings.METRICS_SCRAPE_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token"
+        )
+
+
 async def get_user_subscription(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Subscription:
     """Get current user's subscription"""
-    subscription = db.query(Subscription).filter(
-        Subscription.user_id == current_user.id
-    ).first()
+    subscription = load_subscription(db, current_user.id)
     
     if not subscription:
         # Create default free subscription if none exists
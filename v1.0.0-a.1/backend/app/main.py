@@ -4,8 +4,9 @@ YourStockNews - FastAPI Application Entry Point
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import init_db
-from app.api import auth, users, watchlists, articles, scans, subscriptions, health
+from app.database import init_db, SessionLocal
+from app.services.subscription_service import load_plan_limits
+from app.api import auth, users, watchlists, articles, scans, subscriptions, health, metrics, admin
 
 # Create FastAPI app
 app = FastAPI(
@@ -33,12 +34,19 @@ app.include_router(articles.router, prefix="/api/articles", tags=["Articles"])
 app.include_router(scans.router, prefix="/api/scans", tags=["Scans"])
 app.include_router(subscriptions.router, prefix="/api/subscriptions", tags=["Subscriptions"])
 app.include_router(health.router, prefix="/api/health", tags=["Health"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database and load plan limits on startup"""
     init_db()
+    db = SessionLocal()
+    try:
+        load_plan_limits(db)
+    finally:
+        db.close()
 
 
 @app.get("/")
@@ -0,0 +1,18 @@
+"""
+ScanProfile model
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, LargeBinary
+from datetime import datetime
+from app.database import Base
+
+
+class ScanProfile(Base):
+    """Gzip-compressed profiling artifact (CPU profile or allocation report) of one scan job"""
+    __tablename__ = "scan_profiles"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scan_job_id = Column(Integer, ForeignKey("scan_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)  # cpu.prof.gz, cpu.txt.gz, alloc.txt.gz
+    content = Column(LargeBinary, nullable=False)
+    size_bytes = Column(Integer, nullable=False)  # compressed size
+    created_at = Column(DateTime, default=datetime.utcnow)
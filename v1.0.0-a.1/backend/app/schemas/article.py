@@ -0,0 +1,43 @@
+"""
+Article schemas
+"""
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+
+
+class ArticleResponse(BaseModel):
+    """Stored article with its tickers"""
+    id: int
+    title: str
+    description: Optional[str]
+    url: Optional[str]
+    severity: str
+    score: float
+    tickers: List[str]
+    published_at: Optional[str]
+    detected_at: Optional[datetime]
+    posted: int
+    
+    class Config:
+        from_attributes = True
+
+
+class ArticleList(BaseModel):
+    """One page of articles"""
+    articles: List[ArticleResponse]
+    total: Optional[int]  # capped at ARTICLE_COUNT_CAP unless exact; None with include_total=false
+    total_exact: bool = True
+    page: int
+    page_size: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
+
+
+class ArticleStats(BaseModel):
+    """Article counts by severity"""
+    total: int
+    high: int
+    med: int
+    low: int
+    unread: int
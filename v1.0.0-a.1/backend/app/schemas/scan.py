@@ -33,6 +33,18 @@ class ScanJobList(BaseModel):
     total: int
 
 
+class ScanProfileResponse(BaseModel):
+    """Stored profiling artifact (content downloaded separately)"""
+    id: int
+    scan_job_id: int
+    name: str
+    size_bytes: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class ScanResult(BaseModel):
     """Scan result from scanner"""
     status: str
@@ -0,0 +1,53 @@
+"""
+Subscription service: plan limits
+
+usage_limits holds one row per plan and almost never changes, so all rows
+are kept in memory: loaded at startup, reloaded after any UsageLimit write
+in this process commits, and re-read every PLAN_LIMITS_TTL_SECONDS to pick
+up changes made by other processes.
+"""
+import time
+import threading
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.subscription import UsageLimit
+from app.utils.cache import snapshot, on_commit
+
+_lock = threading.Lock()
+_plan_limits: Dict[str, UsageLimit] = {}
+_loaded_at: float = 0.0
+
+
+def load_plan_limits(db: Session) -> Dict[str, UsageLimit]:
+    """(Re)load every plan's limits into the cache"""
+    global _plan_limits, _loaded_at
+    limits = {row.plan: snapshot(row) for row in db.query(UsageLimit).all()}
+    with _lock:
+        _plan_limits = limits
+        _loaded_at = time.monotonic()
+    return limits
+
+
+def get_plan_limits(db: Session, plan: str) -> Optional[UsageLimit]:
+    """Limits of a plan (detached, read-only), loading them if the cache is stale"""
+    if not _plan_limits or time.monotonic() - _loaded_at > settings.PLAN_LIMITS_TTL_SECONDS:
+        load_plan_limits(db)
+    return _plan_limits.get(plan)
+
+
+def invalidate_plan_limits():
+    """Force a reload on the next lookup"""
+    global _loaded_at
+    with _lock:
+        _loaded_at = 0.0
+
+
+def _on_usage_limit_change(mapper, connection, target: UsageLimit):
+    invalidate_plan_limits()
+    on_commit(target, invalidate_plan_limits)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(UsageLimit, _event, _on_usage_limit_change)
@@ -0,0 +1,26 @@
+"""
+Watchlist service: usage counts for quota checks
+
+users.watchlist_count and watchlists.ticker_count are maintained by
+triggers (Migrations/006_usage_counters.sql) in the same transaction as
+every insert or delete, so they hold across API workers. A check is one
+primary-key read and never counts or loads the rows themselves.
+"""
+from sqlalchemy import column, select, table
+from sqlalchemy.orm import Session
+from app.models.user import User
+
+# Only the counter is read, so a bare table clause is enough
+_watchlists = table("watchlists", column("id"), column("ticker_count"))
+
+
+def count_watchlists(db: Session, user_id: int) -> int:
+    """Number of watchlists owned by a user"""
+    return db.query(User.watchlist_count).filter(User.id == user_id).scalar() or 0
+
+
+def count_tickers(db: Session, watchlist_id: int) -> int:
+    """Number of tickers in a watchlist (without loading them)"""
+    return db.execute(
+        select(_watchlists.c.ticker_count).where(_watchlists.c.id == watchlist_id)
+    ).scalar() or 0
@@ -2,21 +2,92 @@
 # backend/app/tasks/scan_tasks.py
 # ============================================================================
 """Background scan tasks"""
+import random
 from datetime import datetime
+from typing import Optional
+from celery.signals import worker_process_shutdown
 from app.tasks.celery_app import celery_app
 from app.database import SessionLocal
 from app.models.scan_job import ScanJob
 from app.models.watchlist import Watchlist
-from app.scanner.yourstocknews import run_single_scan
+from app.models.scan_profile import ScanProfile
+from app.scanner.yourstocknews import (
+    run_single_scan, run_fleet_scan, SeenArticleCache, configure_response_cache, get_response_cache,
+    configure_rate_limiter, get_rate_limiter, write_metrics_snapshot
+)
 from app.config import settings
 
+# Per-process seen-article cache, merged with the shared file every
+# SCANNER_SEEN_CACHE_SAVE_SECONDS (when it has new entries) and at shutdown
+_seen_cache: Optional[SeenArticleCache] = None
 
-def run_scan_task(scan_job_id: int):
+
+def get_seen_cache() -> Optional[SeenArticleCache]:
+    """Return this worker's seen-article cache (None if disabled)"""
+    global _seen_cache
+    if _seen_cache is None and settings.SCANNER_SEEN_CACHE_PATH:
+        _seen_cache = SeenArticleCache(
+            max_entries=settings.SCANNER_SEEN_CACHE_SIZE,
+            path=settings.SCANNER_SEEN_CACHE_PATH
+        ).load()
+    return _seen_cache
+
+
+def save_seen_cache():
+    """Merge this worker's new seen-cache entries into the shared file, at most every SCANNER_SEEN_CACHE_SAVE_SECONDS"""
+    if _seen_cache is not None:
+        _seen_cache.maybe_save(settings.SCANNER_SEEN_CACHE_SAVE_SECONDS)
+
+
+@worker_process_shutdown.connect
+def flush_seen_cache(**kwargs):
+    """Save entries added since the last timed save before the worker process exits"""
+    if _seen_cache is not None:
+        _seen_cache.save()
+
+
+def ensure_response_cache():
+    """Point the scanner at the host-wide MarketAux response cache once per process"""
+    if get_response_cache() is None and settings.SCANNER_RESPONSE_CACHE_PATH:
+        configure_response_cache(
+            settings.SCANNER_RESPONSE_CACHE_PATH,
+            ttl_seconds=settings.SCANNER_RESPONSE_CACHE_TTL_SECONDS,
+            max_bytes=settings.SCANNER_RESPONSE_CACHE_MAX_MB * 1024 * 1024
+        )
+
+
+def ensure_rate_limiter():
+    """Share one MarketAux token bucket and circuit breaker between all workers on the host"""
+    if get_rate_limiter() is None and settings.SCANNER_RATE_LIMIT_PATH:
+        configure_rate_limiter(
+            settings.SCANNER_RATE_LIMIT_PATH,
+            rate_per_second=settings.SCANNER_MARKETAUX_RATE_PER_SECOND,
+            burst=settings.SCANNER_MARKETAUX_BURST,
+            failure_threshold=settings.SCANNER_CIRCUIT_FAILURE_THRESHOLD,
+            cool_off_seconds=settings.SCANNER_CIRCUIT_COOL_OFF_SECONDS
+        )
+
+
+def save_metrics_snapshot():
+    """Publish this worker's scanner metrics for the /api/metrics endpoint"""
+    if not settings.SCANNER_METRICS_DIR:
+        return
+    try:
+        write_metrics_snapshot(settings.SCANNER_METRICS_DIR)
+    except OSError:
+        pass  # metrics must never fail a scan
+
+
+def run_scan_task(scan_job_id: int, profile: Optional[bool] = None):
     """
     Background task to run scanner
     
-    This runs synchronously in the background via Celery
+    This runs synchronously in the background via Celery. With profile=True
+    (or for a SCANNER_PROFILE_SAMPLE_RATE sample when profile is None) the
+    scan's CPU profile and allocation top-N are stored as ScanProfile rows.
     """
+    if profile is None:
+        profile = random.random() < settings.SCANNER_PROFILE_SAMPLE_RATE
     db = SessionLocal()
     
     try:
@@ -41,24 +112,39 @@ def run_scan_task(scan_job_id: int):
         
         tickers = [t.ticker for t in watchlist.tickers]
         
-        # Get last scan timestamp
+        # Get last scan timestamp (fallback for tickers without a scan cursor;
+        # the scanner keeps per-ticker cursors for this watchlist itself).
+        # Fleet scan rows carry no last_timestamp: they did not cover this
+        # watchlist's tickers from its own cursor.
         last_scan = db.query(ScanJob).filter(
             ScanJob.watchlist_id == scan_job.watchlist_id,
             ScanJob.status == "success",
+            ScanJob.last_timestamp.isnot(None),
             ScanJob.id != scan_job_id
         ).order_by(ScanJob.finished_at.desc()).first()
         
         last_timestamp = last_scan.last_timestamp if last_scan else None
         
         # Run scanner
+        ensure_response_cache()
+        ensure_rate_limiter()
+        seen_cache = get_seen_cache()
         result = run_single_scan(
             user_id=scan_job.user_id,
             watchlist_id=scan_job.watchlist_id,
             tickers=tickers,
             api_key=settings.MARKETAUX_API_KEY,
             last_timestamp=last_timestamp,
-            db_path=settings.DATABASE_URL.replace("sqlite:///./", "")
+            db_path=settings.DATABASE_URL.replace("sqlite:///./", ""),
+            seen_cache=seen_cache,
+            profile=profile
         )
+        save_seen_cache()
+        save_metrics_snapshot()
+        
+        # Attach profiling artifacts (failed scans included; that's when they matter)
+        for name, content in result.pop("profile", {}).items():
+            db.add(ScanProfile(scan_job_id=scan_job_id, name=name, content=content, size_bytes=len(content)))
         
         # Update scan job
         if result["status"] == "success":
@@ -81,3 +167,51 @@ def run_scan_task(scan_job_id: int):
     
     finally:
         db.close()
+
+
+def run_fleet_scan_task(last_timestamp: Optional[str] = None):
+    """
+    Background task to scan every watched ticker once for all watchlists
+
+    Fetches and scores each article once, then records a finished ScanJob
+    for every watchlist that received articles so per-watchlist history
+    stays intact. The fleet resumes from its own per-ticker cursors (scope
+    FLEET_CURSOR_SCOPE); last_timestamp only applies to tickers it has no
+    cursor for yet. Its ScanJob rows leave last_timestamp empty, so they
+    never move a watchlist's own scan position.
+    """
+    db = SessionLocal()
+    started_at = datetime.utcnow()
+
+    try:
+        ensure_response_cache()
+        ensure_rate_limiter()
+        seen_cache = get_seen_cache()
+        result = run_fleet_scan(
+            api_key=settings.MARKETAUX_API_KEY,
+            last_timestamp=last_timestamp,
+            db_path=settings.DATABASE_URL.replace("sqlite:///./", ""),
+            seen_cache=seen_cache
+        )
+        save_seen_cache()
+        save_metrics_snapshot()
+
+        if result["status"] != "success":
+            return result
+
+        finished_at = datetime.utcnow()
+        for watchlist_id, wl_result in result["watchlists"].items():
+            db.add(ScanJob(
+                user_id=wl_result["user_id"],
+                watchlist_id=watchlist_id,
+                status="success",
+                started_at=started_at,
+                finished_at=finished_at,
+                articles_found=wl_result["articles_found"]
+            ))
+        db.commit()
+
+        return result
+
+    finally:
+        db.close()
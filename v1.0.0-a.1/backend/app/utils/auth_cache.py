@@ -0,0 +1,84 @@
+"""
+In-process caches for the authentication path
+
+- decode_token: verified JWT claims, kept until the token's exp (or the TTL)
+- load_user / load_subscription: detached snapshots of a user's row and
+  subscription, merged into the request's session without a query
+
+User and Subscription writes invalidate the cached snapshots through ORM
+events (at flush and again at commit), so deactivations and plan changes
+take effect on the next request. The caches are per process: changes made
+by another process or by raw SQL are picked up after AUTH_CACHE_TTL_SECONDS.
+"""
+from typing import Any, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.user import User
+from app.models.subscription import Subscription
+from app.utils.cache import TTLCache, snapshot, on_commit
+from app.utils.security import decode_token as verify_token
+
+
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+subscription_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """decode_token from app.utils.security, skipping the signature check for recently verified tokens"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = verify_token(token)
+    if payload is not None:
+        exp = payload.get("exp")
+        token_cache.set(token, payload, expires_at=float(exp) if exp is not None else None)
+    return payload
+
+
+def _load(db: Session, cache: TTLCache, model: Any, column: Any, user_id: int) -> Optional[Any]:
+    cached = cache.get(user_id)
+    if cached is not None:
+        # Attach a copy to this session without a SELECT; lazy relationships still load on access
+        return db.merge(cached, load=False)
+    generation = cache.generation(user_id)
+    obj = db.query(model).filter(column == user_id).first()
+    if obj is not None:
+        cache.set(user_id, snapshot(obj), generation=generation)
+    return obj
+
+
+def load_user(db: Session, user_id: int) -> Optional[User]:
+    """User by id, from the cache when possible"""
+    return _load(db, user_cache, User, User.id, user_id)
+
+
+def load_subscription(db: Session, user_id: int) -> Optional[Subscription]:
+    """Subscription of a user, from the cache when possible"""
+    return _load(db, subscription_cache, Subscription, Subscription.user_id, user_id)
+
+
+# ----------------------------------------------------------------------------
+# Invalidation
+# ----------------------------------------------------------------------------
+
+def _invalidate(target: Any, cache: TTLCache, user_id: Optional[int]):
+    if user_id is None:
+        return
+    cache.invalidate(user_id)
+    # Again after commit: a request that re-cached the old row between flush and commit is discarded
+    on_commit(target, cache.invalidate, user_id)
+
+
+def _on_user_change(mapper, connection, target: User):
+    _invalidate(target, user_cache, target.id)
+
+
+def _on_subscription_change(mapper, connection, target: Subscription):
+    _invalidate(target, subscription_cache, target.user_id)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(User, _event, _on_user_change)
+    event.listen(Subscription, _event, _on_subscription_change)
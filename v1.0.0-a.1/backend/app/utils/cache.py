@@ -0,0 +1,96 @@
+"""
+In-process caching helpers
+
+- TTLCache: thread-safe LRU with per-entry expiry and per-key generations
+- snapshot: detached copy of an ORM row, safe to share between requests
+- on_commit: run a callback once the current transaction commits
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def generation(self, key: Hashable) -> int:
+        """Version of key; pass it to set() so a load that raced a change is not cached"""
+        return self._generations.get(key, 0)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None, generation: Optional[int] = None):
+        if not self.enabled:
+            return
+        expires_at = min(expires_at or float("inf"), time.time() + self.ttl_seconds)
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+
+
+def snapshot(obj: Any) -> Any:
+    """Detached copy of obj's column values (relationships are left unloaded)"""
+    mapper = inspect(obj).mapper
+    copy = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        setattr(copy, attr.key, getattr(obj, attr.key))
+    make_transient_to_detached(copy)
+    return copy
+
+
+def on_commit(target: Any, callback: Callable[..., Any], *args: Any):
+    """Call callback(*args) after the transaction of target's session commits (dropped on rollback)"""
+    session = object_session(target)
+    if session is None:
+        callback(*args)
+        return
+    session.info.setdefault("on_commit", []).append((callback, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session: Session):
+    for callback, args in session.info.pop("on_commit", ()):
+        callback(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_commit(session: Session):
+    session.info.pop("on_commit", None)
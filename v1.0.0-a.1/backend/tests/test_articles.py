@@ -0,0 +1,158 @@
+"""
+Tests for GET /api/articles: keyset paging, cursor validation and the capped total
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import articles as articles_api
+from app.config import settings
+from app.database import Base, get_db
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.models.article import Article
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def db():
+    """In-memory database with the full schema"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(id=1, email="one@example.com", password_hash="x"),
+        User(id=2, email="two@example.com", password_hash="x"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    """Articles router signed in as user 1"""
+    app = FastAPI()
+    app.include_router(articles_api.router, prefix="/api/articles")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, 1)
+    return TestClient(app)
+
+
+def add_articles(db, user_id: int, count: int, same_time: bool = False) -> list:
+    """Store count articles for a user, one minute apart (or all at BASE_TIME); returns their ids"""
+    rows = []
+    for i in range(count):
+        rows.append(Article(
+            user_id=user_id,
+            hash=f"u{user_id}-{i}",
+            title=f"Article {i}",
+            description="",
+            url=f"https://news.example.com/{user_id}/{i}",
+            severity="MED",
+            score=0.5,
+            detected_at=BASE_TIME if same_time else BASE_TIME + timedelta(minutes=i),
+            posted=0,
+        ))
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def read_all_pages(client, page_size: int) -> list:
+    """Follow next_cursor to the end; returns every article id in order"""
+    ids, cursor = [], None
+    while True:
+        params = {"page_size": page_size, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/articles", params=params).json()
+        ids.extend(a["id"] for a in body["articles"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+# ============================================================================
+# KEYSET PAGING
+# ============================================================================
+
+def test_cursor_pages_cover_every_article_once_newest_first(client, db):
+    ids = add_articles(db, 1, 7)
+    add_articles(db, 2, 3)
+
+    assert read_all_pages(client, page_size=3) == list(reversed(ids))
+
+
+def test_cursor_breaks_detected_at_ties_by_id(client, db):
+    ids = add_articles(db, 1, 5, same_time=True)
+
+    assert read_all_pages(client, page_size=2) == sorted(ids, reverse=True)
+
+
+def test_last_full_page_has_no_next_cursor(client, db):
+    add_articles(db, 1, 4)
+
+    body = client.get("/api/articles", params={"page_size": 4}).json()
+    assert len(body["articles"]) == 4
+    assert body["next_cursor"] is None
+
+
+def test_cursor_of_another_users_article_is_rejected(client, db):
+    other_ids = add_articles(db, 2, 2)
+    add_articles(db, 1, 2)
+
+    response = client.get("/api/articles", params={"cursor": articles_api.encode_cursor(other_ids[0])})
+    assert response.status_code == 400
+
+
+def test_cursor_of_deleted_article_is_rejected(client, db):
+    ids = add_articles(db, 1, 5)
+    body = client.get("/api/articles", params={"page_size": 2}).json()
+    db.query(Article).filter(Article.id == ids[-2]).delete()
+    db.commit()
+
+    response = client.get("/api/articles", params={"page_size": 2, "cursor": body["next_cursor"]})
+    assert response.status_code == 400
+
+
+def test_malformed_cursor_is_rejected(client, db):
+    assert client.get("/api/articles", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+# ============================================================================
+# CAPPED TOTAL
+# ============================================================================
+
+def test_total_is_capped_unless_exact_total(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "ARTICLE_COUNT_CAP", 5)
+    add_articles(db, 1, 8)
+
+    capped = client.get("/api/articles", params={"page_size": 2}).json()
+    assert (capped["total"], capped["total_exact"], capped["total_pages"]) == (5, False, 3)
+
+    exact = client.get("/api/articles", params={"page_size": 2, "exact_total": "true"}).json()
+    assert (exact["total"], exact["total_exact"], exact["total_pages"]) == (8, True, 4)
+
+
+def test_total_under_the_cap_is_exact(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "ARTICLE_COUNT_CAP", 5)
+    add_articles(db, 1, 5)
+
+    body = client.get("/api/articles").json()
+    assert (body["total"], body["total_exact"]) == (5, True)
+
+
+def test_total_can_be_skipped(client, db):
+    add_articles(db, 1, 3)
+
+    body = client.get("/api/articles", params={"include_total": "false"}).json()
+    assert body["total"] is None and body["total_pages"] is None
+    assert len(body["articles"]) == 3
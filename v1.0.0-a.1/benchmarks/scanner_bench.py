@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+benchmarks/scanner_bench.py
+Micro-benchmarks for the scanner hot paths on synthetic article corpora.
+
+Times score_text, weighted_severity, detect_tickers_extended, levenshtein,
+canonical_article_hash and save_article in isolation across corpus shapes
+(headline only, headline + summary, long content bodies) and ticker-universe
+sizes, and writes the results as JSON so runs can be compared:
+
+    python benchmarks/scanner_bench.py --output before.json
+    python benchmarks/scanner_bench.py --output after.json --compare before.json
+
+Every case gets one untimed warm-up call (index builds, caches), then runs
+for a fixed time budget (at least one call) and reports per-call mean / p50 /
+p95 in microseconds plus calls per second. Corpora are generated from a seed,
+so two runs with the same arguments time the same work.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import string
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCANNER_DIR = os.path.dirname(HERE)
+if SCANNER_DIR not in sys.path:
+    sys.path.insert(0, SCANNER_DIR)
+
+CORPUS_SHAPES = ("headline", "summary", "long")
+DEFAULT_TICKER_COUNTS = (10, 100, 1000, 5000)
+
+FILLER_WORDS = (
+    "market shares investors trading session analysts quarter company report outlook "
+    "growth sector stock prices demand supply update week month year said according "
+    "executive board plan strategy product customers results statement industry global"
+).split()
+KEYWORD_WORDS = (
+    "earnings beats misses guidance revenue acquisition merger lawsuit settlement "
+    "investigation bankruptcy recall fraud resign ceo cfo dividend buyback layoff "
+    "downgrade upgrade tariff partnership contract launch announce"
+).split()
+NAME_SYLLABLES = ("ar", "bel", "cor", "dyn", "el", "fin", "gen", "hal", "in", "jet",
+                  "kin", "lum", "mer", "nov", "or", "pax", "quan", "ro", "syn", "tec",
+                  "ul", "ver", "wex", "xan", "yor", "zen")
+NAME_SUFFIXES = ("Inc", "Corp", "Holdings", "Group", "Technologies", "Systems", "Energy", "Pharma")
+
+# ============================================================================
+# Synthetic corpora
+# ============================================================================
+
+def make_universe(count: int, rng: random.Random) -> Dict[str, str]:
+    """Unique ticker -> company name map of the requested size"""
+    universe: Dict[str, str] = {}
+    while len(universe) < count:
+        ticker = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 5)))
+        if ticker in universe:
+            continue
+        stem = "".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        universe[ticker] = f"{stem} {rng.choice(NAME_SUFFIXES)}"
+    return universe
+
+def _misspell(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+def _sentence(rng: random.Random, words: int, keyword_rate: float = 0.08) -> str:
+    out = [rng.choice(KEYWORD_WORDS) if rng.random() < keyword_rate else rng.choice(FILLER_WORDS)
+           for _ in range(words)]
+    return " ".join(out).capitalize() + "."
+
+def make_article(shape: str, universe: Dict[str, str], rng: random.Random, idx: int,
+                 now: datetime) -> Dict[str, Any]:
+    """One MarketAux-shaped article mentioning a ticker the way real news does"""
+    ticker = rng.choice(list(universe)) if universe else "AAPL"
+    name = universe.get(ticker, "Apple Inc")
+    mention = rng.random()
+    if mention < 0.35:
+        subject = name
+    elif mention < 0.55:
+        subject = name.split()[0]
+    elif mention < 0.70:
+        subject = _misspell(name.split()[0].lower(), rng).capitalize()
+    elif mention < 0.85:
+        subject = ticker
+    else:
+        subject = rng.choice(FILLER_WORDS).capitalize()
+
+    title = f"{subject} {_sentence(rng, rng.randint(6, 12)).lower()}"
+    article: Dict[str, Any] = {
+        "title": title,
+        "url": f"https://news.example.com/{ticker.lower()}/{'-'.join(title.lower().split()[:6])}-{idx}",
+        "published_at": (now - timedelta(minutes=idx)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    }
+    if shape in ("summary", "long"):
+        article["description"] = " ".join(_sentence(rng, rng.randint(12, 20)) for _ in range(3))
+    if shape == "long":
+        article["content"] = " ".join(_sentence(rng, rng.randint(10, 25)) for _ in range(rng.randint(60, 120)))
+    return article
+
+def make_corpus(shape: str, universe: Dict[str, str], size: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(f"{seed}:{shape}:{len(universe)}")
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [make_article(shape, universe, rng, i, now) for i in range(size)]
+
+def make_word_pairs(size: int, seed: int) -> List[Tuple[str, str]]:
+    """Company-name tokens against headline tokens, as tier 5 compares them"""
+    rng = random.Random(f"{seed}:levenshtein")
+    pairs = []
+    for _ in range(size):
+        a = "".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        b = _misspell(a, rng) if rng.random() < 0.3 else rng.choice(FILLER_WORDS + KEYWORD_WORDS)
+        pairs.append((a, b))
+    return pairs
+
+# ============================================================================
+# Timing
+# ============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * pct / 100.0
+    lo, hi = int(math.floor(k)), int(math.ceil(k))
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def time_calls(fn: Callable[[Any], Any], inputs: List[Any], budget_s: float,
+               max_calls: Optional[int] = None) -> Dict[str, Any]:
+    """Call fn over inputs (cycling) until the time budget is spent, after one warm-up call"""
+    fn(inputs[0])
+    timings: List[float] = []
+    perf = time.perf_counter
+    deadline = perf() + budget_s
+    i = 0
+    n = len(inputs)
+    while True:
+        arg = inputs[i % n]
+        t0 = perf()
+        fn(arg)
+        timings.append(perf() - t0)
+        i += 1
+        if (max_calls is not None and i >= max_calls) or perf() >= deadline:
+            break
+    timings.sort()
+    total = sum(timings)
+    return {
+        "calls": len(timings),
+        "mean_us": round(total / len(timings) * 1e6, 3),
+        "p50_us": round(percentile(timings, 50) * 1e6, 3),
+        "p95_us": round(percentile(timings, 95) * 1e6, 3),
+        "ops_per_s": round(len(timings) / total, 1) if total else 0.0,
+    }
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+def load_scanners(workdir: str, keep_logging: bool):
+    """Import both scanners from a scratch directory (the bot opens bot.log in cwd)"""
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import Starting_YourStockNews as bot
+        import YourStockNews as saas
+    finally:
+        os.chdir(cwd)
+    if not keep_logging:
+        bot.logger.setLevel(logging.WARNING)
+    return bot, saas
+
+def run_benchmarks(args) -> List[Dict[str, Any]]:
+    workdir = tempfile.mkdtemp(prefix="scanner-bench-")
+    bot, saas = load_scanners(workdir, args.keep_logging)
+    from marketaux_standin import create_scan_schema
+
+    results: List[Dict[str, Any]] = []
+
+    def record(bench: str, stats: Dict[str, Any], **case):
+        row = {"bench": bench, **case, **stats}
+        results.append(row)
+        if not args.quiet:
+            label = " ".join(f"{k}={v}" for k, v in case.items())
+            print(f"{bench:<26} {label:<28} {stats['mean_us']:>12.1f} us/call  "
+                  f"p95 {stats['p95_us']:>10.1f}  ({stats['calls']} calls)", file=sys.stderr)
+
+    rng = random.Random(args.seed)
+    base_universe = make_universe(max(args.tickers), rng)
+    base_items = list(base_universe.items())
+
+    # Text-only benchmarks: independent of the ticker universe
+    for shape in args.shapes:
+        corpus = make_corpus(shape, dict(base_items[:10]), args.corpus_size, args.seed)
+        blobs = [" ".join([a.get("title", ""), a.get("description", ""), a.get("content", "")]) for a in corpus]
+        record("score_text", time_calls(bot.score_text, blobs, args.budget), corpus=shape)
+        record("weighted_severity", time_calls(bot.weighted_severity, corpus, args.budget), corpus=shape)
+        record("canonical_article_hash", time_calls(
+            lambda a: saas.canonical_article_hash(a["title"], a["url"], a["published_at"]), corpus, args.budget
+        ), corpus=shape)
+
+    record("levenshtein", time_calls(lambda p: bot.levenshtein(*p), make_word_pairs(args.corpus_size, args.seed),
+                                     args.budget))
+
+    # Ticker detection: the whole universe is the batch being matched against
+    for count in args.tickers:
+        universe = dict(base_items[:count])
+        batch = list(universe)
+        for shape in args.shapes:
+            corpus = make_corpus(shape, universe, args.corpus_size, args.seed)
+            record("detect_tickers_extended", time_calls(
+                lambda a: bot.detect_tickers_extended(a, batch, universe), corpus, args.budget
+            ), corpus=shape, tickers=count)
+
+    # Persistence: one article per transaction, as the per-article path does
+    db_path = os.path.join(workdir, "bench.db")
+    create_scan_schema(db_path)
+    corpus = make_corpus("summary", dict(base_items[:10]), args.corpus_size, args.seed)
+    counter = iter(range(10 ** 9))
+
+    def save(a):
+        saas.save_article(
+            user_id=1, watchlist_id=1, title=a["title"], description=a.get("description", ""),
+            url=f"{a['url']}#{next(counter)}", severity="MED", score=2.0,
+            published_at=a["published_at"], tickers=["AAPL", "MSFT"], mark_posted=False, db_path=db_path
+        )
+
+    record("save_article", time_calls(save, corpus, args.budget))
+    return results
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def _case_key(row: Dict[str, Any]) -> str:
+    return "|".join(f"{k}={row[k]}" for k in ("bench", "corpus", "tickers") if k in row)
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCANNER_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[Dict[str, Any]]:
+    """Mean-time ratio of each case against a previous run (>1 means slower now)"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {_case_key(r): r for r in json.load(f).get("results", [])}
+    rows = []
+    for r in results:
+        old = baseline.get(_case_key(r))
+        if not old or not old.get("mean_us"):
+            continue
+        ratio = r["mean_us"] / old["mean_us"]
+        rows.append({
+            "case": _case_key(r),
+            "baseline_mean_us": old["mean_us"],
+            "mean_us": r["mean_us"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1.0 + threshold,
+        })
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scanner micro-benchmarks on synthetic corpora")
+    parser.add_argument("--shapes", nargs="+", choices=CORPUS_SHAPES, default=list(CORPUS_SHAPES))
+    parser.add_argument("--tickers", nargs="+", type=int, default=list(DEFAULT_TICKER_COUNTS),
+                        help="ticker-universe sizes for detect_tickers_extended")
+    parser.add_argument("--corpus-size", type=int, default=200, help="articles per corpus")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per benchmark case")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio above which a case counts as a regression")
+    parser.add_argument("--keep-logging", action="store_true",
+                        help="leave the bot's INFO logging on (measures logging cost too)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args)
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "quiet")},
+        },
+        "results": results,
+    }
+    regressions = False
+    if args.compare:
+        report["comparison"] = compare(results, args.compare, args.threshold)
+        regressions = any(row["regression"] for row in report["comparison"])
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
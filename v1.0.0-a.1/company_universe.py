@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+company_universe.py
+Memory-mapped, read-only company universe (ticker -> company name).
+
+A universe file holds every listed symbol with its company name and aliases
+(former names, alternate spellings) in a compact binary layout:
+
+    header | ticker records (sorted) | token records (sorted) | postings | string pool
+
+Tickers and normalized name tokens are found by binary search directly in
+the mapped file, so opening a universe is constant-time regardless of its
+size and every process on a host shares the same page-cache pages instead
+of building its own dict. CompanyUniverse is a read-only Mapping, so it can
+be used anywhere a company_map dict was used before.
+
+Build one from NASDAQ Trader listing files (nasdaqlisted.txt /
+otherlisted.txt), any CSV / pipe-delimited file with symbol and name
+columns, or a company_map.json:
+
+    python company_universe.py build nasdaqlisted.txt otherlisted.txt company_map.json -o company_universe.bin
+    python company_universe.py lookup company_universe.bin AAPL
+    python company_universe.py token company_universe.bin apple
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import mmap
+import struct
+import argparse
+import tempfile
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"YSNCUNI1"
+VERSION = 1
+
+# magic, version, tickers, tokens, then section offsets
+_HEADER = struct.Struct("<8sIIIIIII")
+# ticker_off, name_off, alias_off, ticker_len, name_len, alias_len, pad
+_TICKER = struct.Struct("<IIIHHHH")
+# token_off, postings_index, postings_count, token_len, pad
+_TOKEN = struct.Struct("<IIIHH")
+_POSTING = struct.Struct("<I")
+
+ALIAS_SEP = "\x1f"
+
+SYMBOL_COLUMNS = ("symbol", "ticker", "act symbol", "nasdaq symbol", "cqs symbol")
+NAME_COLUMNS = ("security name", "company name", "company", "name")
+ALIAS_COLUMNS = ("aliases", "alias", "former names", "former name")
+
+Listing = Tuple[str, str, List[str]]
+
+# ============================================================================
+# Normalization
+# ============================================================================
+
+def name_tokens(name: str) -> List[str]:
+    """Lowercase alphanumeric tokens of a company name"""
+    return re.findall(r"[a-z0-9]+", (name or "").lower())
+
+def clean_security_name(name: str) -> str:
+    """'Apple Inc. - Common Stock' -> 'Apple Inc.'"""
+    return (name or "").split(" - ")[0].strip()
+
+# ============================================================================
+# Reader
+# ============================================================================
+
+class CompanyUniverse(Mapping):
+    """Read-only ticker -> name mapping backed by a memory-mapped universe file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> mmap.mmap:
+        mm = self._mm
+        if mm is not None:
+            return mm
+        with self._lock:
+            if self._mm is None:
+                with open(self.path, "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                (magic, version, self._n_tickers, self._n_tokens, self._tickers_off,
+                 self._tokens_off, self._postings_off, self._pool_off) = _HEADER.unpack_from(mm, 0)
+                if magic != MAGIC or version != VERSION:
+                    mm.close()
+                    raise ValueError(f"{self.path} is not a company universe file (v{VERSION})")
+                self._mm = mm
+        return self._mm
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+
+    def _str(self, off: int, length: int) -> bytes:
+        start = self._pool_off + off
+        return self._mm[start:start + length]
+
+    def _ticker_record(self, i: int) -> Tuple[int, ...]:
+        return _TICKER.unpack_from(self._mm, self._tickers_off + i * _TICKER.size)
+
+    def _token_record(self, i: int) -> Tuple[int, ...]:
+        return _TOKEN.unpack_from(self._mm, self._tokens_off + i * _TOKEN.size)
+
+    def _search(self, key: bytes, count: int, record, key_pos: Tuple[int, int]) -> Optional[int]:
+        lo, hi = 0, count
+        off_i, len_i = key_pos
+        while lo < hi:
+            mid = (lo + hi) // 2
+            rec = record(mid)
+            probe = self._str(rec[off_i], rec[len_i])
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _find_ticker(self, ticker: str) -> Optional[int]:
+        self._open()
+        return self._search(ticker.encode("utf-8"), self._n_tickers, self._ticker_record, (0, 3))
+
+    # Mapping interface -----------------------------------------------------
+
+    def __getitem__(self, ticker: str) -> str:
+        i = self._find_ticker(ticker) if isinstance(ticker, str) else None
+        if i is None:
+            raise KeyError(ticker)
+        rec = self._ticker_record(i)
+        return self._str(rec[1], rec[4]).decode("utf-8")
+
+    def __len__(self) -> int:
+        self._open()
+        return self._n_tickers
+
+    def __iter__(self) -> Iterator[str]:
+        self._open()
+        for i in range(self._n_tickers):
+            rec = self._ticker_record(i)
+            yield self._str(rec[0], rec[3]).decode("utf-8")
+
+    # Extra lookups ---------------------------------------------------------
+
+    def aliases(self, ticker: str) -> List[str]:
+        """Alternate / former names recorded for a ticker"""
+        i = self._find_ticker(ticker)
+        if i is None:
+            return []
+        rec = self._ticker_record(i)
+        raw = self._str(rec[2], rec[5]).decode("utf-8")
+        return raw.split(ALIAS_SEP) if raw else []
+
+    def tickers_for_token(self, token: str) -> List[str]:
+        """Tickers whose name or aliases contain the normalized token"""
+        self._open()
+        key = token.lower().encode("utf-8")
+        i = self._search(key, self._n_tokens, self._token_record, (0, 3))
+        if i is None:
+            return []
+        _, first, count, _, _ = self._token_record(i)
+        base = self._postings_off + first * _POSTING.size
+        out = []
+        for k in range(count):
+            (ti,) = _POSTING.unpack_from(self._mm, base + k * _POSTING.size)
+            rec = self._ticker_record(ti)
+            out.append(self._str(rec[0], rec[3]).decode("utf-8"))
+        return out
+
+# ============================================================================
+# Builder
+# ============================================================================
+
+def _pick_column(fieldnames: List[str], candidates: Tuple[str, ...]) -> Optional[str]:
+    lowered = {f.strip().lower(): f for f in fieldnames if f}
+    for c in candidates:
+        if c in lowered:
+            return lowered[c]
+    return None
+
+def read_listing(path: str) -> List[Listing]:
+    """Read (ticker, name, aliases) rows from a JSON map or a delimited listing file"""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rows: List[Listing] = []
+        items = data.items() if isinstance(data, dict) else (
+            ((d.get("ticker") or d.get("symbol")), d) for d in data
+        )
+        for ticker, value in items:
+            if isinstance(value, dict):
+                rows.append((ticker, value.get("name") or "", list(value.get("aliases") or [])))
+            else:
+                rows.append((ticker, value or "", []))
+        return rows
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        sample = f.read(8192)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters="|,\t;")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(f, dialect=dialect)
+        fields = reader.fieldnames or []
+        sym_col = _pick_column(fields, SYMBOL_COLUMNS)
+        name_col = _pick_column(fields, NAME_COLUMNS)
+        alias_col = _pick_column(fields, ALIAS_COLUMNS)
+        test_col = _pick_column(fields, ("test issue",))
+        if not sym_col or not name_col:
+            raise ValueError(f"{path}: need symbol and name columns, found {fields}")
+        rows = []
+        for r in reader:
+            ticker = (r.get(sym_col) or "").strip()
+            # NASDAQ Trader files end with a "File Creation Time" footer row
+            if not ticker or ticker.lower().startswith("file creation time"):
+                continue
+            if test_col and (r.get(test_col) or "").strip().upper() == "Y":
+                continue
+            aliases = [a.strip() for a in (r.get(alias_col) or "").split(";") if a.strip()] if alias_col else []
+            rows.append((ticker, clean_security_name(r.get(name_col) or ""), aliases))
+        return rows
+
+def build_universe(listing_paths: List[str], out_path: str) -> int:
+    """
+    Merge listing files into a universe file; returns the number of tickers.
+
+    The first file that names a ticker provides its name; names from later
+    files are kept as aliases.
+    """
+    entries: Dict[str, Tuple[str, List[str]]] = {}
+    for path in listing_paths:
+        for ticker, name, aliases in read_listing(path):
+            ticker = ticker.strip().upper()
+            if not ticker:
+                continue
+            name = (name or "").strip()
+            if ticker not in entries:
+                entries[ticker] = (name, [])
+            primary, known = entries[ticker]
+            if not primary and name:
+                entries[ticker] = (name, known)
+                primary = name
+            for alias in ([name] if name != primary else []) + aliases:
+                if alias and alias != primary and alias not in known:
+                    known.append(alias)
+
+    tickers = sorted(entries, key=lambda t: t.encode("utf-8"))
+    pool = bytearray()
+    interned: Dict[bytes, int] = {}
+
+    def intern(s: str) -> Tuple[int, int]:
+        raw = s.encode("utf-8")
+        if len(raw) > 0xFFFF:
+            raw = raw[:0xFFFF]
+        off = interned.get(raw)
+        if off is None:
+            off = len(pool)
+            pool.extend(raw)
+            interned[raw] = off
+        return off, len(raw)
+
+    ticker_blob = bytearray()
+    postings_by_token: Dict[str, List[int]] = {}
+    for i, ticker in enumerate(tickers):
+        name, aliases = entries[ticker]
+        t_off, t_len = intern(ticker)
+        n_off, n_len = intern(name)
+        a_off, a_len = intern(ALIAS_SEP.join(aliases))
+        ticker_blob.extend(_TICKER.pack(t_off, n_off, a_off, t_len, n_len, a_len, 0))
+        for tok in dict.fromkeys(tok for text in [name] + aliases for tok in name_tokens(text)):
+            postings_by_token.setdefault(tok, []).append(i)
+
+    token_blob = bytearray()
+    postings_blob = bytearray()
+    n_postings = 0
+    for tok in sorted(postings_by_token, key=lambda t: t.encode("utf-8")):
+        ids = postings_by_token[tok]
+        k_off, k_len = intern(tok)
+        token_blob.extend(_TOKEN.pack(k_off, n_postings, len(ids), k_len, 0))
+        for ti in ids:
+            postings_blob.extend(_POSTING.pack(ti))
+        n_postings += len(ids)
+
+    tickers_off = _HEADER.size
+    tokens_off = tickers_off + len(ticker_blob)
+    postings_off = tokens_off + len(token_blob)
+    pool_off = postings_off + len(postings_blob)
+    header = _HEADER.pack(MAGIC, VERSION, len(tickers), len(postings_by_token),
+                          tickers_off, tokens_off, postings_off, pool_off)
+
+    directory = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for blob in (header, ticker_blob, token_blob, postings_blob, pool):
+                f.write(blob)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(tickers)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query memory-mapped company universes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="convert listing files into a universe file")
+    build.add_argument("listings", nargs="+", help="listing files (.txt/.csv) or company_map.json, in priority order")
+    build.add_argument("-o", "--output", default="company_universe.bin")
+    lookup = sub.add_parser("lookup", help="look up tickers")
+    lookup.add_argument("universe")
+    lookup.add_argument("tickers", nargs="+")
+    token = sub.add_parser("token", help="list tickers whose name contains a token")
+    token.add_argument("universe")
+    token.add_argument("token")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_universe(args.listings, args.output)
+        print(f"Wrote {count} tickers to {args.output} ({os.path.getsize(args.output)} bytes)")
+        return 0
+    universe = CompanyUniverse(args.universe)
+    if args.command == "lookup":
+        for t in args.tickers:
+            name = universe.get(t.upper())
+            aliases = universe.aliases(t.upper())
+            print(f"{t.upper()}\t{name if name is not None else '-'}" + (f"\t({'; '.join(aliases)})" if aliases else ""))
+        return 0
+    for t in universe.tickers_for_token(args.token):
+        print(f"{t}\t{universe[t]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+discord_outbox.py
+Durable outbox for Discord alerts, drained by a background sender.
+
+The scan loop only enqueues (one INSERT per alert, keyed by article hash);
+a sender thread claims pending alerts atomically, packs several into each
+webhook message up to Discord's 2000-character limit, honours Retry-After
+and the X-RateLimit headers, and marks the articles posted. Because claims
+live in the shared database, any number of bot instances can run senders
+and each alert is still posted and marked exactly once.
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+import requests
+from typing import Dict, List, Optional, Tuple
+
+from scanner_metrics import STAGE_SECONDS, DISCORD_ALERTS
+from sqlite_storage import get_storage
+
+logger = logging.getLogger("mvp_alerts")
+
+DISCORD_CONTENT_LIMIT = 2000
+MESSAGE_SEPARATOR = "\n\n"
+CLAIM_SECONDS = 60        # lease on claimed alerts; expired leases are retaken
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 2.0
+POLL_SECONDS = 2.0
+
+def ensure_outbox_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS discord_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            art_hash TEXT UNIQUE NOT NULL,
+            content TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            claimed_by TEXT,
+            claimed_until REAL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            sent_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_discord_outbox_status ON discord_outbox(status, next_attempt_at)")
+
+def pack_messages(items: List[Tuple[int, str]], limit: int = DISCORD_CONTENT_LIMIT) -> List[Tuple[List[int], str]]:
+    """Group (id, content) alerts into as few messages as fit under the limit, in order"""
+    messages: List[Tuple[List[int], str]] = []
+    ids: List[int] = []
+    body = ""
+    for item_id, content in items:
+        content = content if len(content) <= limit else content[:limit - 1] + "…"
+        candidate = f"{body}{MESSAGE_SEPARATOR}{content}" if body else content
+        if body and len(candidate) > limit:
+            messages.append((ids, body))
+            ids, candidate = [], content
+        ids.append(item_id)
+        body = candidate
+    if ids:
+        messages.append((ids, body))
+    return messages
+
+class DiscordOutbox:
+    """Enqueue side of the outbox (used from the scan loop)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.storage = get_storage(db_path)
+        self.storage.write(ensure_outbox_table)
+        self.wakeup = threading.Event()
+
+    def enqueue(self, art_hash: str, content: str) -> bool:
+        """Queue an alert; False if this article was already queued (by anyone)"""
+        cur = self.storage.execute(
+            "INSERT OR IGNORE INTO discord_outbox (art_hash, content, created_at) VALUES (?, ?, ?)",
+            (art_hash, content, time.time())
+        )
+        if cur.rowcount == 1:
+            self.wakeup.set()
+            return True
+        return False
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.storage.connection().execute("SELECT status, COUNT(*) AS n FROM discord_outbox GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+class DiscordOutboxSender:
+    """Background thread that drains the outbox into a Discord webhook"""
+
+    def __init__(self, outbox: DiscordOutbox, webhook_url: str, batch_size: int = 25,
+                 session: Optional[requests.Session] = None):
+        self.outbox = outbox
+        self.webhook_url = webhook_url
+        self.batch_size = batch_size
+        self.session = session or requests.Session()
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._paused_until = 0.0
+        self.sent_alerts = 0
+        self.sent_messages = 0
+
+    # Claiming ------------------------------------------------------------
+
+    def claim(self) -> List[sqlite3.Row]:
+        """Atomically lease a batch of due alerts to this sender"""
+        now = time.time()
+
+        def write(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+            conn.execute("""
+                UPDATE discord_outbox
+                SET status = 'sending', claimed_by = ?, claimed_until = ?
+                WHERE id IN (
+                    SELECT id FROM discord_outbox
+                    WHERE (status = 'pending' AND next_attempt_at <= ?)
+                       OR (status = 'sending' AND claimed_until < ?)
+                    ORDER BY id
+                    LIMIT ?
+                )
+            """, (self.worker_id, now + CLAIM_SECONDS, now, now, self.batch_size))
+            return conn.execute(
+                "SELECT id, art_hash, content, attempts FROM discord_outbox "
+                "WHERE status = 'sending' AND claimed_by = ? ORDER BY id",
+                (self.worker_id,)
+            ).fetchall()
+
+        return self.outbox.storage.write(write)
+
+    def _mark_sent(self, ids: List[int]):
+        """Mark alerts sent and their articles posted, only if we still hold them"""
+        marks = ",".join("?" * len(ids))
+
+        def write(conn: sqlite3.Connection):
+            owned = [r["art_hash"] for r in conn.execute(
+                f"SELECT art_hash FROM discord_outbox WHERE id IN ({marks}) AND claimed_by = ? AND status = 'sending'",
+                (*ids, self.worker_id)
+            ).fetchall()]
+            conn.execute(
+                f"UPDATE discord_outbox SET status = 'sent', sent_at = ?, claimed_until = NULL "
+                f"WHERE id IN ({marks}) AND claimed_by = ? AND status = 'sending'",
+                (time.time(), *ids, self.worker_id)
+            )
+            if owned:
+                conn.execute(
+                    f"UPDATE articles SET posted = 1 WHERE hash IN ({','.join('?' * len(owned))})", owned
+                )
+
+        self.outbox.storage.write(write)
+
+    def _renew(self, ids: List[int], until: float) -> int:
+        """Extend our lease on claimed alerts to until; returns how many we still hold"""
+        marks = ",".join("?" * len(ids))
+        cur = self.outbox.storage.execute(
+            f"UPDATE discord_outbox SET claimed_until = ? "
+            f"WHERE id IN ({marks}) AND claimed_by = ? AND status = 'sending'",
+            (until, *ids, self.worker_id)
+        )
+        return cur.rowcount
+
+    def _reschedule(self, rows: List[sqlite3.Row], delay: float, error: str, count_attempt: bool = True):
+        now = time.time()
+        updates = []
+        for r in rows:
+            attempts = r["attempts"] + (1 if count_attempt else 0)
+            status = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+            updates.append((status, attempts, now + delay, error[:500], r["id"], self.worker_id))
+        self.outbox.storage.write(lambda conn: conn.executemany(
+            "UPDATE discord_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+            "claimed_by = NULL, claimed_until = NULL WHERE id = ? AND claimed_by = ?",
+            updates
+        ))
+        for (status, attempts, *_), r in zip(updates, rows):
+            if status == "failed":
+                logger.error(f"Discord alert for {r['art_hash'][:12]} dropped after {attempts} attempts: {error}")
+
+    # Sending -------------------------------------------------------------
+
+    @staticmethod
+    def _retry_after(resp: requests.Response) -> float:
+        value = resp.headers.get("Retry-After")
+        if value is None:
+            try:
+                value = (resp.json() or {}).get("retry_after")
+            except ValueError:
+                value = None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _respect_bucket(self, resp: requests.Response):
+        """Pause before the next request when the webhook bucket is empty"""
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                self._paused_until = time.time() + float(resp.headers.get("X-RateLimit-Reset-After", "1"))
+            except ValueError:
+                self._paused_until = time.time() + 1.0
+
+    def drain_once(self) -> int:
+        """Claim one batch and send it; returns the number of alerts posted"""
+        wait = self._paused_until - time.time()
+        if wait > 0:
+            self._stop.wait(wait)
+        rows = self.claim()
+        if not rows:
+            return 0
+        by_id = {r["id"]: r for r in rows}
+        posted = 0
+        messages = pack_messages([(r["id"], r["content"]) for r in rows])
+        for i, (ids, body) in enumerate(messages):
+            batch = [by_id[x] for x in ids]
+            try:
+                with STAGE_SECONDS.time("discord_post"):
+                    resp = self.session.post(self.webhook_url, json={"content": body}, timeout=10)
+            except requests.RequestException as e:
+                DISCORD_ALERTS.inc(len(ids), result="error")
+                self._reschedule(batch, BACKOFF_BASE_SECONDS * (2 ** batch[0]["attempts"]), str(e))
+                continue
+            if resp.status_code in (200, 204):
+                self._mark_sent(ids)
+                DISCORD_ALERTS.inc(len(ids), result="sent")
+                posted += len(ids)
+                self.sent_messages += 1
+                self._respect_bucket(resp)
+            elif resp.status_code == 429:
+                delay = self._retry_after(resp)
+                logger.warning(f"Discord rate limited; retrying {sum(len(m[0]) for m in messages[i:])} alerts in {delay:.1f}s")
+                rest = [by_id[x] for m in messages[i:] for x in m[0]]
+                DISCORD_ALERTS.inc(len(rest), result="throttled")
+                self._reschedule(rest, delay, "HTTP 429", count_attempt=False)
+                self._paused_until = time.time() + delay
+                break
+            else:
+                DISCORD_ALERTS.inc(len(ids), result="error")
+                self._reschedule(batch, BACKOFF_BASE_SECONDS * (2 ** batch[0]["attempts"]),
+                                 f"HTTP {resp.status_code}: {resp.text[:200]}")
+            wait = self._paused_until - time.time()
+            rest = [x for m in messages[i + 1:] for x in m[0]]
+            if wait > 0 and rest:
+                # Hold the rest of the batch through the pause; an expired lease lets another
+                # sender retake these alerts and post them a second time.
+                if self._renew(rest, time.time() + wait + CLAIM_SECONDS) < len(rest):
+                    logger.warning(f"Discord outbox lease lost on {len(rest)} alert(s); releasing them")
+                    self._reschedule([by_id[x] for x in rest], 0.0, "lease lost", count_attempt=False)
+                    break
+                if self._stop.wait(wait):
+                    self._reschedule([by_id[x] for x in rest], 0.0, "sender stopped", count_attempt=False)
+                    break
+        if posted:
+            self.sent_alerts += posted
+            logger.info(f"Discord posted {posted} alert(s) in {self.sent_messages} message(s) so far.")
+        return posted
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                if self.drain_once():
+                    continue
+            except sqlite3.Error as e:
+                logger.warning(f"Discord outbox error: {e}")
+            except Exception:
+                # Anything else must not end the thread, or alerts silently stop going out
+                logger.exception("Discord outbox sender error")
+            self.outbox.wakeup.wait(POLL_SECONDS)
+            self.outbox.wakeup.clear()
+
+    def start(self) -> "DiscordOutboxSender":
+        self._thread = threading.Thread(target=self.run, name="discord-outbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until nothing is pending or sending (for one-shot runs); True if drained"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            counts = self.outbox.counts()
+            if not counts.get("pending") and not counts.get("sending"):
+                return True
+            self.outbox.wakeup.set()
+            time.sleep(0.2)
+        return False
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self.outbox.wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+keyword_matcher.py
+Compiled multi-pattern matching (Aho-Corasick) shared by both scanners.
+
+A KeywordAutomaton is built once from a list of patterns and then finds
+every occurrence of every pattern in a single pass over the text, so the
+per-article cost depends on the text length, not on the number of keywords.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# ============================================================================
+# Aho-Corasick automaton
+# ============================================================================
+
+# Above this many trie states the per-state transition tables get too big;
+# fall back to walking failure links at match time instead.
+DENSE_STATE_LIMIT = 20_000
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed list of patterns.
+
+    Small pattern sets (keyword lists) fold the failure links into a full
+    transition table per state; large ones (company-name universes) keep
+    the plain trie + failure links so memory stays linear in pattern size.
+    """
+
+    def __init__(self, patterns: Iterable[str], dense: Optional[bool] = None):
+        self.patterns: List[str] = []
+        self._index: Dict[str, int] = {}
+        for p in patterns:
+            if p and p not in self._index:
+                self._index[p] = len(self.patterns)
+                self.patterns.append(p)
+        self._lengths = [len(p) for p in self.patterns]
+        self._build(dense)
+
+    def _build(self, dense: Optional[bool]):
+        # Trie
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for pid, p in enumerate(self.patterns):
+            state = 0
+            for ch in p:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pid)
+
+        if dense is None:
+            dense = len(goto) <= DENSE_STATE_LIMIT
+        self.dense = dense
+
+        # Failure links (BFS). Dense mode folds them into a full transition
+        # table so that matching never has to walk failure chains.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto] if dense else []
+        if dense:
+            delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            f = fail[state]
+            if dense:
+                delta[state] = dict(delta[f])
+                delta[state].update(goto[state])
+            out[state] = out[state] + out[f]
+            for ch, nxt in goto[state].items():
+                if state:
+                    fail[nxt] = delta[f].get(ch, 0) if dense else self._follow(goto, fail, f, ch)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._goto = goto
+        self._fail = fail
+        self._out: List[Optional[Tuple[int, ...]]] = [tuple(o) if o else None for o in out]
+
+    @staticmethod
+    def _follow(goto: List[Dict[str, int]], fail: List[int], state: int, ch: str) -> int:
+        """Sparse transition: walk failure links until ch can be consumed"""
+        while True:
+            nxt = goto[state].get(ch)
+            if nxt is not None:
+                return nxt
+            if not state:
+                return 0
+            state = fail[state]
+
+    def _scan(self, text: str) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        """Yield (index, pattern_ids) at every position where a pattern ends"""
+        out = self._out
+        state = 0
+        if self.dense:
+            delta = self._delta
+            for i, ch in enumerate(text):
+                state = delta[state].get(ch, 0)
+                hits = out[state]
+                if hits:
+                    yield i, hits
+        else:
+            goto = self._goto
+            fail = self._fail
+            for i, ch in enumerate(text):
+                nxt = goto[state].get(ch)
+                while nxt is None and state:
+                    state = fail[state]
+                    nxt = goto[state].get(ch)
+                state = nxt or 0
+                hits = out[state]
+                if hits:
+                    yield i, hits
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def pattern_id(self, pattern: str) -> Optional[int]:
+        """Return the id of a pattern, or None if it is not compiled in"""
+        return self._index.get(pattern)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end_index, pattern_id) for every (possibly overlapping) match"""
+        for i, hits in self._scan(text):
+            for pid in hits:
+                yield i, pid
+
+    def find_all(self, text: str) -> Set[int]:
+        """Return the ids of all patterns occurring anywhere in text"""
+        found: Set[int] = set()
+        if not text or not self.patterns:
+            return found
+        for _, hits in self._scan(text):
+            found.update(hits)
+        return found
+
+    def count(self, text: str) -> List[int]:
+        """
+        Count non-overlapping occurrences of each pattern.
+
+        Matches the semantics of str.count(pattern) evaluated independently
+        for every pattern: occurrences of the same pattern never overlap,
+        occurrences of different patterns may.
+        """
+        counts = [0] * len(self.patterns)
+        if not text or not self.patterns:
+            return counts
+        lengths = self._lengths
+        next_start = [0] * len(self.patterns)
+        for i, hits in self._scan(text):
+            for pid in hits:
+                start = i - lengths[pid] + 1
+                if start >= next_start[pid]:
+                    counts[pid] += 1
+                    next_start[pid] = i + 1
+        return counts
+
+# ============================================================================
+# Weighted keyword scorer
+# ============================================================================
+
+class Scorer:
+    """
+    Reusable keyword scorer compiled from a keyword -> weight map.
+
+    score(text) returns exactly what the original per-keyword loop returned:
+    sum(text.lower().count(kw) * weight), accumulated in keyword order.
+    """
+
+    def __init__(self, keyword_weights: Dict[str, float]):
+        self.keyword_weights = {k.lower(): v for k, v in keyword_weights.items()}
+        self._automaton = KeywordAutomaton(self.keyword_weights)
+        self._weights = [self.keyword_weights[p] for p in self._automaton.patterns]
+
+    def __len__(self) -> int:
+        return len(self._automaton)
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Return keyword -> occurrence count for keywords present in text"""
+        if not text:
+            return {}
+        raw = self._automaton.count(text.lower())
+        return {kw: c for kw, c in zip(self._automaton.patterns, raw) if c}
+
+    def score(self, text: str) -> float:
+        """Calculate keyword score for text in a single pass"""
+        if not text:
+            return 0.0
+        s = 0.0
+        for c, w in zip(self._automaton.count(text.lower()), self._weights):
+            if c:
+                s += c * w
+        return s
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+marketaux_standin.py
+Local stand-in for the MarketAux /v1/news/all endpoint, for offline load tests.
+
+Serves recorded fixtures (a JSON file of articles or saved API responses) or
+a seeded synthetic corpus, with MarketAux-style symbol / published_after /
+published_before filtering and page-based pagination. Response latency follows a log-normal
+distribution and 429 / 5xx errors can be injected at a fixed rate, so runs
+are reproducible for a given seed.
+
+Both scanners read MARKETAUX_BASE_URL, so pointing them at the stand-in is
+just an environment variable:
+
+    python marketaux_standin.py serve --port 8765 --latency-ms 120 --error-429 0.02
+    MARKETAUX_BASE_URL=http://127.0.0.1:8765 python Starting_YourStockNews.py
+
+The bench subcommands start a stand-in in-process and time the real scan
+paths against it:
+
+    python marketaux_standin.py bench-single --tickers 50 --repeat 5
+    python marketaux_standin.py bench-bot --tickers 30 --cycles 2
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_PAGE_SIZE = 3  # MarketAux free/basic plans return 3 articles per page
+
+SYNTHETIC_TICKERS = [
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AMD", "INTC", "NFLX",
+    "ORCL", "CRM", "ADBE", "PYPL", "SHOP", "UBER", "PFE", "MRNA", "JNJ", "XOM",
+    "CVX", "JPM", "BAC", "WFC", "GS", "BA", "F", "GM", "DIS", "KO",
+]
+
+# Headline templates: a mix of keyword-heavy (HIGH/MED) and neutral (LOW) news
+SYNTHETIC_HEADLINES = [
+    ("{name} beats earnings estimates as revenue climbs", "{sym} earnings beats expectations; CEO upbeat on guidance."),
+    ("{name} faces fraud investigation over accounting", "Regulators open an investigation into {name}; lawsuit filed by investors."),
+    ("{name} announces acquisition of rival startup", "The acquisition expands {sym} product line; merger expected to close next quarter."),
+    ("{name} issues recall for flagship product", "{name} recall affects thousands of units, company says."),
+    ("{name} CFO to resign at year end", "{name} said its CFO will resign; search for successor under way."),
+    ("{name} misses earnings as costs rise", "{sym} earnings misses on higher input costs."),
+    ("{name} reaches settlement in patent lawsuit", "{name} settlement ends a long-running lawsuit."),
+    ("{name} shares edge higher in quiet trading", "Shares of {name} moved slightly on light volume."),
+    ("{name} to present at industry conference", "{name} management will present at an upcoming investor conference."),
+    ("Analysts update price targets for {name}", "Several analysts revised their targets on {sym}."),
+    ("{name} opens new regional office", "{name} expands its footprint with a new office."),
+    ("{name} files for bankruptcy protection", "{name} bankruptcy filing follows months of losses."),
+]
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+def format_published_at(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def parse_published_after(value: Optional[str]) -> Optional[datetime]:
+    """Accept the timestamp shapes the scanners send (with or without Z / offset)"""
+    if not value:
+        return None
+    v = value.strip().replace("Z", "+00:00")
+    try:
+        dt = datetime.fromisoformat(v)
+    except ValueError:
+        try:
+            dt = datetime.strptime(value.strip()[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def synthetic_articles(
+    count: int = 2000,
+    tickers: Optional[List[str]] = None,
+    hours: float = 12.0,
+    seed: int = 1,
+    now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Generate a reproducible MarketAux-shaped corpus spread over the last `hours`"""
+    rng = random.Random(seed)
+    tickers = tickers or SYNTHETIC_TICKERS
+    now = now or datetime.now(timezone.utc)
+    articles = []
+    for i in range(count):
+        primary = rng.choice(tickers)
+        symbols = [primary]
+        if rng.random() < 0.25:
+            symbols.append(rng.choice(tickers))
+        title_tpl, desc_tpl = rng.choice(SYNTHETIC_HEADLINES)
+        name = f"{primary.title()} Corp"
+        published = now - timedelta(seconds=rng.uniform(0, hours * 3600))
+        articles.append({
+            "uuid": f"synthetic-{seed}-{i:07d}",
+            "title": title_tpl.format(name=name, sym=primary),
+            "description": desc_tpl.format(name=name, sym=primary),
+            "snippet": desc_tpl.format(name=name, sym=primary),
+            "url": f"https://news.example.com/{primary.lower()}/{seed}-{i}",
+            "source": "news.example.com",
+            "language": "en",
+            "published_at": format_published_at(published),
+            "entities": [
+                {"symbol": s, "name": f"{s.title()} Corp", "type": "equity", "match_score": 50.0}
+                for s in dict.fromkeys(symbols)
+            ],
+        })
+    return articles
+
+def load_fixtures(path: str) -> List[Dict[str, Any]]:
+    """
+    Load recorded articles from a JSON file.
+
+    Accepts a list of articles, a single saved response ({"data": [...]}),
+    or a list of saved responses.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    items = raw if isinstance(raw, list) else [raw]
+    articles: List[Dict[str, Any]] = []
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("data"), list):
+            articles.extend(item["data"])
+        elif isinstance(item, dict):
+            articles.append(item)
+    return articles
+
+# ============================================================================
+# Stand-in server
+# ============================================================================
+
+class StandinConfig:
+    """Behaviour knobs for the stand-in"""
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE, latency_ms: float = 0.0,
+                 latency_sigma: float = 0.5, error_429: float = 0.0, error_5xx: float = 0.0,
+                 retry_after: int = 1, seed: int = 1):
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.retry_after = retry_after
+        self.seed = seed
+
+class NewsCorpus:
+    """Articles indexed by symbol, newest first"""
+
+    def __init__(self, articles: List[Dict[str, Any]]):
+        self._by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        for art in articles:
+            published = parse_published_after(art.get("published_at"))
+            if published is None:
+                continue
+            entry = (published, art)
+            for ent in art.get("entities") or []:
+                sym = (ent.get("symbol") or "").upper()
+                if sym:
+                    self._by_symbol.setdefault(sym, []).append(entry)
+        for entries in self._by_symbol.values():
+            entries.sort(key=lambda e: e[0], reverse=True)
+        self.size = len(articles)
+
+    def symbols(self) -> List[str]:
+        return sorted(self._by_symbol)
+
+    def query(self, symbols: List[str], published_after: Optional[datetime],
+              published_before: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        seen = set()
+        matched = []
+        for sym in symbols:
+            for published, art in self._by_symbol.get(sym.upper(), []):
+                if published_after is not None and published <= published_after:
+                    break
+                if published_before is not None and published >= published_before:
+                    continue
+                key = id(art)
+                if key not in seen:
+                    seen.add(key)
+                    matched.append((published, art))
+        matched.sort(key=lambda e: e[0], reverse=True)
+        return [art for _, art in matched]
+
+class StandinServer:
+    """Threaded HTTP server answering /v1/news/all from a NewsCorpus"""
+
+    def __init__(self, corpus: NewsCorpus, config: Optional[StandinConfig] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.corpus = corpus
+        self.config = config or StandinConfig()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {"requests": 0, "status": {}, "articles_served": 0, "service_ms": []}
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="marketaux-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _draw(self):
+        """Pick (latency seconds, injected status or None) for one request"""
+        cfg = self.config
+        with self._rng_lock:
+            latency = 0.0
+            if cfg.latency_ms > 0:
+                latency = cfg.latency_ms * math.exp(cfg.latency_sigma * self._rng.gauss(0.0, 1.0)) / 1000.0
+            roll = self._rng.random()
+            status = None
+            if roll < cfg.error_429:
+                status = 429
+            elif roll < cfg.error_429 + cfg.error_5xx:
+                status = self._rng.choice((500, 502, 503))
+        return latency, status
+
+    def _record(self, status: int, articles: int, elapsed: float):
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["status"][status] = self.stats["status"].get(status, 0) + 1
+            self.stats["articles_served"] += articles
+            self.stats["service_ms"].append(elapsed * 1000.0)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            service = sorted(self.stats["service_ms"])
+            return {
+                "requests": self.stats["requests"],
+                "status": {str(k): v for k, v in sorted(self.stats["status"].items())},
+                "articles_served": self.stats["articles_served"],
+                "service_ms_p50": round(percentile(service, 50), 2),
+                "service_ms_p95": round(percentile(service, 95), 2),
+            }
+
+    def handle_news(self, query: Dict[str, List[str]]):
+        """Return (status, headers, body) for one /v1/news/all request"""
+        cfg = self.config
+        if not (query.get("api_token") or [""])[0]:
+            return 401, {}, {"error": {"code": "invalid_api_token", "message": "An invalid API token was supplied."}}
+        latency, injected = self._draw()
+        if latency:
+            time.sleep(latency)
+        if injected == 429:
+            return 429, {"Retry-After": str(cfg.retry_after)}, {
+                "error": {"code": "rate_limit_reached", "message": "Too many requests."}
+            }
+        if injected:
+            return injected, {}, {"error": {"code": "server_error", "message": "Upstream error (injected)."}}
+
+        raw_after = (query.get("published_after") or [None])[0]
+        published_after = parse_published_after(raw_after)
+        if raw_after and published_after is None:
+            return 400, {}, {"error": {"code": "malformed_parameters", "message": "published_after is malformed."}}
+        raw_before = (query.get("published_before") or [None])[0]
+        published_before = parse_published_after(raw_before)
+        if raw_before and published_before is None:
+            return 400, {}, {"error": {"code": "malformed_parameters", "message": "published_before is malformed."}}
+        symbols = [s for s in (query.get("symbols") or [""])[0].split(",") if s]
+        try:
+            page = max(1, int((query.get("page") or ["1"])[0]))
+            limit = max(1, min(cfg.page_size, int((query.get("limit") or [cfg.page_size])[0])))
+        except ValueError:
+            return 400, {}, {"error": {"code": "malformed_parameters", "message": "page/limit must be integers."}}
+
+        matched = self.corpus.query(symbols, published_after, published_before)
+        data = matched[(page - 1) * limit: page * limit]
+        return 200, {}, {
+            "meta": {"found": len(matched), "returned": len(data), "limit": limit, "page": page},
+            "data": data,
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                started = time.perf_counter()
+                parsed = urlparse(self.path)
+                if parsed.path.rstrip("/") != "/v1/news/all":
+                    status, headers, body = 404, {}, {"error": {"code": "resource_not_found", "message": "Not found."}}
+                else:
+                    status, headers, body = server.handle_news(parse_qs(parsed.query))
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+                server._record(status, len(body.get("data") or []), time.perf_counter() - started)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100.0
+    lo, hi = int(math.floor(k)), int(math.ceil(k))
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Migrations")
+SCAN_MIGRATIONS = ("002_multitenant_saas.sql", "005_articles_tenant_unique.sql")
+
+def create_scan_schema(db_path: str):
+    """Bot schema (as init_and_migrate_db creates it) plus the SaaS migrations run_single_scan relies on"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, description TEXT, url TEXT, severity TEXT, score REAL,
+            hash TEXT UNIQUE, published_at TEXT,
+            detected_at TEXT DEFAULT (datetime('now')),
+            posted INTEGER DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS article_tickers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id INTEGER, ticker TEXT,
+            UNIQUE (article_id, ticker),
+            FOREIGN KEY(article_id) REFERENCES articles(id) ON DELETE CASCADE
+        );
+    """)
+    for name in SCAN_MIGRATIONS:
+        with open(os.path.join(MIGRATIONS_DIR, name), "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+    conn.commit()
+    conn.close()
+
+def _build_server(args) -> StandinServer:
+    if args.fixtures:
+        articles = load_fixtures(args.fixtures)
+    else:
+        tickers = SYNTHETIC_TICKERS[:]
+        extra = max(0, getattr(args, "tickers", 0) - len(tickers))
+        tickers += [f"SYN{i:03d}" for i in range(extra)]
+        articles = synthetic_articles(args.articles, tickers, hours=args.hours, seed=args.seed)
+    config = StandinConfig(
+        page_size=args.page_size, latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        error_429=args.error_429, error_5xx=args.error_5xx, seed=args.seed
+    )
+    return StandinServer(NewsCorpus(articles), config, host=args.host, port=args.port)
+
+def bench_single(args) -> Dict[str, Any]:
+    """Time run_single_scan (YourStockNews) end to end against the stand-in"""
+    with _build_server(args) as server:
+        os.environ["MARKETAUX_BASE_URL"] = server.base_url
+        import YourStockNews as scanner
+
+        tickers = server.corpus.symbols()[:args.tickers]
+        since = format_published_at(datetime.now(timezone.utc) - timedelta(hours=args.hours))
+        workdir = tempfile.mkdtemp(prefix="standin-bench-")
+        walls, found = [], 0
+        for i in range(args.repeat):
+            db_path = os.path.join(workdir, f"scan_{i}.db")
+            create_scan_schema(db_path)
+            started = time.perf_counter()
+            result = scanner.run_single_scan(
+                user_id=1, watchlist_id=1, tickers=tickers, api_key="standin",
+                last_timestamp=since, db_path=db_path, max_concurrency=args.concurrency
+            )
+            walls.append(time.perf_counter() - started)
+            if result["status"] != "success":
+                raise RuntimeError(result.get("error"))
+            found += result["articles_found"]
+        served = server.summary()
+
+    total = sum(walls)
+    return {
+        "scenario": "run_single_scan",
+        "tickers": len(tickers),
+        "repeat": args.repeat,
+        "concurrency": args.concurrency,
+        "scan_s_p50": round(percentile(walls, 50), 4),
+        "scan_s_p95": round(percentile(walls, 95), 4),
+        "articles_kept": found,
+        "requests_per_s": round(served["requests"] / total, 2) if total else 0.0,
+        "articles_per_s": round(served["articles_served"] / total, 2) if total else 0.0,
+        "server": served,
+    }
+
+def bench_bot(args) -> Dict[str, Any]:
+    """Time main_loop (Starting_YourStockNews) for a fixed number of cycles"""
+    with _build_server(args) as server:
+        tickers = server.corpus.symbols()[:args.tickers]
+        workdir = tempfile.mkdtemp(prefix="standin-bot-")
+        with open(os.path.join(workdir, "watchlist.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(tickers) + "\n")
+        os.environ.update({
+            "MARKETAUX_BASE_URL": server.base_url,
+            "MARKETAUX_API_KEY": "standin",
+            "DISCORD_WEBHOOK_URL": "",
+            "CYCLE_SECONDS": "0",
+            "SEEN_CACHE_PATH": os.path.join(workdir, "seen_cache.json.gz"),
+        })
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            import Starting_YourStockNews as bot
+            started = time.perf_counter()
+            bot.main_loop(max_cycles=args.cycles)
+            wall = time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+        served = server.summary()
+
+    return {
+        "scenario": "main_loop",
+        "tickers": len(tickers),
+        "cycles": args.cycles,
+        "wall_s": round(wall, 4),
+        "cycle_s_avg": round(wall / args.cycles, 4),
+        "requests_per_s": round(served["requests"] / wall, 2) if wall else 0.0,
+        "articles_per_s": round(served["articles_served"] / wall, 2) if wall else 0.0,
+        "workdir": workdir,
+        "server": served,
+    }
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _add_server_args(p: argparse.ArgumentParser, port: int):
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=port)
+    p.add_argument("--fixtures", help="JSON file of recorded articles / responses (default: synthetic)")
+    p.add_argument("--articles", type=int, default=2000, help="synthetic corpus size")
+    p.add_argument("--hours", type=float, default=12.0, help="synthetic corpus time span")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    p.add_argument("--latency-ms", type=float, default=0.0, help="median response latency")
+    p.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal spread of latency")
+    p.add_argument("--error-429", type=float, default=0.0, help="fraction of requests answered 429")
+    p.add_argument("--error-5xx", type=float, default=0.0, help="fraction of requests answered 5xx")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local MarketAux stand-in and offline scan benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the stand-in until interrupted")
+    _add_server_args(serve, 8765)
+
+    single = sub.add_parser("bench-single", help="benchmark run_single_scan")
+    _add_server_args(single, 0)
+    single.add_argument("--tickers", type=int, default=30)
+    single.add_argument("--repeat", type=int, default=5)
+    single.add_argument("--concurrency", type=int, default=8)
+
+    bot = sub.add_parser("bench-bot", help="benchmark main_loop for N cycles")
+    _add_server_args(bot, 0)
+    bot.add_argument("--tickers", type=int, default=30)
+    bot.add_argument("--cycles", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        server = _build_server(args)
+        print(f"MarketAux stand-in on {server.base_url} ({server.corpus.size} articles)", file=sys.stderr)
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+        return 0
+
+    result = bench_single(args) if args.command == "bench-single" else bench_bot(args)
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
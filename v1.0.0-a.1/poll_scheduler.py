@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+poll_scheduler.py
+Adaptive per-ticker polling for the bot's main loop.
+
+Each ticker's news velocity (articles/hour) and HIGH rate are tracked as
+time-decayed averages, seeded from stored article history and updated after
+every poll. The hourly API call budget is then split across tickers to
+minimise expected detection delay: with poll rate p_t and news weight w_t,
+sum(w_t / p_t) under sum(p_t) = budget is minimised at p_t ~ sqrt(w_t), so
+busy tickers are polled often and quiet ones rarely, clamped between the
+configured minimum and maximum intervals. State lives in the bot database
+and survives restarts; a rolling call counter keeps actual usage within the
+budget whatever pages a batch ends up needing.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlite_storage import get_storage
+
+HISTORY_DAYS = 14          # article history used to seed tickers with no state
+HALF_LIFE_HOURS = 24.0     # weight of past observations halves every HALF_LIFE_HOURS
+HIGH_WEIGHT = 5.0          # a HIGH article counts as much as this many ordinary ones
+PRIOR_RATE = 0.01          # articles/hour assumed for tickers with no history at all
+FILL_AHEAD = 0.25          # pull tickers due within this fraction of their interval into partial batches
+
+class AdaptivePollScheduler:
+    """Decides which tickers to poll when, within budget_per_hour API calls"""
+
+    def __init__(
+        self,
+        db_path: str,
+        budget_per_hour: float,
+        batch_size: int,
+        min_interval_s: float = 300,
+        max_interval_s: float = 4 * 3600
+    ):
+        self.storage = get_storage(db_path)
+        self.budget_per_hour = float(budget_per_hour)
+        self.batch_size = batch_size
+        self.min_interval_s = float(min_interval_s)
+        self.max_interval_s = float(max(max_interval_s, min_interval_s))
+        self.state: Dict[str, Dict[str, float]] = {}
+        self._calls: Deque[float] = deque()
+        self.storage.write(lambda conn: conn.execute("""
+            CREATE TABLE IF NOT EXISTS poll_schedule (
+                ticker TEXT PRIMARY KEY,
+                rate REAL NOT NULL,
+                high_rate REAL NOT NULL,
+                last_polled REAL,
+                next_due REAL NOT NULL,
+                interval REAL NOT NULL
+            )
+        """))
+
+    # State -----------------------------------------------------------------
+
+    def _history(self, tickers: List[str]) -> Dict[str, Tuple[float, float]]:
+        """(articles/hour, HIGH/hour) per ticker over the last HISTORY_DAYS"""
+        conn = self.storage.connection()
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='article_tickers'").fetchone() is None:
+            return {}
+        hours = HISTORY_DAYS * 24.0
+        rows = conn.execute(f"""
+            SELECT at.ticker AS ticker, COUNT(*) AS n, SUM(a.severity = 'HIGH') AS highs
+            FROM article_tickers at JOIN articles a ON a.id = at.article_id
+            WHERE a.detected_at >= datetime('now', '-{HISTORY_DAYS} days')
+            GROUP BY at.ticker
+        """).fetchall()
+        wanted = set(tickers)
+        return {r["ticker"]: (r["n"] / hours, (r["highs"] or 0) / hours) for r in rows if r["ticker"] in wanted}
+
+    def sync(self, tickers: Iterable[str], now: Optional[float] = None) -> "AdaptivePollScheduler":
+        """Load persisted state for the watchlist, seed new tickers from history, and re-plan"""
+        now = time.time() if now is None else now
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        if not self.state:
+            for r in self.storage.connection().execute("SELECT * FROM poll_schedule").fetchall():
+                self.state[r["ticker"]] = {k: r[k] for k in ("rate", "high_rate", "last_polled", "next_due", "interval")}
+        missing = [t for t in tickers if t not in self.state]
+        if missing:
+            history = self._history(missing)
+            for t in missing:
+                rate, high_rate = history.get(t, (PRIOR_RATE, 0.0))
+                # New tickers are due immediately
+                self.state[t] = {"rate": rate, "high_rate": high_rate, "last_polled": None,
+                                 "next_due": now, "interval": self.max_interval_s}
+        for t in set(self.state) - set(tickers):
+            del self.state[t]
+        self.plan()
+        return self
+
+    def save(self):
+        rows = [(t, s["rate"], s["high_rate"], s["last_polled"], s["next_due"], s["interval"])
+                for t, s in self.state.items()]
+
+        def write(conn):
+            conn.execute("DELETE FROM poll_schedule")
+            conn.executemany("INSERT INTO poll_schedule (ticker, rate, high_rate, last_polled, next_due, interval) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+        self.storage.write(write)
+
+    # Planning --------------------------------------------------------------
+
+    def weight(self, ticker: str) -> float:
+        s = self.state[ticker]
+        return max(s["rate"], PRIOR_RATE) + HIGH_WEIGHT * s["high_rate"]
+
+    def plan(self):
+        """Split the budget into per-ticker intervals (p ~ sqrt(weight), clamped)"""
+        if not self.state:
+            return
+        capacity = self.budget_per_hour * self.batch_size  # ticker-polls per hour
+        lo, hi = 3600.0 / self.max_interval_s, 3600.0 / self.min_interval_s
+        roots = {t: math.sqrt(self.weight(t)) for t in self.state}
+        polls: Dict[str, float] = {}
+        free = dict(roots)
+        # Water-filling: fix tickers that hit a bound, share what is left among the rest
+        while free:
+            left = capacity - sum(polls.values())
+            total = sum(free.values())
+            share = {t: left * r / total for t, r in free.items()}
+            clamped = {t: min(max(p, lo), hi) for t, p in share.items() if p < lo or p > hi}
+            if not clamped:
+                polls.update(share)
+                break
+            polls.update(clamped)
+            for t in clamped:
+                del free[t]
+        for t, p in polls.items():
+            s = self.state[t]
+            s["interval"] = 3600.0 / p
+            if s["last_polled"] is not None:
+                s["next_due"] = s["last_polled"] + s["interval"]
+
+    # Scheduling ------------------------------------------------------------
+
+    @property
+    def hourly_cap(self) -> int:
+        return max(1, math.ceil(self.budget_per_hour))
+
+    def calls_last_hour(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        while self._calls and self._calls[0] <= now - 3600:
+            self._calls.popleft()
+        return len(self._calls)
+
+    def due_batches(self, now: Optional[float] = None) -> List[List[str]]:
+        """Batches to poll now, most overdue first, within the remaining hourly budget"""
+        now = time.time() if now is None else now
+        due = sorted((s["next_due"], t) for t, s in self.state.items() if s["next_due"] <= now)
+        if not due:
+            return []
+        due_set = {t for _, t in due}
+        # Top up the last partial batch with tickers that are nearly due; the call is paid for anyway
+        short = -len(due) % self.batch_size
+        if short:
+            soon = sorted(
+                (s["next_due"], t) for t, s in self.state.items()
+                if t not in due_set and s["next_due"] - now <= FILL_AHEAD * s["interval"]
+            )
+            due.extend(soon[:short])
+        tickers = [t for _, t in due]
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        allowed = max(0, self.hourly_cap - self.calls_last_hour(now))
+        return batches[:allowed]
+
+    def since(self, batch: List[str]) -> Optional[float]:
+        """Oldest last poll in the batch (None if any ticker was never polled)"""
+        polled = [self.state[t]["last_polled"] for t in batch if t in self.state]
+        if not polled or any(p is None for p in polled):
+            return None
+        return min(polled)
+
+    def record_calls(self, calls: int, now: Optional[float] = None):
+        """Count API calls (every page, including failed fetches) against the budget"""
+        now = time.time() if now is None else now
+        self._calls.extend([now] * calls)
+
+    def record(self, batch: List[str], counts: Dict[str, int], highs: Dict[str, int], now: Optional[float] = None):
+        """Fold one poll's new-article and HIGH counts into each ticker's rates"""
+        now = time.time() if now is None else now
+        for t in batch:
+            s = self.state.get(t)
+            if s is None:
+                continue
+            last = s["last_polled"]
+            hours = max((now - last) / 3600.0, 1e-3) if last is not None else self.max_interval_s / 3600.0
+            keep = 0.5 ** (hours / HALF_LIFE_HOURS)
+            s["rate"] = keep * s["rate"] + (1 - keep) * counts.get(t, 0) / hours
+            s["high_rate"] = keep * s["high_rate"] + (1 - keep) * highs.get(t, 0) / hours
+            s["last_polled"] = now
+            s["next_due"] = now + s["interval"]
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        """Seconds until the next ticker is due (or budget frees up)"""
+        now = time.time() if now is None else now
+        if not self.state:
+            return self.max_interval_s
+        wait = max(0.0, min(s["next_due"] for s in self.state.values()) - now)
+        if self.calls_last_hour(now) >= self.hourly_cap and self._calls:
+            wait = max(wait, self._calls[0] + 3600 - now)
+        return wait
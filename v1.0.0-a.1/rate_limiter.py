@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+rate_limiter.py
+Host-wide rate limiting and failure handling for outbound API calls.
+
+TokenBucket     - token bucket kept in a SQLite file, so every process and
+                  thread on the host draws from the same budget; a 429's
+                  Retry-After pauses the bucket for everyone, not just the
+                  worker that got it
+CircuitBreaker  - after failure_threshold consecutive failures (5xx, network
+                  errors) stops all calls to the upstream for cool_off_seconds
+ApiGate         - both around a requests call, with jittered retries
+
+Waiting only ever sleeps the calling thread, so in a thread-pooled scan the
+other in-flight batches keep going while one backs off.
+"""
+
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+import requests
+
+from sqlite_storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(requests.RequestException):
+    """The upstream failed repeatedly; calls are suspended until the cool-off ends"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open; retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _ensure_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_buckets (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            blocked_until REAL NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS circuit_breakers (
+            name TEXT PRIMARY KEY,
+            failures INTEGER NOT NULL DEFAULT 0,
+            open_until REAL NOT NULL DEFAULT 0
+        )
+    """)
+
+class TokenBucket:
+    """
+    Shared token bucket: rate_per_second refill up to burst tokens.
+
+    rate_per_second <= 0 disables the token limit but keeps the shared
+    Retry-After pause.
+    """
+
+    def __init__(self, path: str, name: str, rate_per_second: float, burst: float = 1.0):
+        self.storage = get_storage(path)
+        self.name = name
+        self.rate = float(rate_per_second)
+        self.burst = max(1.0, float(burst))
+        self.storage.write(_ensure_tables)
+
+    def reserve(self, tokens: float = 1.0) -> Tuple[bool, float]:
+        """
+        Reserve tokens; returns (reserved, wait_seconds).
+
+        Reservations may take the bucket into debt: the caller gets a slot
+        (reserved=True) and waits wait_seconds before using it, so callers
+        are served in order at exactly the refill rate instead of polling
+        for leftovers. While the bucket is paused nothing is reserved and
+        wait_seconds is the time left on the pause.
+        """
+        if self.rate <= 0:
+            # No token limit: only a shared pause can hold us back, and checking it is a read
+            row = self.storage.connection().execute(
+                "SELECT blocked_until FROM rate_buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            wait = max(0.0, row["blocked_until"] - time.time()) if row else 0.0
+            return wait <= 0, wait
+
+        def write(conn) -> Tuple[bool, float]:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            if row is None:
+                level, blocked_until = self.burst, 0.0
+            else:
+                level = min(self.burst, row["tokens"] + max(0.0, now - row["updated_at"]) * self.rate)
+                blocked_until = row["blocked_until"]
+            if blocked_until > now:
+                return False, blocked_until - now
+            level -= tokens
+            conn.execute("""
+                INSERT INTO rate_buckets (name, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+            """, (self.name, level, now, blocked_until))
+            return True, max(0.0, -level / self.rate)
+
+        return self.storage.write(write)
+
+    def acquire(self, tokens: float = 1.0):
+        """Block this thread until its tokens are due"""
+        while True:
+            reserved, wait = self.reserve(tokens)
+            if reserved:
+                if wait > 0:
+                    time.sleep(wait)
+                return
+            # Paused: jitter keeps waiting processes from all retrying at the same instant
+            time.sleep(wait + random.uniform(0, min(wait, 1.0) * 0.2))
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for everyone until now + seconds (e.g. Retry-After)"""
+        until = time.time() + seconds
+        # Empty and refill from the end of the pause, so callers resume at the steady rate, not in a burst
+        self.storage.write(lambda conn: conn.execute("""
+            INSERT INTO rate_buckets (name, tokens, updated_at, blocked_until) VALUES (?, 0, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET tokens = MIN(rate_buckets.tokens, 0),
+                updated_at = MAX(rate_buckets.updated_at, excluded.updated_at),
+                blocked_until = MAX(rate_buckets.blocked_until, excluded.blocked_until)
+        """, (self.name, until, until)))
+
+class CircuitBreaker:
+    """Shared consecutive-failure breaker with a fixed cool-off"""
+
+    def __init__(self, path: str, name: str, failure_threshold: int = 5, cool_off_seconds: float = 60.0):
+        self.storage = get_storage(path)
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cool_off_seconds = cool_off_seconds
+        self.storage.write(_ensure_tables)
+
+    def retry_in(self) -> float:
+        """Seconds until calls are allowed again (0 when closed)"""
+        row = self.storage.connection().execute(
+            "SELECT open_until FROM circuit_breakers WHERE name = ?", (self.name,)
+        ).fetchone()
+        return max(0.0, row["open_until"] - time.time()) if row else 0.0
+
+    def check(self):
+        """Raise CircuitOpenError while the breaker is open"""
+        wait = self.retry_in()
+        if wait > 0:
+            raise CircuitOpenError(self.name, wait)
+
+    def record_success(self):
+        row = self.storage.connection().execute(
+            "SELECT failures FROM circuit_breakers WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row and row["failures"]:
+            self.storage.execute("UPDATE circuit_breakers SET failures = 0 WHERE name = ?", (self.name,))
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if this one opened the breaker"""
+        def write(conn) -> bool:
+            now = time.time()
+            conn.execute("INSERT OR IGNORE INTO circuit_breakers (name) VALUES (?)", (self.name,))
+            row = conn.execute(
+                "SELECT failures, open_until FROM circuit_breakers WHERE name = ?", (self.name,)
+            ).fetchone()
+            failures = row["failures"] + 1
+            if failures >= self.failure_threshold and row["open_until"] <= now:
+                conn.execute("UPDATE circuit_breakers SET failures = 0, open_until = ? WHERE name = ?",
+                             (now + self.cool_off_seconds, self.name))
+                logger.warning(f"{self.name}: {failures} consecutive failures; "
+                               f"pausing calls for {self.cool_off_seconds:.0f}s")
+                return True
+            conn.execute("UPDATE circuit_breakers SET failures = ? WHERE name = ?", (failures, self.name))
+            return False
+
+        return self.storage.write(write)
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+class ApiGate:
+    """Rate limit, retry and circuit-break calls to one upstream"""
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        rate_per_second: float = 0.0,
+        burst: float = 1.0,
+        failure_threshold: int = 5,
+        cool_off_seconds: float = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 1.0
+    ):
+        self.name = name
+        self.bucket = TokenBucket(path, name, rate_per_second, burst)
+        self.breaker = CircuitBreaker(path, name, failure_threshold, cool_off_seconds)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "throttled": 0, "retries": 0, "failures": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spread retries from many workers over the whole window
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def call(self, send: Callable[[], requests.Response], max_retries: Optional[int] = None) -> requests.Response:
+        """
+        Run send() through the gate and return its response.
+
+        429s pause the shared bucket for Retry-After (or a jittered backoff)
+        and are retried; 5xx and network errors count against the breaker
+        and are retried with jittered backoff. After max_retries the last
+        response is returned (or the last network error raised).
+        Raises CircuitOpenError while the upstream is cooling off.
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(retries + 1):
+            self.breaker.check()
+            self.bucket.acquire()
+            self._count("calls")
+            last = attempt == retries
+            try:
+                resp = send()
+            except requests.RequestException:
+                self._count("failures")
+                self.breaker.record_failure()
+                if last:
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if resp.status_code == 429:
+                self._count("throttled")
+                wait = parse_retry_after(resp.headers.get("Retry-After"))
+                wait = wait if wait is not None else self._backoff(attempt)
+                logger.warning(f"{self.name}: HTTP 429; pausing all callers for {wait:.1f}s")
+                self.bucket.pause(wait)
+            elif resp.status_code in RETRY_STATUS:
+                self._count("failures")
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+                return resp
+
+            if last:
+                return resp
+            self._count("retries")
+            if resp.status_code != 429:
+                time.sleep(self._backoff(attempt))
+        return resp
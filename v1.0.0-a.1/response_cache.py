@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+response_cache.py
+On-disk cache of MarketAux API responses shared by every worker on a host.
+
+Responses are stored gzip-compressed in a small SQLite file, keyed by the
+normalized request (sorted symbol set, published_after cursor, page). Entries
+expire after a TTL and the file is kept under a byte budget by evicting the
+least recently used entries. Hit / miss counters are kept both per process
+and in the file itself so the shared hit ratio can be reported.
+
+Lookups stay reads: counters are added to the file in batches (at most every
+stats_flush_seconds, and by stats()), and an entry's LRU time is refreshed
+only once it is touch_seconds old, so the shared write lock is not taken on
+every hit.
+"""
+
+import json
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Optional
+from sqlite_storage import get_storage
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_STATS_FLUSH_SECONDS = 30.0
+DEFAULT_TOUCH_SECONDS = 60.0
+
+# ============================================================================
+# Keys
+# ============================================================================
+
+def normalize_symbols(symbols: Iterable[str]) -> str:
+    """Order-independent, case-insensitive symbol set"""
+    return ",".join(sorted({s.strip().upper() for s in symbols if s and s.strip()}))
+
+def make_key(symbols: Iterable[str], published_after: Optional[str], page: int = 1, **extra: Any) -> str:
+    """Build a cache key for one MarketAux request"""
+    parts = {
+        "symbols": normalize_symbols(symbols),
+        "published_after": published_after or "",
+        "page": int(page),
+    }
+    parts.update({k: str(v) for k, v in extra.items()})
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+class ResponseCache:
+    """
+    SQLite-backed TTL + LRU cache of decoded JSON responses.
+
+    Thread-safe; connections come from the per-thread pool in
+    sqlite_storage. Several processes may share one file (SQLite serializes
+    the writes).
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 stats_flush_seconds: float = DEFAULT_STATS_FLUSH_SECONDS,
+                 touch_seconds: float = DEFAULT_TOUCH_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats_flush_seconds = stats_flush_seconds
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+        self.storage = get_storage(path)
+        self._stats_lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0}  # not yet added to cache_stats
+        self._flushed_at = time.monotonic()
+        self.storage.write(self._init_db)
+
+    @staticmethod
+    def _init_db(conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            if name == "hits":
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._pending[name] += 1
+            due = time.monotonic() - self._flushed_at >= self.stats_flush_seconds
+        if due:
+            try:
+                self.flush_stats()
+            except sqlite3.Error:
+                pass  # retried with the next flush; a lookup never fails on its counters
+
+    def flush_stats(self):
+        """Add this process's pending hit / miss counts to the shared counters"""
+        with self._stats_lock:
+            pending = [(name, n) for name, n in self._pending.items() if n]
+            self._pending = {"hits": 0, "misses": 0}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            self.storage.write(lambda conn: conn.executemany(
+                "INSERT INTO cache_stats (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                pending
+            ))
+        except sqlite3.Error:
+            # Keep them for the next flush
+            with self._stats_lock:
+                for name, n in pending:
+                    self._pending[name] += n
+            raise
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None if missing / expired"""
+        now = time.time()
+        row = self.storage.connection().execute(
+            "SELECT payload, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self._count("misses")
+            return None
+        try:
+            value = json.loads(gzip.decompress(row[0]).decode("utf-8"))
+        except (OSError, ValueError):
+            self.storage.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        if now - row[2] >= self.touch_seconds:
+            self.storage.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store a JSON-serializable response and enforce the size cap"""
+        payload = gzip.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+
+        def write(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(payload), len(payload), now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._evict(conn)
+
+        self.storage.write(write)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the file is under budget"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self):
+        """Remove every cached response (counters are kept)"""
+        self.storage.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-process and shared (all workers) hit ratios plus current size"""
+        self.flush_stats()
+        conn = self.storage.connection()
+        shared = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        shared_hits = shared.get("hits", 0)
+        shared_lookups = shared_hits + shared.get("misses", 0)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "shared_hits": shared_hits,
+            "shared_misses": shared.get("misses", 0),
+            "shared_hit_ratio": round(shared_hits / shared_lookups, 4) if shared_lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+scan_profiler.py
+Opt-in CPU and allocation profiling of a single scan.
+
+ScanProfiler wraps one scan: cProfile runs in the calling thread and in
+every thread started while it is active (the fetch/score pool), and
+tracemalloc records allocations. artifacts() returns gzip-compressed files
+ready to store and download:
+
+    cpu.prof.gz   pstats dump (gunzip, then `python -m pstats cpu.prof`)
+    cpu.txt.gz    top functions by cumulative and by own time
+    alloc.txt.gz  peak traced memory, and the top allocation sites still
+                  holding memory when the scan ended
+
+    with ScanProfiler() as profiler:
+        run_scan()
+    files = profiler.artifacts()
+
+Profiling slows a scan down noticeably (tracemalloc most of all), so callers
+should enable it for sampled or hand-picked scans only. The thread hook is
+process-wide: scans running concurrently in other threads of the same
+process end up in the same profile.
+
+From Python 3.12 cProfile sits on sys.monitoring, which allows one active
+profiler per process, so worker threads cannot get their own. There the
+hook is not installed, only the calling thread is profiled, and callers
+should run the scan on that thread (see PROFILE_THREADS).
+"""
+
+import io
+import sys
+import gzip
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+
+# Whether threads started during a scan can be profiled alongside the caller
+PROFILE_THREADS = sys.version_info < (3, 12)
+
+ALLOC_IGNORE = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", tracemalloc.__file__)
+
+class ScanProfiler:
+    """Context manager collecting a CPU profile and allocation top-N"""
+
+    def __init__(self, top_n: int = 30, trace_frames: int = 10, allocations: bool = True):
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.allocations = allocations
+        self.elapsed = 0.0
+        self.peak_bytes = 0
+        self._main: Optional[cProfile.Profile] = None
+        self._threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._own_trace = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def _start_thread(self, frame, event, arg):
+        # First profile event of a new thread: hand the thread over to its own profiler
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            # Another profiler is already active; leave this thread unprofiled rather than kill it
+            return
+        with self._lock:
+            self._threads.append(prof)
+
+    def __enter__(self) -> "ScanProfiler":
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._own_trace = True
+        if PROFILE_THREADS:
+            threading.setprofile(self._start_thread)
+        self._started = time.perf_counter()
+        self._main = cProfile.Profile()
+        self._main.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._main.disable()
+        self.elapsed = time.perf_counter() - self._started
+        if PROFILE_THREADS:
+            threading.setprofile(None)
+        if self.allocations and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._own_trace:
+                tracemalloc.stop()
+        return False
+
+    def stats(self) -> pstats.Stats:
+        """CPU stats of the calling thread and every thread it started"""
+        with self._lock:
+            threads = list(self._threads)
+        stats = pstats.Stats(self._main)
+        for prof in threads:
+            stats.add(prof)
+        return stats
+
+    def cpu_report(self) -> str:
+        out = io.StringIO()
+        stats = self.stats()
+        stats.stream = out
+        out.write(f"Scan wall time: {self.elapsed:.3f}s, threads profiled: {len(self._threads) + 1}\n")
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+        stats.sort_stats("tottime").print_stats(self.top_n)
+        return out.getvalue()
+
+    def alloc_report(self) -> str:
+        if self._snapshot is None:
+            return "Allocation tracing was off.\n"
+        snapshot = self._snapshot.filter_traces([tracemalloc.Filter(False, f) for f in ALLOC_IGNORE])
+        top = snapshot.statistics("lineno")[:self.top_n]
+        lines = [f"Peak traced memory: {self.peak_bytes / 1024:.1f} KiB", f"Top {len(top)} allocation sites still allocated at scan end:"]
+        lines.extend(str(stat) for stat in top)
+        return "\n".join(lines) + "\n"
+
+    def artifacts(self) -> Dict[str, bytes]:
+        """{filename: gzip bytes} for the CPU dump, CPU report and allocation report"""
+        return {
+            "cpu.prof.gz": gzip.compress(marshal.dumps(self.stats().stats)),
+            "cpu.txt.gz": gzip.compress(self.cpu_report().encode("utf-8")),
+            "alloc.txt.gz": gzip.compress(self.alloc_report().encode("utf-8")),
+        }
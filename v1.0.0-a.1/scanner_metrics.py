@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+scanner_metrics.py
+In-process metrics for the scanners, exported in Prometheus text format.
+
+Counters and fixed-bucket histograms, optionally labelled, live in a
+MetricsRegistry (REGISTRY is the process-wide one that both scanners
+record into). A registry renders itself as Prometheus text, and can dump a
+JSON snapshot so processes without an HTTP port (Celery workers) can be
+merged and served by another process:
+
+    with STAGE_SECONDS.time("fetch"):
+        ...
+    API_CALLS.inc(status="200")
+    print(REGISTRY.render())
+
+    REGISTRY.write_snapshot("metrics/worker-123.json")
+    merged = merge_snapshots(glob.glob("metrics/*.json"))
+"""
+
+import os
+import json
+import time
+import bisect
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot files are still replaced atomically, just not pruned under a lock
+    fcntl = None
+
+RETIRED_SNAPSHOT = "retired.json"  # totals of snapshot files whose writer is gone
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+class Counter(_Metric):
+    """Monotonic counter per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_label_text(self.labels, k)} {_fmt(v)}" for k, v in items]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"values": [[list(k), v] for k, v in self.values.items()]}
+
+    def merge(self, snap: Dict[str, Any]):
+        with self._lock:
+            for k, v in snap["values"]:
+                key = tuple(k)
+                self.values[key] = self.values.get(key, 0.0) + v
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram (cumulative buckets, sum, count) per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self.series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    @contextmanager
+    def time(self, *label_values: str, **labels):
+        """Observe the wall time of the with-block (labels positionally in declared order)"""
+        if label_values:
+            labels = dict(zip(self.labels, label_values), **labels)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        s = self.series.get(self._key(labels))
+        return s[2] if s else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, [list(s[0]), s[1], s[2]]) for k, s in self.series.items())
+        lines = []
+        for key, (counts, total, n) in items:
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {n}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"buckets": list(self.buckets),
+                    "series": [[list(k), list(s[0]), s[1], s[2]] for k, s in self.series.items()]}
+
+    def merge(self, snap: Dict[str, Any]):
+        if tuple(snap["buckets"]) != self.buckets:
+            return  # bucket layout changed between versions; skip rather than mis-add
+        with self._lock:
+            for k, counts, total, n in snap["series"]:
+                key = tuple(k)
+                s = self.series.get(key)
+                if s is None:
+                    s = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                s[0] = [a + b for a, b in zip(s[0], counts)]
+                s[1] += total
+                s[2] += n
+
+class MetricsRegistry:
+    """Named metrics with Prometheus text rendering and JSON snapshots"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self.metrics):
+            m = self.metrics[name]
+            lines.append(f"# HELP {name} {m.help}")
+            lines.append(f"# TYPE {name} {m.kind}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "written_at": time.time(),
+            "metrics": {
+                name: {"kind": m.kind, "help": m.help, "labels": list(m.labels), **m.snapshot()}
+                for name, m in self.metrics.items()
+            }
+        }
+
+    def merge(self, snap: Dict[str, Any]):
+        """Add a snapshot's values into this registry (creating missing metrics)"""
+        for name, data in snap.get("metrics", {}).items():
+            if data["kind"] == "counter":
+                metric = self.counter(name, data["help"], data["labels"])
+            elif data["kind"] == "histogram":
+                metric = self.histogram(name, data["help"], data["labels"], data["buckets"])
+            else:
+                continue
+            metric.merge(data)
+
+    def write_snapshot(self, path: str):
+        """Atomically write this registry's snapshot as JSON"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+def merge_snapshots(paths: Iterable[str], registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """Sum snapshot files (unreadable ones are skipped) into registry or a new one"""
+    merged = registry if registry is not None else MetricsRegistry()
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError, KeyError):
+            continue
+    return merged
+
+def _prune_snapshots(snapshot_dir: str, names: List[str], is_stale: Callable[[str], bool]) -> List[str]:
+    """Fold stale snapshot files into RETIRED_SNAPSHOT (caller holds the lock); returns the names left"""
+    retired_path = os.path.join(snapshot_dir, RETIRED_SNAPSHOT)
+    try:
+        with open(retired_path, "r", encoding="utf-8") as f:
+            retired_snap = json.load(f)
+    except (OSError, ValueError):
+        retired_snap = {}
+    folded = set(retired_snap.get("folded", [])) & set(names)
+    stale = [n for n in names if n not in folded and is_stale(n)]
+    if stale:
+        retired = MetricsRegistry()
+        retired.merge(retired_snap)
+        merge_snapshots([os.path.join(snapshot_dir, n) for n in stale], retired)
+        data = {**retired.snapshot(), "folded": sorted(folded | set(stale))}
+        fd, tmp = tempfile.mkstemp(dir=snapshot_dir, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, retired_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        folded |= set(stale)
+    # Remembered until the file is gone, so a failed unlink never counts a file twice
+    for name in folded:
+        try:
+            os.unlink(os.path.join(snapshot_dir, name))
+        except OSError:
+            pass
+    return [n for n in names if n not in folded]
+
+def merge_snapshot_dir(
+    snapshot_dir: str,
+    exclude: Iterable[str] = (),
+    is_stale: Optional[Callable[[str], bool]] = None
+) -> MetricsRegistry:
+    """
+    Sum every snapshot file in snapshot_dir except the names in exclude.
+
+    With is_stale(name), files whose writer is gone are first folded into
+    RETIRED_SNAPSHOT and removed: their values keep counting there, so
+    totals stay monotonic while the directory stops growing. Pruning and
+    reading share an exclusive lock, so concurrent callers never count a
+    file twice.
+    """
+    exclude = set(exclude)
+    lock_file = open(os.path.join(snapshot_dir, ".merge.lock"), "a")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        names = [
+            n for n in os.listdir(snapshot_dir)
+            if n.endswith(".json") and n != RETIRED_SNAPSHOT and n not in exclude
+        ]
+        if is_stale is not None:
+            names = _prune_snapshots(snapshot_dir, names, is_stale)
+        return merge_snapshots([os.path.join(snapshot_dir, n) for n in names + [RETIRED_SNAPSHOT]])
+    finally:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+def serve_metrics(port: int, registry: Optional[MetricsRegistry] = None, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread; returns the server"""
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+# ============================================================================
+# Scanner metrics (shared names so bot, workers and backend line up)
+# ============================================================================
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "scanner_stage_seconds", "Time per scan stage: fetch, score, detect, db_write, discord_post", ["stage"])
+API_CALLS = REGISTRY.counter(
+    "scanner_api_calls_total", "MarketAux HTTP requests by status code", ["status"])
+API_THROTTLED = REGISTRY.counter(
+    "scanner_api_429_total", "MarketAux responses with HTTP 429")
+TIER_MATCHES = REGISTRY.counter(
+    "scanner_ticker_match_total", "Articles matched per ticker-detection tier", ["tier"])
+CACHE_LOOKUPS = REGISTRY.counter(
+    "scanner_cache_lookups_total", "Seen-article and response cache lookups", ["cache", "result"])
+ARTICLES = REGISTRY.counter(
+    "scanner_articles_total", "Scored articles by severity", ["severity"])
+DISCORD_ALERTS = REGISTRY.counter(
+    "scanner_discord_alerts_total", "Discord alerts by outcome", ["result"])
+
+def record_api_response(status_code: int):
+    """Count one MarketAux response (and a 429 separately)"""
+    API_CALLS.inc(status=str(status_code))
+    if status_code == 429:
+        API_THROTTLED.inc()
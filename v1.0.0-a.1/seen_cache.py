@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+seen_cache.py
+Memory-bounded cache of already-processed article hashes.
+
+A Bloom filter sits in front of an LRU of hash -> (article_id, severity,
+score). A Bloom miss proves an article was never processed, so the LRU and
+the database are skipped entirely; an LRU hit returns the stored outcome so
+scoring, ticker detection and DB lookups can be short-circuited.
+
+The cache can be saved to disk and is merged on save, so several workers
+sharing one file see each other's articles. Only the LRU entries are
+persisted; the Bloom filter is rebuilt from them on load and rotated
+(rebuilt from the live entries) whenever it has taken in more keys than it
+was sized for, so evicted keys don't slowly fill it up. save() is a no-op
+until something was added, and maybe_save() also rate-limits the writes.
+"""
+
+import os
+import json
+import gzip
+import math
+import hashlib
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are still atomic, just not serialized
+    fcntl = None
+
+CacheEntry = Tuple[Optional[int], str, float]
+
+# ============================================================================
+# Bloom filter
+# ============================================================================
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+# ============================================================================
+# Seen-article cache
+# ============================================================================
+
+class SeenArticleCache:
+    """
+    Bloom filter + LRU of article hash -> (article_id, severity, score).
+
+    Thread-safe. hits / misses / bloom_negatives are counted on every get();
+    bloom_negatives are the misses answered without touching the LRU.
+    bloom_capacity defaults to twice max_entries.
+    """
+
+    def __init__(self, max_entries: int = 50_000, bloom_capacity: Optional[int] = None,
+                 error_rate: float = 0.01, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.bloom_capacity = bloom_capacity or max(1024, 2 * max_entries)
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(self.bloom_capacity, error_rate)
+        self._bloom_keys = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.saved_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.bloom_negatives = 0
+        self.rotations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self.bloom and key in self._entries
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return (article_id, severity, score) if key was processed before"""
+        with self._lock:
+            if key not in self.bloom:
+                self.misses += 1
+                self.bloom_negatives += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def add(self, key: str, article_id: Optional[int], severity: str, score: float):
+        """Record a processed article; evicts least recently used entries"""
+        with self._lock:
+            if key not in self._entries:
+                self.bloom.add(key)
+                self._bloom_keys += 1
+            self._entries[key] = (article_id, severity, score)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._bloom_keys > self.bloom_capacity:
+                self._rebuild_bloom()
+                self.rotations += 1
+            self._dirty = True
+
+    def _rebuild_bloom(self):
+        """Fresh filter holding only the live entries (drops evicted keys)"""
+        self.bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+        for key in self._entries:
+            self.bloom.add(key)
+        self._bloom_keys = len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bloom_negatives": self.bloom_negatives,
+            "entries": len(self._entries),
+            "bloom_rotations": self.rotations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # ------------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------------
+
+    def _merge_snapshot(self, data: Dict[str, Any]):
+        # Snapshot entries are oldest first; ours stay the most recent
+        merged: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        for key, article_id, severity, score in data.get("entries", []):
+            if key not in self._entries:
+                merged[key] = (article_id, severity, score)
+        merged.update(self._entries)
+        while len(merged) > self.max_entries:
+            merged.popitem(last=False)
+        self._entries = merged
+        self._rebuild_bloom()
+
+    @staticmethod
+    def _read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def load(self, path: Optional[str] = None) -> "SeenArticleCache":
+        """Merge a saved snapshot into this cache (missing/corrupt files are ignored)"""
+        path = path or self.path
+        data = self._read_snapshot(path) if path else None
+        if data:
+            with self._lock:
+                self._merge_snapshot(data)
+        return self
+
+    def maybe_save(self, min_interval_seconds: float, path: Optional[str] = None) -> bool:
+        """save() if something was added and the last save is at least min_interval_seconds old"""
+        if not self._dirty or time.monotonic() - self.saved_at < min_interval_seconds:
+            return False
+        self.save(path)
+        return True
+
+    def save(self, path: Optional[str] = None, force: bool = False):
+        """Merge with the current file contents and atomically replace it (skipped if nothing was added)"""
+        path = path or self.path
+        if not path or not (self._dirty or force):
+            return
+        lock_file = open(path + ".lock", "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with self._lock:
+                existing = self._read_snapshot(path)
+                if existing:
+                    self._merge_snapshot(existing)
+                data = {
+                    "version": 2,
+                    "entries": [[k, *v] for k, v in self._entries.items()],
+                }
+                self._dirty = False
+                self.saved_at = time.monotonic()
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw:
+                    with gzip.open(raw, "wt", encoding="utf-8") as f:
+                        json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            except Exception:
+                self._dirty = True
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+sqlite_storage.py
+Shared SQLite access for the scanners: one tuned connection per thread.
+
+Connections are opened once per (thread, process) and reused, so helpers no
+longer pay for connect/close or re-preparing statements (sqlite3 keeps a
+per-connection statement cache). Every connection runs in WAL mode, where
+readers never block on the writer, with synchronous=NORMAL, a larger page
+cache, mmap reads and a busy timeout. Write transactions start with
+BEGIN IMMEDIATE and are retried with jittered backoff when SQLite still
+reports the database as busy or locked (e.g. several Celery workers
+committing at once).
+
+    storage = get_storage("scanner.db")
+    row = storage.connection().execute("SELECT ...").fetchone()
+    storage.write(lambda conn: conn.execute("INSERT ..."))
+"""
+
+import os
+import time
+import random
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+BUSY_TIMEOUT_MS = 5_000
+BUSY_RETRIES = 6
+BUSY_BACKOFF_SECONDS = 0.05
+CACHE_SIZE_KB = 32 * 1024
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+STATEMENT_CACHE = 256
+
+def is_busy_error(exc: BaseException) -> bool:
+    """True for the OperationalErrors SQLite raises on lock contention"""
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
+
+def retry_busy(fn: Callable[[], T], retries: int = BUSY_RETRIES, backoff: float = BUSY_BACKOFF_SECONDS) -> T:
+    """Call fn, retrying busy/locked errors with full-jitter exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if attempt == retries or not is_busy_error(e):
+                raise
+            time.sleep(random.uniform(0, backoff * (2 ** attempt)))
+    raise AssertionError("unreachable")
+
+class SQLiteStorage:
+    """Per-thread pooled connections to one database file"""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        detect_types: int = 0,
+        synchronous: str = "NORMAL",
+        cache_size_kb: int = CACHE_SIZE_KB,
+        mmap_size: int = MMAP_SIZE_BYTES,
+        busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+        retries: int = BUSY_RETRIES
+    ):
+        self.path = path
+        self.detect_types = detect_types
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.retries = retries
+        self._local = threading.local()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            detect_types=self.detect_types,
+            cached_statements=STATEMENT_CACHE,
+            check_same_thread=True
+        )
+        conn.row_factory = sqlite3.Row
+        retry_busy(lambda: conn.execute("PRAGMA journal_mode=WAL"), self.retries)
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (reopened after a fork); do not close it"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def write(self, fn: Callable[[sqlite3.Connection], T], immediate: bool = True) -> T:
+        """
+        Run fn(conn) in one write transaction and commit.
+
+        BEGIN IMMEDIATE takes the write lock up front, so a transaction
+        never fails half-way on a read-to-write upgrade; if the lock cannot
+        be had within the busy timeout the whole transaction is retried.
+        Raises sqlite3.ProgrammingError if this thread's connection is
+        already inside a transaction (commit or roll it back first).
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            raise sqlite3.ProgrammingError(
+                f"{self.path}: write() called while this thread's connection has an open transaction"
+            )
+
+        def attempt() -> T:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                result = fn(conn)
+                conn.commit()
+                return result
+            except BaseException:
+                conn.rollback()
+                raise
+
+        return retry_busy(attempt, self.retries)
+
+    def execute(self, sql: str, params: Any = ()) -> sqlite3.Cursor:
+        """Execute one autocommitted statement, retrying on busy"""
+        conn = self.connection()
+
+        def attempt() -> sqlite3.Cursor:
+            cur = conn.execute(sql, params)
+            if conn.in_transaction:
+                conn.commit()
+            return cur
+
+        return retry_busy(attempt, self.retries)
+
+    def close(self):
+        """Close this thread's connection (others close when their thread exits)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+_storages: Dict[Any, SQLiteStorage] = {}
+_storages_lock = threading.Lock()
+
+def get_storage(path: str, detect_types: int = 0, **kwargs) -> SQLiteStorage:
+    """Process-wide SQLiteStorage for path (one per absolute path and detect_types)"""
+    key = (os.path.abspath(path), detect_types)
+    storage = _storages.get(key)
+    if storage is None:
+        with _storages_lock:
+            storage = _storages.get(key)
+            if storage is None:
+                storage = SQLiteStorage(path, detect_types=detect_types, **kwargs)
+                _storages[key] = storage
+    return storage
+
+def reset_storages():
+    """Forget every storage (their connections close when garbage collected)"""
+    with _storages_lock:
+        _storages.clear()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+structured_logging.py
+Cheap logging for hot scan loops.
+
+- LazyQueueHandler / start_queue_logging: the scanning thread only puts the
+  LogRecord on a queue; message formatting, JSON encoding and file/stdout
+  I/O happen on a QueueListener thread.
+- JsonFormatter: one JSON object per line; fields passed with
+  extra={"fields": {...}} are emitted as top-level keys.
+- EventSampler: log the first and then every Nth occurrence of an event.
+- EventCounter: count events (e.g. detection tiers) and log one summary
+  record per batch instead of one line per article.
+"""
+
+import json
+import queue
+import atexit
+import logging
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the message (and any traceback) in the
+    calling thread; here the record is queued as-is, which is safe because
+    the queue never leaves the process.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def start_queue_logging(logger: logging.Logger, handlers: List[logging.Handler]) -> QueueListener:
+    """Route logger through a queue to handlers on a background thread (stopped at exit)"""
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = QueueListener(q, *handlers, respect_handler_level=True)
+    logger.handlers = [LazyQueueHandler(q)]
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+class EventSampler:
+    """Decide per event name whether this occurrence should be logged"""
+
+    def __init__(self, every: int = 100):
+        self.every = max(1, every)
+        self._seen: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def should_log(self, event: str) -> bool:
+        """True for the 1st, (every+1)th, (2*every+1)th ... occurrence"""
+        with self._lock:
+            n = self._seen[event]
+            self._seen[event] = n + 1
+        return n % self.every == 0
+
+    def seen(self, event: str) -> int:
+        return self._seen[event]
+
+class EventCounter:
+    """Aggregate events and report them as one record"""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, event: str, n: int = 1):
+        with self._lock:
+            self._counts[event] += n
+
+    def flush(self, logger: logging.Logger, message: str, level: int = logging.INFO,
+              fields: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """Log and reset the counts (nothing is logged when there were no events)"""
+        with self._lock:
+            counts = dict(sorted(self._counts.items()))
+            self._counts.clear()
+        if counts and logger.isEnabledFor(level):
+            logger.log(level, "%s %s", message, counts, extra={"fields": {**(fields or {}), "counts": counts}})
+        return counts
@@ -0,0 +1,101 @@
+"""
+Shared fixtures for the scanner tests
+
+- scanner_db: a database built the way production gets it, i.e. the bot's
+  init_and_migrate_db() schema followed by the SaaS migrations
+- marketaux: an in-memory MarketAux behind YourStockNews.marketaux_fetch_page
+"""
+import os
+import sys
+import sqlite3
+import importlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+SCANNER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCANNER_DIR)
+
+import YourStockNews as scanner
+from sqlite_storage import reset_storages
+
+SAAS_MIGRATIONS = ("002_multitenant_saas.sql", "005_articles_tenant_unique.sql", "006_usage_counters.sql")
+
+
+@pytest.fixture
+def scanner_db(tmp_path, monkeypatch) -> str:
+    """Path of a fresh database with the bot schema plus the SaaS migrations"""
+    monkeypatch.chdir(tmp_path)  # the bot opens bot.log in the working directory
+    bot = importlib.import_module("Starting_YourStockNews")
+    db_path = str(tmp_path / "med_alerts.db")
+    monkeypatch.setattr(bot, "DB_PATH", db_path)
+    bot.init_and_migrate_db()
+
+    conn = sqlite3.connect(db_path)
+    for name in SAAS_MIGRATIONS:
+        with open(os.path.join(SCANNER_DIR, "Migrations", name), "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+    conn.close()
+
+    yield db_path
+    reset_storages()
+
+
+def add_watchlist(db_path: str, user_id: int, watchlist_id: int, tickers: List[str]):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT OR IGNORE INTO users (id, email, password_hash) VALUES (?, ?, 'x')",
+                 (user_id, f"user{user_id}@example.com"))
+    conn.execute("INSERT INTO watchlists (id, user_id, name) VALUES (?, ?, 'wl')", (watchlist_id, user_id))
+    conn.executemany("INSERT INTO watchlist_tickers (watchlist_id, ticker) VALUES (?, ?)",
+                     [(watchlist_id, t) for t in tickers])
+    conn.commit()
+    conn.close()
+
+
+def article(symbols: List[str], title: str, minutes_ago: float, tagged: bool = True,
+            now: Optional[datetime] = None) -> Dict[str, Any]:
+    """MarketAux-shaped article returned for symbols (and tagged with them unless tagged=False)"""
+    published = (now or datetime.now(timezone.utc)) - timedelta(minutes=minutes_ago)
+    return {
+        "uuid": f"{title}-{minutes_ago}",
+        "title": title,
+        "description": title,
+        "url": f"https://news.example.com/{abs(hash((title, minutes_ago)))}",
+        "published_at": published.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "entities": [{"symbol": s, "type": "equity"} for s in symbols] if tagged else [],
+        "_symbols": [s.upper() for s in symbols],
+    }
+
+
+class FakeMarketAux:
+    """Serves /v1/news/all from a list of articles: symbol and date filters, newest first, fixed page size"""
+
+    def __init__(self, page_size: int = 3):
+        self.page_size = page_size
+        self.articles: List[Dict[str, Any]] = []
+        self.calls: List[Dict[str, Any]] = []
+
+    def fetch_page(self, symbols, api_key, published_after, page=1, published_before=None):
+        self.calls.append({"symbols": list(symbols), "published_after": published_after,
+                           "published_before": published_before, "page": page})
+        wanted = {s.upper() for s in symbols}
+        cutoff = scanner.parse_timestamp(published_after)
+        bound = scanner.parse_timestamp(published_before)
+        matching = [
+            a for a in self.articles
+            if wanted & set(a["_symbols"])
+            and (cutoff is None or scanner.parse_timestamp(a["published_at"]) >= cutoff)
+            and (bound is None or scanner.parse_timestamp(a["published_at"]) <= bound)
+        ]
+        matching.sort(key=lambda a: a["published_at"], reverse=True)
+        start = (page - 1) * self.page_size
+        data = [{k: v for k, v in a.items() if k != "_symbols"} for a in matching[start:start + self.page_size]]
+        return data, {"found": len(matching), "returned": len(data), "limit": self.page_size, "page": page}
+
+
+@pytest.fixture
+def marketaux(monkeypatch) -> FakeMarketAux:
+    fake = FakeMarketAux()
+    monkeypatch.setattr(scanner, "marketaux_fetch_page", fake.fetch_page)
+    return fake
@@ -0,0 +1,97 @@
+"""Per-ticker cursor advancement of run_single_scan against the production schema"""
+from datetime import timedelta
+
+import YourStockNews as scanner
+from conftest import add_watchlist, article
+
+
+def cursor_of(db_path, ticker):
+    return scanner.load_ticker_cursors(2, [ticker], db_path).get(ticker)
+
+
+def test_cursor_moves_to_newest_article_when_stream_is_read_to_the_end(scanner_db, marketaux):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL"])
+    marketaux.articles = [article(["AAPL"], f"Apple fraud investigation {i}", 10 + i) for i in range(5)]
+
+    result = scanner.run_single_scan(2, 2, ["AAPL"], "key", db_path=scanner_db, max_concurrency=1)
+
+    assert result["articles_found"] == 5
+    newest = scanner.parse_timestamp(marketaux.articles[0]["published_at"])
+    assert scanner.parse_timestamp(cursor_of(scanner_db, "AAPL")) == newest
+
+
+def test_articles_cut_off_by_max_pages_are_fetched_by_the_next_scan(scanner_db, marketaux):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL"])
+    per_scan = scanner.MAX_PAGES * marketaux.page_size
+    # Further apart than CURSOR_OVERLAP_MINUTES, so the overlap cannot hide a gap
+    gap = 3 * scanner.CURSOR_OVERLAP_MINUTES
+    marketaux.articles = [article(["AAPL"], f"Apple fraud investigation {i}", gap * (1 + i))
+                          for i in range(per_scan + 5)]
+    since = scanner.format_cursor(
+        scanner.parse_timestamp(marketaux.articles[-1]["published_at"]) - timedelta(minutes=1)
+    )
+
+    first = scanner.run_single_scan(2, 2, ["AAPL"], "key", last_timestamp=since, db_path=scanner_db,
+                                    max_concurrency=1)
+
+    assert first["articles_found"] == per_scan
+    assert cursor_of(scanner_db, "AAPL") == since
+
+    # The next scan pages backwards through the unread tail
+    second = scanner.run_single_scan(2, 2, ["AAPL"], "key", last_timestamp=since, db_path=scanner_db,
+                                     max_concurrency=1)
+
+    tail = {a["title"] for a in marketaux.articles[per_scan:]}
+    assert tail <= {a["title"] for a in second["articles"]}
+    newest = scanner.parse_timestamp(marketaux.articles[0]["published_at"])
+    assert scanner.parse_timestamp(cursor_of(scanner_db, "AAPL")) == newest
+    assert scanner.load_ticker_backfills(2, ["AAPL"], scanner_db) == {}
+
+
+def test_backfill_that_is_cut_again_keeps_paging_backwards(scanner_db, marketaux):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL"])
+    per_scan = scanner.MAX_PAGES * marketaux.page_size
+    gap = 3 * scanner.CURSOR_OVERLAP_MINUTES
+    marketaux.articles = [article(["AAPL"], f"Apple fraud investigation {i}", gap * (1 + i))
+                          for i in range(2 * per_scan + 5)]
+    since = scanner.format_cursor(
+        scanner.parse_timestamp(marketaux.articles[-1]["published_at"]) - timedelta(minutes=1)
+    )
+
+    stored = set()
+    for _ in range(3):
+        result = scanner.run_single_scan(2, 2, ["AAPL"], "key", last_timestamp=since, db_path=scanner_db,
+                                         max_concurrency=1)
+        stored |= {a["title"] for a in result["articles"]}
+
+    assert stored == {a["title"] for a in marketaux.articles}
+    newest = scanner.parse_timestamp(marketaux.articles[0]["published_at"])
+    assert scanner.parse_timestamp(cursor_of(scanner_db, "AAPL")) == newest
+
+
+def test_article_that_fails_to_save_is_skipped_and_holds_the_cursor(scanner_db, marketaux, monkeypatch):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL", "MSFT"])
+    marketaux.articles = [
+        article(["AAPL"], "Apple fraud investigation", 5),
+        article(["AAPL"], "Apple recall lawsuit", 10),
+        article(["MSFT"], "Microsoft fraud investigation", 15),
+    ]
+
+    save = scanner.save_articles_bulk
+
+    def failing_save(records, *args, **kwargs):
+        if any(r["title"] == "Apple recall lawsuit" for r in records):
+            raise ValueError("unsavable article")
+        return save(records, *args, **kwargs)
+
+    monkeypatch.setattr(scanner, "save_articles_bulk", failing_save)
+    result = scanner.run_single_scan(2, 2, ["AAPL", "MSFT"], "key", db_path=scanner_db, max_concurrency=1)
+
+    assert result["status"] == "success"
+    assert sorted(a["title"] for a in result["articles"]) == [
+        "Apple fraud investigation", "Microsoft fraud investigation"
+    ]
+    failed = scanner.parse_timestamp(marketaux.articles[1]["published_at"])
+    assert scanner.parse_timestamp(cursor_of(scanner_db, "AAPL")) == failed
+    newest = scanner.parse_timestamp(marketaux.articles[0]["published_at"])
+    assert scanner.parse_timestamp(cursor_of(scanner_db, "MSFT")) == newest
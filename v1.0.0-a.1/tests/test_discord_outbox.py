@@ -0,0 +1,84 @@
+"""DiscordOutboxSender leases and run loop"""
+import time
+from typing import List
+
+import discord_outbox
+from discord_outbox import DiscordOutbox, DiscordOutboxSender
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 204, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return {}
+
+
+class FakeSession:
+    """Webhook that accepts every post and reports an empty rate-limit bucket"""
+
+    def __init__(self, reset_after: float):
+        self.reset_after = reset_after
+        self.bodies: List[str] = []
+
+    def post(self, url, json, timeout):
+        self.bodies.append(json["content"])
+        return FakeResponse(204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": str(self.reset_after)})
+
+
+def queue_alerts(outbox: DiscordOutbox, count: int):
+    """Alerts too long to share a message, so each one is its own post"""
+    for i in range(count):
+        outbox.enqueue(f"hash{i}", f"alert {i} " + "x" * 1500)
+
+
+def test_batch_is_not_retaken_while_sender_waits_for_rate_limit(scanner_db, monkeypatch):
+    monkeypatch.setattr(discord_outbox, "CLAIM_SECONDS", 0.3)
+    outbox = DiscordOutbox(scanner_db)
+    queue_alerts(outbox, 3)
+    sender = DiscordOutboxSender(outbox, "https://discord.example.com/webhook", session=FakeSession(0.6))
+    other = DiscordOutboxSender(outbox, "https://discord.example.com/webhook")
+    retaken = []
+
+    def pause(timeout):
+        time.sleep(timeout)  # longer than the original lease
+        retaken.extend(r["id"] for r in other.claim())
+        return False
+
+    monkeypatch.setattr(sender._stop, "wait", pause)
+
+    assert sender.drain_once() == 3
+    assert retaken == []
+    assert len(sender.session.bodies) == 3
+    assert outbox.counts() == {"sent": 3}
+
+
+def test_stopping_mid_batch_releases_the_rest(scanner_db, monkeypatch):
+    outbox = DiscordOutbox(scanner_db)
+    queue_alerts(outbox, 3)
+    sender = DiscordOutboxSender(outbox, "https://discord.example.com/webhook", session=FakeSession(5.0))
+    monkeypatch.setattr(sender._stop, "wait", lambda timeout: True)
+
+    assert sender.drain_once() == 1
+    assert outbox.counts() == {"sent": 1, "pending": 2}
+    assert len(DiscordOutboxSender(outbox, "https://discord.example.com/webhook").claim()) == 2
+
+
+def test_run_survives_unexpected_errors(scanner_db, monkeypatch):
+    monkeypatch.setattr(discord_outbox, "POLL_SECONDS", 0.01)
+    sender = DiscordOutboxSender(DiscordOutbox(scanner_db), "https://discord.example.com/webhook")
+    calls = []
+
+    def drain_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        sender._stop.set()
+        return 0
+
+    monkeypatch.setattr(sender, "drain_once", drain_once)
+    sender.run()
+
+    assert len(calls) == 2
@@ -0,0 +1,72 @@
+"""run_fleet_scan fan-out against the production schema"""
+import sqlite3
+
+import YourStockNews as scanner
+from seen_cache import SeenArticleCache
+from conftest import add_watchlist, article
+
+
+def stored(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT a.user_id, a.watchlist_id, a.title, GROUP_CONCAT(t.ticker) AS tickers
+        FROM articles a LEFT JOIN article_tickers t ON t.article_id = a.id
+        GROUP BY a.id ORDER BY a.watchlist_id, a.title
+    """).fetchall()
+    conn.close()
+    return [(u, w, title, sorted((tickers or "").split(","))) for u, w, title, tickers in rows]
+
+
+def test_shared_article_is_stored_for_every_tenant(scanner_db, marketaux):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL", "MSFT"])
+    add_watchlist(scanner_db, user_id=3, watchlist_id=3, tickers=["AAPL", "TSLA"])
+    marketaux.articles = [
+        article(["AAPL"], "Apple faces fraud investigation", 5),
+        article(["TSLA"], "Tesla issues recall after lawsuit", 10),
+        article(["MSFT"], "Microsoft CFO to resign amid investigation", 15),
+    ]
+
+    result = scanner.run_fleet_scan("key", db_path=scanner_db, max_concurrency=1)
+
+    assert result["status"] == "success"
+    assert result["articles_found"] == 3
+    assert stored(scanner_db) == [
+        (2, 2, "Apple faces fraud investigation", ["AAPL"]),
+        (2, 2, "Microsoft CFO to resign amid investigation", ["MSFT"]),
+        (3, 3, "Apple faces fraud investigation", ["AAPL"]),
+        (3, 3, "Tesla issues recall after lawsuit", ["TSLA"]),
+    ]
+    assert result["watchlists"][2]["articles_found"] == 2
+    assert result["watchlists"][3]["articles_found"] == 2
+
+
+def test_untagged_article_is_not_routed_to_the_batch(scanner_db, marketaux):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL"])
+    add_watchlist(scanner_db, user_id=3, watchlist_id=3, tickers=["TSLA"])
+    marketaux.articles = [article(["AAPL"], "Market-wide fraud investigation", 5, tagged=False)]
+
+    result = scanner.run_fleet_scan("key", db_path=scanner_db, max_concurrency=1)
+
+    assert result["status"] == "success"
+    assert result["articles_found"] == 0
+    assert stored(scanner_db) == []
+
+
+def test_seen_cache_only_records_saved_articles(scanner_db, marketaux, monkeypatch):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL"])
+    add_watchlist(scanner_db, user_id=3, watchlist_id=3, tickers=["AAPL"])
+    marketaux.articles = [article(["AAPL"], "Apple faces fraud investigation", 5)]
+    seen = SeenArticleCache()
+
+    save = scanner.save_articles_bulk
+    monkeypatch.setattr(scanner, "save_articles_bulk",
+                        lambda records, *args, **kwargs: [None] * len(save(records, *args, **kwargs)))
+    result = scanner.run_fleet_scan("key", db_path=scanner_db, max_concurrency=1, seen_cache=seen)
+    assert result["articles_found"] == 0
+    assert len(seen) == 0
+
+    monkeypatch.setattr(scanner, "save_articles_bulk", save)
+    result = scanner.run_fleet_scan("key", db_path=scanner_db, max_concurrency=1, seen_cache=seen,
+                                    use_cursors=False)
+    assert result["articles_found"] == 1
+    assert len(seen) == 1
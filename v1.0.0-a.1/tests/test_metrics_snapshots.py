@@ -0,0 +1,51 @@
+"""Per-worker metric snapshot files merged by YourStockNews.render_metrics"""
+import os
+import socket
+import subprocess
+import sys
+
+import YourStockNews as scanner
+from scanner_metrics import MetricsRegistry, RETIRED_SNAPSHOT, merge_snapshot_dir
+
+
+def exited_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def write_worker(snapshot_dir, name, calls):
+    registry = MetricsRegistry()
+    registry.counter("test_calls_total", "calls", ["status"]).inc(calls, status="200")
+    registry.write_snapshot(os.path.join(snapshot_dir, name))
+
+
+def total(registry):
+    return registry.metrics["test_calls_total"].value(status="200")
+
+
+def test_snapshot_name_carries_host_pid_and_start_time():
+    name = scanner.metrics_snapshot_name()
+    assert name.startswith(f"scanner-{socket.gethostname()}-{os.getpid()}-")
+    assert scanner.metrics_snapshot_name() == name
+    assert not scanner.metrics_snapshot_stale(name)
+
+
+def test_exited_workers_are_folded_into_the_retired_snapshot(tmp_path):
+    snapshot_dir = str(tmp_path)
+    host = socket.gethostname()
+    dead = f"scanner-{host}-{exited_pid()}-1000.json"
+    live = f"scanner-{host}-{os.getpid()}-2000.json"
+    remote = "scanner-otherhost-1-3000.json"
+    write_worker(snapshot_dir, dead, 5)
+    write_worker(snapshot_dir, live, 7)
+    write_worker(snapshot_dir, remote, 11)
+
+    merged = merge_snapshot_dir(snapshot_dir, is_stale=scanner.metrics_snapshot_stale)
+
+    assert total(merged) == 23
+    assert sorted(os.listdir(snapshot_dir)) == sorted([live, remote, RETIRED_SNAPSHOT, ".merge.lock"])
+
+    # A later worker with the same pid writes its own file; nothing is counted twice or lost
+    write_worker(snapshot_dir, dead.replace("-1000.json", "-4000.json"), 1)
+    assert total(merge_snapshot_dir(snapshot_dir, is_stale=scanner.metrics_snapshot_stale)) == 24
@@ -0,0 +1,46 @@
+"""run_single_scan(profile=True) over several concurrently fetched batches"""
+import threading
+
+import pytest
+
+import YourStockNews as scanner
+import scan_profiler
+from conftest import add_watchlist, article
+
+
+def run_with_deadline(fn, seconds=30):
+    """fn() on a daemon thread; fails the test instead of hanging it"""
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(value=fn()), daemon=True)
+    worker.start()
+    worker.join(seconds)
+    assert not worker.is_alive(), "profiled scan hung"
+    return result["value"]
+
+
+@pytest.mark.parametrize("profile_threads", [True, False])
+def test_profiled_multi_batch_scan_completes(scanner_db, marketaux, monkeypatch, profile_threads):
+    monkeypatch.setattr(scan_profiler, "PROFILE_THREADS", profile_threads)
+    monkeypatch.setattr(scanner, "PROFILE_THREADS", profile_threads)
+    tickers = [f"TK{i}" for i in range(scanner.BATCH_SIZE * 3)]
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=tickers)
+    marketaux.articles = [article([t], f"{t} fraud investigation", 5 + i) for i, t in enumerate(tickers)]
+
+    result = run_with_deadline(lambda: scanner.run_single_scan(
+        2, 2, tickers, "key", db_path=scanner_db, max_concurrency=4, profile=True
+    ))
+
+    assert result["status"] == "success"
+    assert result["articles_found"] == len(tickers)
+    assert set(result["profile"]) == {"cpu.prof.gz", "cpu.txt.gz", "alloc.txt.gz"}
+
+
+def test_thread_hook_survives_an_active_profiler(monkeypatch):
+    profiler = scan_profiler.ScanProfiler(allocations=False)
+
+    def enable(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(scan_profiler.cProfile.Profile, "enable", enable)
+    profiler._start_thread(None, "call", None)  # must not raise into the new thread
+    assert profiler._threads == []
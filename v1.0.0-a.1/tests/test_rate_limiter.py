@@ -0,0 +1,125 @@
+"""Shared token bucket, circuit breaker and ApiGate retries"""
+import pytest
+import requests
+
+import rate_limiter
+from rate_limiter import ApiGate, CircuitBreaker, CircuitOpenError, TokenBucket, parse_retry_after
+from sqlite_storage import reset_storages
+
+
+class Clock:
+    """Stands in for time.time / time.sleep: sleeping moves the clock"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "time", clock.time)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda a, b: b)
+    yield clock
+    reset_storages()
+
+
+def response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    return resp
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_bucket_spaces_reservations_at_the_refill_rate(tmp_path, clock):
+    bucket = TokenBucket(str(tmp_path / "rl.db"), "api", rate_per_second=2, burst=2)
+
+    waits = [bucket.reserve()[1] for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+
+
+def test_bucket_is_shared_by_every_instance_on_the_file(tmp_path, clock):
+    path = str(tmp_path / "rl.db")
+    worker_a = TokenBucket(path, "api", rate_per_second=1, burst=1)
+    worker_b = TokenBucket(path, "api", rate_per_second=1, burst=1)
+
+    assert worker_a.reserve() == (True, 0.0)
+    assert worker_b.reserve() == (True, 1.0)
+
+
+def test_pause_holds_back_every_caller(tmp_path, clock):
+    path = str(tmp_path / "rl.db")
+    limited = TokenBucket(path, "api", rate_per_second=1, burst=5)
+    unlimited = TokenBucket(path, "api", rate_per_second=0)
+
+    limited.pause(30)
+
+    assert limited.reserve() == (False, 30.0)
+    assert unlimited.reserve() == (False, 30.0)
+    clock.now += 30
+    assert unlimited.reserve() == (True, 0.0)
+    assert limited.reserve() == (True, 1.0)  # refilled from the end of the pause, not in a burst
+
+
+def test_breaker_opens_after_consecutive_failures(tmp_path, clock):
+    breaker = CircuitBreaker(str(tmp_path / "rl.db"), "api", failure_threshold=3, cool_off_seconds=60)
+
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 60
+    breaker.check()
+
+
+def test_gate_retries_429_after_retry_after(tmp_path, clock):
+    gate = ApiGate(str(tmp_path / "rl.db"), "api", max_retries=3)
+    replies = iter([response(429, {"Retry-After": "5"}), response(200)])
+
+    resp = gate.call(lambda: next(replies))
+
+    assert resp.status_code == 200
+    assert gate.stats == {"calls": 2, "throttled": 1, "retries": 1, "failures": 0}
+    assert sum(clock.slept) >= 5
+
+
+def test_gate_gives_up_and_opens_the_breaker_on_repeated_5xx(tmp_path, clock):
+    gate = ApiGate(str(tmp_path / "rl.db"), "api", failure_threshold=3, max_retries=2)
+
+    resp = gate.call(lambda: response(503))
+
+    assert resp.status_code == 503
+    assert gate.stats["calls"] == 3
+    with pytest.raises(CircuitOpenError):
+        gate.call(lambda: response(200))
+
+
+def test_gate_reraises_network_errors_after_the_last_retry(tmp_path, clock):
+    gate = ApiGate(str(tmp_path / "rl.db"), "api", max_retries=1)
+
+    def send():
+        raise requests.ConnectionError("down")
+
+    with pytest.raises(requests.ConnectionError):
+        gate.call(send)
+    assert gate.stats["calls"] == 2
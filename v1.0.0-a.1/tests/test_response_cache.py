@@ -0,0 +1,99 @@
+"""ResponseCache: TTL, LRU budget and batched shared counters"""
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, make_key
+from sqlite_storage import reset_storages
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    yield clock
+    reset_storages()
+
+
+def accessed_at(cache, key):
+    return cache.storage.connection().execute(
+        "SELECT accessed_at FROM responses WHERE key = ?", (key,)
+    ).fetchone()[0]
+
+
+def shared_counts(cache):
+    return dict(cache.storage.connection().execute("SELECT name, value FROM cache_stats").fetchall())
+
+
+def test_key_ignores_symbol_order_and_case():
+    assert make_key(["msft", "AAPL"], "2024-01-01T00:00:00", 1) == make_key(["AAPL", "MSFT"], "2024-01-01T00:00:00", 1)
+    assert make_key(["AAPL"], None, 1) != make_key(["AAPL"], None, 2)
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.db"), ttl_seconds=60)
+    cache.put("k", {"data": [1]})
+
+    clock.now += 59
+    assert cache.get("k") == {"data": [1]}
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_hits_refresh_the_lru_time_only_once_it_is_stale(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.db"), ttl_seconds=3600, touch_seconds=60)
+    cache.put("k", {"data": []})
+    stored = accessed_at(cache, "k")
+
+    clock.now += 30
+    cache.get("k")
+    assert accessed_at(cache, "k") == stored
+
+    clock.now += 31
+    cache.get("k")
+    assert accessed_at(cache, "k") == clock.now
+
+
+def test_counters_reach_the_file_in_batches(tmp_path, clock):
+    path = str(tmp_path / "responses.db")
+    worker_a = ResponseCache(path, stats_flush_seconds=3600)
+    worker_b = ResponseCache(path, stats_flush_seconds=3600)
+    worker_a.put("k", {"data": []})
+
+    worker_a.get("k")
+    worker_a.get("missing")
+    worker_b.get("k")
+    assert shared_counts(worker_a) == {}
+
+    stats = worker_a.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert (stats["shared_hits"], stats["shared_misses"]) == (1, 1)
+    assert worker_b.stats()["shared_hits"] == 2
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.db"), max_bytes=10_000, touch_seconds=0)
+    blob = "x" * 20_000  # compresses to a few dozen bytes
+    sizes = {}
+    for i in range(3):
+        clock.now += 1
+        cache.put(f"k{i}", {"data": [f"{blob}{i}"]})
+        sizes[i] = cache.storage.connection().execute(
+            "SELECT size FROM responses WHERE key = ?", (f"k{i}",)
+        ).fetchone()[0]
+    clock.now += 1
+    cache.get("k0")  # k1 is now the least recently used
+
+    cache.max_bytes = sizes[0] + sizes[2] + sizes[2] // 2
+    clock.now += 1
+    cache.put("k3", {"data": [f"{blob}2"]})
+
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None
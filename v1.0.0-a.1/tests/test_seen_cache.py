@@ -0,0 +1,34 @@
+"""SeenArticleCache persistence and Bloom filter rotation"""
+import os
+
+from seen_cache import SeenArticleCache
+
+
+def test_save_only_writes_after_changes(tmp_path):
+    path = str(tmp_path / "seen.json.gz")
+    cache = SeenArticleCache(max_entries=10, path=path)
+
+    cache.save()
+    assert not os.path.exists(path)
+
+    cache.add("a", 1, "MED", 2.0)
+    assert not cache.maybe_save(60)  # saved recently enough (at creation)
+    cache.saved_at -= 61
+    assert cache.maybe_save(60)
+    mtime = os.stat(path).st_mtime_ns
+    cache.saved_at -= 61
+    assert not cache.maybe_save(60)  # nothing new since
+    assert os.stat(path).st_mtime_ns == mtime
+
+    assert SeenArticleCache(max_entries=10, path=path).load().get("a") == (1, "MED", 2.0)
+
+
+def test_bloom_filter_is_rebuilt_from_live_entries(tmp_path):
+    cache = SeenArticleCache(max_entries=10, bloom_capacity=50)
+    for i in range(200):
+        cache.add(f"key{i}", i, "LOW", 0.0)
+
+    assert cache.stats()["bloom_rotations"] > 0
+    assert all(f"key{i}" in cache.bloom for i in range(190, 200))
+    evicted = sum(f"key{i}" in cache.bloom for i in range(100))
+    assert evicted <= 5
@@ -0,0 +1,40 @@
+"""Usage counters of Migrations/006_usage_counters.sql"""
+import sqlite3
+
+from conftest import add_watchlist
+
+
+def counts(db_path, user_id, watchlist_id):
+    conn = sqlite3.connect(db_path)
+    watchlists = conn.execute("SELECT watchlist_count FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+    tickers = conn.execute("SELECT ticker_count FROM watchlists WHERE id = ?", (watchlist_id,)).fetchone()
+    conn.close()
+    return watchlists, tickers[0] if tickers else None
+
+
+def test_counters_follow_inserts_and_deletes(scanner_db):
+    add_watchlist(scanner_db, user_id=2, watchlist_id=2, tickers=["AAPL", "MSFT"])
+    add_watchlist(scanner_db, user_id=2, watchlist_id=3, tickers=["TSLA"])
+    assert counts(scanner_db, 2, 2) == (2, 2)
+
+    conn = sqlite3.connect(scanner_db)
+    conn.execute("DELETE FROM watchlist_tickers WHERE watchlist_id = 2 AND ticker = 'AAPL'")
+    conn.commit()
+    assert counts(scanner_db, 2, 2) == (2, 1)
+
+    # A duplicate ticker is rejected and its transaction rolled back: no count change
+    try:
+        conn.execute("INSERT INTO watchlist_tickers (watchlist_id, ticker) VALUES (2, 'MSFT')")
+    except sqlite3.IntegrityError:
+        conn.rollback()
+    assert counts(scanner_db, 2, 2) == (2, 1)
+
+    conn.execute("DELETE FROM watchlists WHERE id = 3")
+    conn.commit()
+    conn.close()
+    assert counts(scanner_db, 2, 3) == (1, None)
+
+
+def test_seeded_rows_are_backfilled(scanner_db):
+    # 002 seeds user 1 with watchlist 1 before the counters exist
+    assert counts(scanner_db, 1, 1) == (1, 0)